@@ -0,0 +1,146 @@
+"""内存准入控制
+
+转录和音频分离任务开始前按探测到的时长、模型大小和分段设置估算占用的内存，
+全局准入控制器在 已准入任务 + 常驻模型 + 新任务 超出内存预算时推迟新任务，并给出等待原因。
+估算偏保守；没有其他任务运行时总是准入，单个超出预算的任务不会永远等待。
+
+界面线程用 tryReserve 检查，不阻塞；音频分离在工作线程中逐个文件处理，用 wait 阻塞等待。
+"""
+import os
+import threading
+
+from app.common.audioPrefetch import BYTES_PER_SECOND
+from app.common.modelPool import estimateModelBytes, modelPool
+
+GB = 1024 ** 3
+
+# 系统内存中用于任务的比例
+DEFAULT_BUDGET_RATIO = 0.75
+FALLBACK_BUDGET_BYTES = 16 * GB
+
+# 转录推理时激活值、KV cache 等工作内存与模型大小之比（每个 beam）
+TRANSCRIBE_WORKSPACE_RATIO = 0.1
+
+# Demucs（hdemucs_high）模型及每秒分段长度的推理工作内存
+DEMUCS_MODEL_BYTES = 350 * 1024 * 1024
+DEMUCS_BYTES_PER_SEGMENT_SECOND = 120 * 1024 * 1024
+DEMUCS_SOURCES = 4
+
+
+def totalMemory():
+    """物理内存字节数，无法获取时返回 None"""
+    try:
+        import psutil
+        return psutil.virtual_memory().total
+    except ImportError:
+        pass
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def defaultBudget():
+    total = totalMemory()
+    return int(total * DEFAULT_BUDGET_RATIO) if total else FALLBACK_BUDGET_BYTES
+
+
+def formatGB(nbytes):
+    return f"{nbytes / GB:.1f} GB"
+
+
+def estimateTranscriptionBytes(duration, model_param, params=None):
+    """转录任务的内存：整段解码的音频（流式解码为一个窗口）+ 推理工作内存
+
+    模型本身在常驻模型池中单独计算；多进程分片模式下每个子进程另外加载一份模型。
+    """
+    params = params or {}
+    model_param = model_param or {}
+    model_bytes = estimateModelBytes(model_param) if model_param.get("model_size_or_path") else 0
+    beams = max(int(params.get("beam_size") or 1), 1)
+    workspace = model_bytes * TRANSCRIBE_WORKSPACE_RATIO * beams
+
+    mode = model_param.get("inference_mode", "sequential")
+    audio_seconds = duration or 0
+    if mode == "streaming":
+        # 流式解码只保留一个窗口的音频，与文件长度无关
+        from app.common.streamingTranscribe import STREAMING_BUFFER_SECONDS
+        audio_seconds = min(audio_seconds, STREAMING_BUFFER_SECONDS)
+    elif mode == "batched":
+        workspace *= int(model_param.get("batch_size", 8))
+    elif mode == "parallel":
+        workspace = (model_bytes + workspace) * int(model_param.get("process_count", 2))
+    return int(audio_seconds * BYTES_PER_SECOND + workspace)
+
+
+def estimateSeparationBytes(duration, segment, sample_rate=44100, channels=2):
+    """音频分离任务的内存：模型 + 重采样前后的波形 + 4 个音轨的输出张量 + 分段推理工作内存"""
+    waveform = (duration or 0) * sample_rate * channels * 4
+    return int(DEMUCS_MODEL_BYTES + 3 * waveform + DEMUCS_SOURCES * waveform
+               + segment * DEMUCS_BYTES_PER_SEGMENT_SECOND)
+
+
+class AdmissionController:
+    """按内存预算准入任务，各方法可在不同线程中调用"""
+
+    def __init__(self, budget_bytes=None):
+        self.budget_bytes = budget_bytes or defaultBudget()
+        self.resident_bytes = 0  # 常驻模型池占用，由模型池变化时更新
+        self._condition = threading.Condition()
+        self._reservations = {}  # 键 -> (字节数, 任务说明)
+
+    @property
+    def reservedBytes(self):
+        with self._condition:
+            return sum(nbytes for nbytes, _ in self._reservations.values())
+
+    def setBudget(self, budget_bytes):
+        with self._condition:
+            self.budget_bytes = budget_bytes
+            self._condition.notify_all()
+
+    def setResidentBytes(self, nbytes):
+        with self._condition:
+            self.resident_bytes = nbytes
+            self._condition.notify_all()
+
+    def tryReserve(self, key, nbytes, label=""):
+        """预算允许时登记任务并返回 None，否则返回等待原因"""
+        with self._condition:
+            return self._tryReserve(key, nbytes, label)
+
+    def _tryReserve(self, key, nbytes, label):
+        if key in self._reservations:
+            return None
+        used = self.resident_bytes + sum(size for size, _ in self._reservations.values())
+        if self._reservations and used + nbytes > self.budget_bytes:
+            running = "、".join(name for _, name in self._reservations.values() if name)
+            reason = f"等待内存: 需要 {formatGB(nbytes)}，已用 {formatGB(used)} / {formatGB(self.budget_bytes)}"
+            return reason + (f"（{running}）" if running else "")
+        self._reservations[key] = (nbytes, label)
+        return None
+
+    def wait(self, key, nbytes, label="", should_stop=None, on_wait=None, interval=0.5):
+        """阻塞直到准入，should_stop() 返回 True 时放弃并返回 False；首次需要等待时调用 on_wait(原因)"""
+        with self._condition:
+            notified = False
+            while True:
+                reason = self._tryReserve(key, nbytes, label)
+                if reason is None:
+                    return True
+                if should_stop is not None and should_stop():
+                    return False
+                if on_wait is not None and not notified:
+                    on_wait(reason)
+                    notified = True
+                self._condition.wait(interval)
+
+    def release(self, key):
+        with self._condition:
+            if self._reservations.pop(key, None) is not None:
+                self._condition.notify_all()
+
+
+# 全局准入控制器
+admissionController = AdmissionController()
+modelPool.addListener(lambda: admissionController.setResidentBytes(modelPool.usedBytes))
@@ -0,0 +1,96 @@
+"""转录前的音频预解码
+
+模型推理时 CPU 上的 ffmpeg 解码和推理原本串行进行。预解码在当前文件推理的同时把队列中接下来的
+几个文件解码成 16kHz 单声道 float32 数组，工作线程直接把数组交给 transcribe，不再重复解码。
+所有已解码数组（包括正在转录的文件）的总大小不超过内存预算。
+"""
+import threading
+
+from app.common.speechMap import SAMPLING_RATE, probeDuration
+
+# 最多提前解码的排队文件数
+PREFETCH_AHEAD = 2
+
+# 已解码音频的总内存预算
+DEFAULT_BUDGET_BYTES = 1024 * 1024 * 1024
+
+# 16kHz float32 每秒占用的字节数
+BYTES_PER_SECOND = SAMPLING_RATE * 4
+
+
+def estimateDecodedBytes(file_path):
+    """按容器时长估算解码后的数组大小，无法得到时长时返回 None"""
+    duration = probeDuration(file_path)
+    if duration is None:
+        return None
+    return int(duration * BYTES_PER_SECOND)
+
+
+class DecodedAudioStore:
+    """按文件路径保存已解码的音频，并按内存预算限制总大小
+
+    解码前先用估算大小 reserve 占位，解码完成后 put 按实际大小记账；
+    任务结束、移出队列或取消时 release。各方法可在不同线程中调用。
+    """
+
+    def __init__(self, budget_bytes=DEFAULT_BUDGET_BYTES):
+        self.budget_bytes = budget_bytes
+        self._lock = threading.Lock()
+        self._sizes = {}  # 文件路径 -> 占用字节数（含解码中的占位）
+        self._audio = {}  # 文件路径 -> 已解码数组
+        self._decode_seconds = {}  # 文件路径 -> 解码耗时，用于任务的性能指标
+
+    @property
+    def usedBytes(self):
+        with self._lock:
+            return sum(self._sizes.values())
+
+    def reserve(self, file_path, nbytes):
+        """为即将解码的文件占位，超出预算时返回 False
+
+        时长未知（nbytes 为 None）时只在没有其他占用时才允许解码，解码后再按实际大小检查。
+        """
+        with self._lock:
+            if file_path in self._sizes:
+                return False
+            used = sum(self._sizes.values())
+            if nbytes is None:
+                if used:
+                    return False
+                nbytes = 0
+            elif used + nbytes > self.budget_bytes:
+                return False
+            self._sizes[file_path] = nbytes
+            return True
+
+    def put(self, file_path, audio, decode_seconds=None):
+        """保存解码结果，超出预算时丢弃并返回 False"""
+        with self._lock:
+            others = sum(size for path, size in self._sizes.items() if path != file_path)
+            if others + audio.nbytes > self.budget_bytes:
+                self._sizes.pop(file_path, None)
+                return False
+            self._sizes[file_path] = audio.nbytes
+            self._audio[file_path] = audio
+            self._decode_seconds[file_path] = decode_seconds
+            return True
+
+    def get(self, file_path):
+        with self._lock:
+            return self._audio.get(file_path)
+
+    def decodeSeconds(self, file_path):
+        with self._lock:
+            return self._decode_seconds.get(file_path)
+
+    def contains(self, file_path):
+        """已解码或正在解码"""
+        with self._lock:
+            return file_path in self._sizes
+
+    def release(self, file_path):
+        """释放文件的占用，返回是否有占用被释放"""
+        with self._lock:
+            self._audio.pop(file_path, None)
+            self._decode_seconds.pop(file_path, None)
+            return self._sizes.pop(file_path, None) is not None
@@ -0,0 +1,187 @@
+"""计算精度和线程数的自动调优
+
+在合成音频上依次测试 计算精度 × 线程划分 的组合：每种组合创建一次模型，预热后让 num_workers 个线程
+同时转录同一段音频，按总音频时长计算实时率（RTF，越小越快），并记录模型和推理占用的峰值内存。
+测试结果按机器保存，同一台机器上同一个模型只需测试一次。
+
+内存是进程常驻内存相对测试开始时的增量，释放的内存不一定立即归还系统，只能作为粗略参考。
+"""
+import gc
+import json
+import os
+import platform
+import threading
+import time
+
+from app.common.jobMetrics import currentRss
+from app.common.whisperModelLoader import createWhisperModel, warmUpAudio, warmUpModel
+
+DEFAULT_AUTOTUNE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "video-srt-gui", "autotune.json")
+
+AUTOTUNE_COMPUTE_TYPES = ("int8", "int8_float32", "float32")
+
+# 测试音频的长度（秒）
+AUTOTUNE_SECONDS = 20
+
+# 并发任务数（num_workers）候选
+AUTOTUNE_WORKER_COUNTS = (1, 2, 4)
+
+MEMORY_SAMPLE_INTERVAL = 0.05
+
+
+def machineKey():
+    """区分机器的标识：主机名、架构、处理器和逻辑核数"""
+    return "|".join([platform.node(), platform.machine(), platform.processor(), str(os.cpu_count() or 1)])
+
+
+def modelTuneKey(model_param):
+    """同一模型在同一设备上的调优结果共用一条记录"""
+    return "|".join([os.path.abspath(model_param["model_size_or_path"]), model_param["device"],
+                     "v3" if model_param.get("use_v3_model") else ""])
+
+
+def physicalCores():
+    try:
+        import psutil
+        return psutil.cpu_count(logical=False)
+    except ImportError:
+        return None
+
+
+def threadSplits(cpu_count=None):
+    """(cpu_threads, num_workers) 候选：逻辑核平均分给各并发任务，另测只用物理核的单任务"""
+    cpu_count = cpu_count or os.cpu_count() or 1
+    splits = [(cpu_count // workers, workers) for workers in AUTOTUNE_WORKER_COUNTS if cpu_count // workers >= 1]
+    cores = physicalCores()
+    if cores and cores < cpu_count:
+        splits.append((cores, 1))
+    return list(dict.fromkeys(splits))
+
+
+def autotuneCandidates(cpu_count=None):
+    return [{"compute_type": compute_type, "cpu_threads": threads, "num_workers": workers}
+            for compute_type in AUTOTUNE_COMPUTE_TYPES for threads, workers in threadSplits(cpu_count)]
+
+
+def formatCandidate(candidate):
+    return f"{candidate['compute_type']} · {candidate['cpu_threads']} 线程 × {candidate['num_workers']} 并发"
+
+
+def formatMemory(memory_mb):
+    return f"{memory_mb:.0f} MB" if memory_mb is not None else "内存未知"
+
+
+def benchmarkCandidate(model_param, candidate, audio):
+    """测试一种组合，返回 {"rtf", "memory_mb", "load_seconds"}；不支持的精度等错误直接抛出"""
+    gc.collect()
+    baseline = currentRss()
+    peak = baseline
+    # 无法获取内存时 memory_mb 为 None
+
+    load_start = time.perf_counter()
+    model = createWhisperModel(model_param, model_param.get("use_v3_model", False), **candidate)
+    load_seconds = time.perf_counter() - load_start
+
+    try:
+        warmUpModel(model)
+
+        errors = []
+
+        def transcribeOnce():
+            try:
+                segments, _ = model.transcribe(audio, temperature=0.0, condition_on_previous_text=False)
+                for _ in segments:
+                    pass
+            except Exception as e:
+                errors.append(e)
+
+        workers = candidate["num_workers"]
+        threads = [threading.Thread(target=transcribeOnce, daemon=True) for _ in range(workers)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(MEMORY_SAMPLE_INTERVAL)
+                if baseline is not None:
+                    peak = max(peak, currentRss() or 0)
+        elapsed = time.perf_counter() - start
+        if errors:
+            raise errors[0]
+
+        audio_seconds = len(audio) / model.feature_extractor.sampling_rate * workers
+        return {
+            "rtf": elapsed / audio_seconds,
+            "memory_mb": max(peak - baseline, 0) / (1024 * 1024) if baseline is not None else None,
+            "load_seconds": load_seconds,
+        }
+    finally:
+        del model
+        gc.collect()
+
+
+def runAutotune(model_param, candidates=None, progress=None, should_stop=None):
+    """依次测试各组合，返回 (最快的结果, 全部结果)；全部失败时最快的结果为 None
+
+    progress(已完成数, 总数, 组合) 在每种组合开始前调用，should_stop() 返回 True 时提前结束。
+    """
+    candidates = candidates or autotuneCandidates()
+    audio = warmUpAudio(AUTOTUNE_SECONDS)
+    results = []
+    for index, candidate in enumerate(candidates):
+        if should_stop is not None and should_stop():
+            break
+        if progress is not None:
+            progress(index, len(candidates), candidate)
+        result = dict(candidate)
+        try:
+            result.update(benchmarkCandidate(model_param, candidate, audio))
+        except Exception as e:
+            result["error"] = str(e)
+        print(f"[autotune] {formatCandidate(candidate)}: "
+              + (f"RTF {result['rtf']:.3f}, {formatMemory(result['memory_mb'])}" if "rtf" in result
+                 else result["error"]))
+        results.append(result)
+
+    finished = [result for result in results if "rtf" in result]
+    best = min(finished, key=lambda result: result["rtf"]) if finished else None
+    return best, results
+
+
+class AutotuneStore:
+    """调优结果文件：{机器标识: {模型标识: {"best": ..., "results": [...], "time": ...}}}"""
+
+    def __init__(self, path=DEFAULT_AUTOTUNE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, model_param):
+        """本机保存的该模型的调优记录，没有时返回 None"""
+        with self._lock:
+            return self.load().get(machineKey(), {}).get(modelTuneKey(model_param))
+
+    def put(self, model_param, best, results):
+        with self._lock:
+            data = self.load()
+            data.setdefault(machineKey(), {})[modelTuneKey(model_param)] = {
+                "best": best,
+                "results": results,
+                "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+            }
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temp_path = self.path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(temp_path, self.path)
+
+
+# 全局调优结果
+autotuneStore = AutotuneStore()
@@ -0,0 +1,137 @@
+"""转录任务的性能指标
+
+每个任务记录音频时长、解码耗时、推理耗时、实时率、每秒段落数、CPU 秒数和峰值内存，
+在文件列表中作为可选列显示，并按批次导出为 CSV/JSON，用于评估硬件配置。
+
+CPU 秒数和内存是整个进程的统计：多个任务并发时包含其他任务的占用，
+多进程分片模式下包含已结束子进程的 CPU 时间。无法统计的指标记为 None，界面显示为“-”，
+不会显示为 0（Windows 没有 resource 模块，内存需要 psutil，也无法统计已结束子进程的 CPU 时间）。
+"""
+import csv
+import json
+import os
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# (字段名, 列标题)，顺序即表格列和导出文件中的列顺序
+METRIC_FIELDS = [
+    ("audio_seconds", "时长(s)"),
+    ("decode_seconds", "解码(s)"),
+    ("inference_seconds", "推理(s)"),
+    ("rtf", "RTF"),
+    ("segments_per_second", "段/秒"),
+    ("cpu_seconds", "CPU(s)"),
+    ("peak_rss_mb", "峰值内存(MB)"),
+]
+
+# 导出文件中指标之前的列
+EXPORT_FIELDS = ["file", "model", "mode", "segments"] + [name for name, _ in METRIC_FIELDS]
+
+
+def childCpuCounted():
+    """cpuSeconds 是否包含已结束子进程的 CPU 时间"""
+    return resource is not None
+
+
+def cpuSeconds():
+    """进程（有 resource 模块时含已结束的子进程）累计的用户态 + 内核态 CPU 秒数"""
+    if resource is None:
+        return time.process_time()
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime + children.ru_utime + children.ru_stime
+
+
+def currentRss():
+    """当前常驻内存字节数，无法获取时返回 None"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+
+    if resource is not None:
+        # 进程启动以来的峰值，Linux 单位为 KB，macOS 为字节
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maxrss if sys.platform == "darwin" else maxrss * 1024
+    return None
+
+
+class JobMetrics:
+    """一个任务的指标，创建时开始计时，转录过程中调用 sampleMemory 记录内存峰值"""
+
+    def __init__(self, file_path, model="", mode=""):
+        self.file_path = file_path
+        self.model = model
+        self.mode = mode
+        self.cpu_start = cpuSeconds()
+        self.peak_rss = currentRss()
+        self.values = {}
+        self.segments = 0
+
+    def sampleMemory(self):
+        rss = currentRss()
+        if rss is not None:
+            self.peak_rss = max(self.peak_rss or 0, rss)
+
+    def finish(self, audio_seconds, decode_seconds, inference_seconds, segments):
+        """结束计时并计算各项指标，返回导出用的字典"""
+        self.sampleMemory()
+        self.segments = segments
+        self.values = {
+            "audio_seconds": audio_seconds,
+            "decode_seconds": decode_seconds,
+            "inference_seconds": inference_seconds,
+            "rtf": inference_seconds / audio_seconds if audio_seconds > 0 else None,
+            "segments_per_second": segments / inference_seconds if inference_seconds > 0 else None,
+            # 多进程分片的 CPU 时间主要在子进程中，不能统计子进程时记为 None
+            "cpu_seconds": (cpuSeconds() - self.cpu_start
+                            if self.mode != "parallel" or childCpuCounted() else None),
+            "peak_rss_mb": self.peak_rss / (1024 * 1024) if self.peak_rss is not None else None,
+        }
+        return self.toDict()
+
+    def toDict(self):
+        return dict({"file": self.file_path, "model": self.model, "mode": self.mode, "segments": self.segments},
+                    **self.values)
+
+
+def formatMetric(value):
+    """表格中显示的指标文本"""
+    if value is None:
+        return "-"
+    return f"{value:.2f}" if value < 100 else f"{value:.0f}"
+
+
+def writeMetricsCsv(path, rows):
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=EXPORT_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({key: "" if value is None else value for key, value in row.items()})
+
+
+def writeMetricsJson(path, rows):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"jobs": list(rows)}, f, ensure_ascii=False, indent=2)
+
+
+def exportMetrics(output_dir, rows, prefix="transcription_metrics"):
+    """把一批任务的指标导出为同名的 CSV 和 JSON 文件，返回两个文件路径"""
+    os.makedirs(output_dir, exist_ok=True)
+    base = os.path.join(output_dir, f"{prefix}_{time.strftime('%Y%m%d_%H%M%S')}")
+    rows = list(rows)
+    writeMetricsCsv(base + ".csv", rows)
+    writeMetricsJson(base + ".json", rows)
+    return base + ".csv", base + ".json"
@@ -0,0 +1,56 @@
+"""上次成功加载的模型参数
+
+模型每次加载成功后保存加载参数，下次打开模型页面时填入界面。开启“启动时预加载”后，
+主窗口显示后立即让系统预读模型文件，并在后台按这些参数加载模型。
+"""
+import json
+import os
+
+DEFAULT_LAST_MODEL_PATH = os.path.join(os.path.expanduser("~"), ".cache", "video-srt-gui", "last_model.json")
+
+
+class LastModelStore:
+    """保存的内容：{"model_param": 加载参数, "preload": 是否启动时预加载}"""
+
+    def __init__(self, path=DEFAULT_LAST_MODEL_PATH):
+        self.path = path
+
+    def load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def modelParam(self):
+        """上次成功加载的参数，没有记录时返回 None"""
+        model_param = self.load().get("model_param")
+        return model_param if isinstance(model_param, dict) and model_param.get("model_size_or_path") else None
+
+    def preloadEnabled(self):
+        return bool(self.load().get("preload"))
+
+    def save(self, model_param):
+        data = self.load()
+        data["model_param"] = dict(model_param)
+        self.write(data)
+
+    def setPreload(self, enabled):
+        data = self.load()
+        data["preload"] = bool(enabled)
+        self.write(data)
+
+    def write(self, data):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temp_path = self.path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"保存模型参数失败: {e}")
+
+
+# 全局模型参数记录
+lastModelStore = LastModelStore()
@@ -0,0 +1,44 @@
+"""重量级依赖的延迟导入
+
+torch、torchaudio、faster_whisper、yt_dlp 导入一次要好几秒，界面模块统一通过这里的访问函数
+在真正用到时才导入，主窗口显示之前不会加载它们。
+"""
+import importlib
+import sys
+
+# 启动阶段（首个功能界面被使用之前）不应出现在 sys.modules 中的模块
+HEAVY_MODULES = ("torch", "torchaudio", "faster_whisper", "ctranslate2", "yt_dlp")
+
+
+def lazyImport(name):
+    """导入并返回模块，已导入过的直接从 sys.modules 返回"""
+    module = sys.modules.get(name)
+    if module is None:
+        module = importlib.import_module(name)
+    return module
+
+
+def getTorch():
+    return lazyImport("torch")
+
+
+def getTorchaudio():
+    return lazyImport("torchaudio")
+
+
+def getFasterWhisper():
+    return lazyImport("faster_whisper")
+
+
+def getWhisperModel():
+    """返回 faster_whisper.WhisperModel 类"""
+    return getFasterWhisper().WhisperModel
+
+
+def getYtDlp():
+    return lazyImport("yt_dlp")
+
+
+def loadedHeavyModules():
+    """返回当前已经被导入的重量级模块列表"""
+    return [name for name in HEAVY_MODULES if name in sys.modules]
@@ -0,0 +1,156 @@
+"""常驻模型池
+
+加载过的 WhisperModel 按 (模型路径, 设备, 计算精度, 是否 v3) 保存在池中，再次加载同样的模型时直接取用，
+在大模型和小模型之间切换不必重新加载。池中模型的估算内存总和超过预算时按最近使用时间淘汰，
+正在被转录任务使用的模型不会被淘汰。
+"""
+import os
+import time
+from collections import OrderedDict
+
+DEFAULT_BUDGET_BYTES = 8 * 1024 * 1024 * 1024
+
+# 模型文件一般以 float16 保存，按计算精度换算加载后的大小
+COMPUTE_TYPE_SCALE = {
+    "float32": 2.0,
+    "int8_float32": 0.5,
+    "int8": 0.5,
+    "int8_float16": 0.5,
+    "int8_bfloat16": 0.5,
+}
+
+
+def modelKey(model_param):
+    """模型池的键"""
+    return (os.path.abspath(model_param["model_size_or_path"]), model_param["device"],
+            model_param["compute_type"], bool(model_param.get("use_v3_model", False)))
+
+
+def modelLabel(key):
+    """界面上显示的模型名称"""
+    path, device, compute_type, use_v3_model = key
+    label = f"{os.path.basename(path.rstrip(os.sep)) or path} ({device}/{compute_type}"
+    return label + (", v3)" if use_v3_model else ")")
+
+
+def estimateModelBytes(model_param):
+    """按模型目录的文件大小和计算精度估算加载后的内存"""
+    path = model_param["model_size_or_path"]
+    total = 0
+    if os.path.isdir(path):
+        for root, _, files in os.walk(path):
+            for name in files:
+                try:
+                    total += os.path.getsize(os.path.join(root, name))
+                except OSError:
+                    pass
+    elif os.path.isfile(path):
+        total = os.path.getsize(path)
+    return int(total * COMPUTE_TYPE_SCALE.get(model_param["compute_type"], 1.0))
+
+
+class PoolEntry:
+    def __init__(self, key, model, model_param, nbytes):
+        self.key = key
+        self.model = model
+        self.model_param = model_param
+        self.nbytes = nbytes
+        self.label = modelLabel(key)
+        self.in_use = 0  # 正在使用该模型的任务数
+        self.last_used = time.time()
+
+
+class ModelPool:
+    """按内存预算保存多个已加载模型，只在界面线程中使用"""
+
+    def __init__(self, budget_bytes=DEFAULT_BUDGET_BYTES):
+        self.budget_bytes = budget_bytes
+        self.entries = OrderedDict()  # 键 -> PoolEntry，按最近使用排序，最后一个最近使用
+        self.listeners = []
+        # 当前默认模型：模型页面和转录页面一直引用它，淘汰也不会释放内存，因此不淘汰
+        self.default_key = None
+
+    @property
+    def usedBytes(self):
+        return sum(entry.nbytes for entry in self.entries.values())
+
+    def addListener(self, callback):
+        """池中模型变化时调用 callback()"""
+        self.listeners.append(callback)
+
+    def notify(self):
+        for callback in self.listeners:
+            callback()
+
+    def get(self, key):
+        """取出模型并标记为最近使用，不在池中时返回 None"""
+        entry = self.entries.get(key)
+        if entry is not None:
+            entry.last_used = time.time()
+            self.entries.move_to_end(key)
+        return entry
+
+    def add(self, model_param, model, nbytes=None):
+        """加入新加载的模型，超出预算时淘汰最久未使用的模型"""
+        key = modelKey(model_param)
+        if nbytes is None:
+            nbytes = estimateModelBytes(model_param)
+        entry = PoolEntry(key, model, dict(model_param), nbytes)
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        self.evict(keep=key)
+        self.notify()
+        return entry
+
+    def setDefault(self, key):
+        """设置当前默认模型，之前的默认模型可以被淘汰"""
+        self.default_key = key
+        if self.evict():
+            self.notify()
+
+    def acquire(self, key):
+        """任务开始时占用模型，占用期间不会被淘汰"""
+        entry = self.get(key)
+        if entry is not None:
+            entry.in_use += 1
+            self.notify()
+        return entry
+
+    def release(self, entry):
+        entry.in_use = max(0, entry.in_use - 1)
+        self.evict()
+        self.notify()
+
+    def remove(self, key):
+        entry = self.entries.get(key)
+        if entry is None or entry.in_use or key == self.default_key:
+            return False
+        del self.entries[key]
+        self.notify()
+        return True
+
+    def setBudget(self, budget_bytes):
+        self.budget_bytes = budget_bytes
+        if self.evict():
+            self.notify()
+
+    def evict(self, keep=None):
+        """按最近使用顺序淘汰空闲模型直到不超出预算，返回是否有模型被淘汰
+
+        keep 为刚加载的模型，即使单独超出预算也保留；当前默认模型也不淘汰。
+        """
+        evicted = False
+        for key in list(self.entries):
+            if self.usedBytes <= self.budget_bytes:
+                break
+            entry = self.entries[key]
+            if key == keep or key == self.default_key or entry.in_use:
+                continue
+            # 释放引用后由 CTranslate2 回收模型占用的内存
+            del self.entries[key]
+            evicted = True
+        return evicted
+
+
+# 全局模型池
+modelPool = ModelPool()
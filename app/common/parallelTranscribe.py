@@ -0,0 +1,199 @@
+"""单个长文件的多进程分片转录
+
+整段音频解码为 16kHz 单声道后放入共享内存，在目标切分点附近能量最低处切成 N 段，
+由 N 个子进程各自加载一份 CPU 模型（线程数平分 cpu_threads）并行转录，
+各段时间戳加上片段起点后按顺序拼接，SRT 序号由 TranscriptWriter 统一重新编号。
+
+子进程使用 spawn 方式启动，只导入本模块及其依赖，不会创建界面。
+"""
+import multiprocessing
+import os
+import sys
+from multiprocessing import shared_memory
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.common.speechMap import SAMPLING_RATE, decodeAudio, intersectRegions
+from app.common.transcriptionCache import segmentFromDict, segmentToDict
+from app.common.whisperModelLoader import createWhisperModel
+
+# 在目标切分点前后该秒数内寻找能量最低的位置
+SPLIT_SEARCH_SECONDS = 30.0
+
+# 计算能量时的帧长（秒）
+SPLIT_FRAME_SECONDS = 0.1
+
+# 每个片段至少的秒数，音频较短时减少进程数
+MIN_PIECE_SECONDS = 60.0
+
+# 子进程中的模型，由 initProcess 创建
+_process_model = None
+
+
+def findSplitPoints(audio, pieces, search_seconds=SPLIT_SEARCH_SECONDS, frame_seconds=SPLIT_FRAME_SECONDS):
+    """在 N 等分点附近找能量最低的帧中心作为切分点，返回递增的采样点下标"""
+    frame = max(1, int(SAMPLING_RATE * frame_seconds))
+    search = int(SAMPLING_RATE * search_seconds)
+    total = len(audio)
+
+    points = []
+    for i in range(1, pieces):
+        target = total * i // pieces
+        low, high = max(0, target - search), min(total, target + search)
+        frames = (high - low) // frame
+        if frames < 1:
+            points.append(target)
+            continue
+        window = audio[low:low + frames * frame].reshape(frames, frame)
+        energy = np.einsum("ij,ij->i", window, window)
+        points.append(low + int(np.argmin(energy)) * frame + frame // 2)
+
+    return sorted(set(point for point in points if 0 < point < total))
+
+
+def pieceClips(clip_timestamps, start, end):
+    """把整段音频的 clip_timestamps 换算为片段内的相对时间
+
+    没有 clip_timestamps 时返回 None（转录整个片段）；与片段没有交集时返回空列表（跳过该片段）。
+    """
+    if not clip_timestamps:
+        return None
+    regions = intersectRegions([(start, end)], clip_timestamps)
+    return [round(point - start, 3) for region in regions for point in region]
+
+
+def shiftSegmentDict(item, offset):
+    """片段内的时间戳加上片段起点"""
+    item["start"] += offset
+    item["end"] += offset
+    for word in item.get("words") or ():
+        word[0] += offset
+        word[1] += offset
+    return item
+
+
+def initProcess(model_param, use_v3_model, cpu_threads):
+    """子进程初始化：在 CPU 上加载模型"""
+    global _process_model
+    _process_model = createWhisperModel(model_param, use_v3_model, device="cpu", device_index=0,
+                                        cpu_threads=cpu_threads, num_workers=1)
+
+
+def attachSharedMemory(name):
+    """附加到主进程创建的共享内存，由主进程负责释放
+
+    spawn 启动的子进程与主进程共用同一个 resource_tracker，附加时的重复登记不会让共享内存被提前释放；
+    子进程不能取消登记，否则会把主进程的登记一并删除，主进程释放时 tracker 报错，主进程崩溃时也不再自动清理。
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    return shared_memory.SharedMemory(name=name)
+
+
+def transcribePiece(shm_name, total_samples, start, end, params):
+    """子进程中转录一个片段，返回片段内的相对时间戳段落"""
+    shm = attachSharedMemory(shm_name)
+    try:
+        audio = np.ndarray((total_samples,), dtype=np.float32, buffer=shm.buf)[start:end].copy()
+    finally:
+        shm.close()
+
+    segments, info = _process_model.transcribe(audio, **params)
+    return {
+        "segments": [segmentToDict(segment) for segment in segments],
+        "language": info.language,
+        "language_probability": info.language_probability,
+    }
+
+
+class ParallelTranscriber:
+    """调用方式与 WhisperModel.transcribe 一致，返回 (段落生成器, info)
+
+    model 为已加载的主模型，只用于检测语言，保证各片段使用同一种语言；
+    cancel_check 在等待片段结果时定期调用，返回 True 时停止并终止子进程。
+    """
+
+    def __init__(self, model, model_param, processes=2, cancel_check=None):
+        self.model = model
+        self.model_param = model_param
+        self.processes = max(1, int(processes))
+        self.cancel_check = cancel_check
+
+    def transcribe(self, audio, **params):
+        if isinstance(audio, str):
+            audio = decodeAudio(audio)
+        audio = np.ascontiguousarray(audio, dtype=np.float32)
+        duration = len(audio) / SAMPLING_RATE
+
+        params = dict(params)
+        clips = params.pop("clip_timestamps", None)
+        if params.get("language") is None:
+            params["language"], language_probability = self.detectLanguage(audio, clips)
+        else:
+            language_probability = 1.0
+        info = SimpleNamespace(language=params["language"], language_probability=language_probability,
+                               duration=duration)
+
+        pieces = max(1, min(self.processes, int(duration // MIN_PIECE_SECONDS)))
+        points = [0] + findSplitPoints(audio, pieces) + [len(audio)]
+
+        tasks = []
+        for start, end in zip(points[:-1], points[1:]):
+            piece_params = dict(params)
+            piece_clips = pieceClips(clips, start / SAMPLING_RATE, end / SAMPLING_RATE)
+            if piece_clips is not None:
+                if not piece_clips:
+                    continue
+                piece_params["clip_timestamps"] = piece_clips
+            tasks.append((start, end, piece_params))
+
+        return self.iterSegments(audio, tasks), info
+
+    def detectLanguage(self, audio, clips):
+        """用主模型检测第一个转录区间开头的语言"""
+        if not self.model.model.is_multilingual:
+            return "en", 1.0
+        start = int(clips[0] * SAMPLING_RATE) if clips else 0
+        language, probability, _ = self.model.detect_language(audio[start:])
+        return language, probability
+
+    def iterSegments(self, audio, tasks):
+        """按片段顺序输出段落，前面的片段完成后即可写出，不必等所有进程结束"""
+        if not tasks:
+            return
+
+        shm = shared_memory.SharedMemory(create=True, size=audio.nbytes)
+        pool = None
+        try:
+            np.ndarray(audio.shape, dtype=np.float32, buffer=shm.buf)[:] = audio
+            total_samples = len(audio)
+            del audio
+
+            processes = len(tasks)
+            total_threads = int(self.model_param.get("cpu_threads") or 0) or os.cpu_count() or 1
+            context = multiprocessing.get_context("spawn")
+            pool = context.Pool(
+                processes,
+                initializer=initProcess,
+                initargs=(self.model_param, self.model_param.get("use_v3_model", False),
+                          max(1, total_threads // processes)),
+            )
+            results = [pool.apply_async(transcribePiece, (shm.name, total_samples, start, end, params))
+                       for start, end, params in tasks]
+
+            for (start, _, _), result in zip(tasks, results):
+                while not result.ready():
+                    if self.cancel_check is not None and self.cancel_check():
+                        return
+                    result.wait(0.2)
+                offset = start / SAMPLING_RATE
+                for item in result.get()["segments"]:
+                    yield segmentFromDict(shiftSegmentDict(item, offset))
+        finally:
+            # 取消或出错时直接终止子进程，不等待剩余片段
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+            shm.close()
+            shm.unlink()
@@ -0,0 +1,262 @@
+"""根据保存的单词时间戳重新断句
+
+修改每行字数、最长时长等排版规则时不需要重新转录：读取 .timings 中的单词时间戳，按新规则重新组合成字幕条，
+再生成 SRT/VTT。单词宽度、标点、停顿等特征都用 numpy 对整个单词数组一次算出，
+断句时每条字幕只需在累计宽度和结束时间数组上二分查找，一个文件夹的字幕几秒内即可重新生成。
+
+宽度按半角字符计算，中日韩文字和全角符号占 2 个宽度。
+"""
+import os
+from types import SimpleNamespace
+
+from app.common.lazyModules import lazyImport
+from app.common.timingStore import EXTENSION, Timings
+from app.common.transcriptWriter import TranscriptWriter
+
+DEFAULT_LAYOUT_OPTIONS = {
+    "max_line_width": 42,  # 每行最大宽度（半角字符）
+    "max_lines": 2,  # 每条字幕最多行数
+    "min_duration": 1.0,  # 最短显示时间（秒），不足时在不与下一条重叠的前提下延长
+    "max_duration": 7.0,  # 最长显示时间（秒）
+    "max_gap": 1.5,  # 单词之间的停顿超过该秒数时强制断开
+    "split_on_punctuation": True,  # 优先在句末/句中标点处断开
+}
+
+RESEGMENT_FORMATS = ("srt", "vtt")
+
+# 优先断开的标点：句末标点优先于句中标点
+STRONG_PUNCTUATION = "。！？!?.…；;"
+WEAK_PUNCTUATION = "，、,:：—"
+
+# 没有标点时，停顿超过该毫秒数的位置也可以作为断点
+PAUSE_BREAK_MS = 300
+
+# 显示宽度为 2 的码位范围（中日韩文字、假名、谚文、全角符号）
+WIDE_RANGES = (
+    (0x1100, 0x115F),
+    (0x2E80, 0xA4CF),
+    (0xAC00, 0xD7A3),
+    (0xF900, 0xFAFF),
+    (0xFE30, 0xFE4F),
+    (0xFF00, 0xFF60),
+    (0xFFE0, 0xFFE6),
+    (0x1F300, 0x1FAFF),
+    (0x20000, 0x3FFFD),
+)
+
+
+def decodeCodepoints(blob):
+    """把 UTF-8 字节数组解码为 (每个字符首字节的位置, 码位)"""
+    np = lazyImport("numpy")
+    data = np.asarray(blob, dtype=np.uint8)
+    lead = np.flatnonzero((data & 0xC0) != 0x80)
+    padded = np.concatenate([data, np.zeros(3, dtype=np.uint8)]).astype(np.int64)
+    b0 = padded[lead]
+    b1 = padded[lead + 1] & 0x3F
+    b2 = padded[lead + 2] & 0x3F
+    b3 = padded[lead + 3] & 0x3F
+    codepoints = np.select(
+        [b0 < 0x80, b0 < 0xE0, b0 < 0xF0],
+        [b0, ((b0 & 0x1F) << 6) | b1, ((b0 & 0x0F) << 12) | (b1 << 6) | b2],
+        ((b0 & 0x07) << 18) | (b1 << 12) | (b2 << 6) | b3)
+    return lead, codepoints
+
+
+def charWidths(codepoints):
+    np = lazyImport("numpy")
+    wide = np.zeros(len(codepoints), dtype=bool)
+    for low, high in WIDE_RANGES:
+        wide |= (codepoints >= low) & (codepoints <= high)
+    return np.where(wide, 2, 1)
+
+
+def wordFeatures(timings):
+    """返回每个单词的 (显示宽度, 是否以空格开头, 标点级别 0/1/2)"""
+    np = lazyImport("numpy")
+    lead, codepoints = decodeCodepoints(timings.word_text)
+    char_offsets = np.searchsorted(lead, np.asarray(timings.word_text_offsets))
+    first, last = char_offsets[:-1], char_offsets[1:]
+    non_empty = last > first
+
+    cumulative = np.concatenate([[0], np.cumsum(charWidths(codepoints))])
+    widths = cumulative[last] - cumulative[first]
+
+    padded = np.append(codepoints, -1)
+    lead_space = non_empty & (padded[first] == 0x20)
+    last_char = np.where(non_empty, padded[np.maximum(last - 1, 0)], -1)
+    punctuation = np.where(np.isin(last_char, [ord(c) for c in STRONG_PUNCTUATION]), 2,
+                           np.where(np.isin(last_char, [ord(c) for c in WEAK_PUNCTUATION]), 1, 0))
+    return widths, lead_space.astype(np.int64), punctuation
+
+
+class CueLayout:
+    """在单词数组上断句和分行"""
+
+    def __init__(self, timings, options=None):
+        np = lazyImport("numpy")
+        self.options = dict(DEFAULT_LAYOUT_OPTIONS, **(options or {}))
+        if timings.wordCount == 0:
+            raise ValueError("没有单词时间戳，无法重新断句（转录时需要开启单词级时间戳）")
+
+        self.timings = timings
+        self.count = timings.wordCount
+        self.starts = np.asarray(timings.word_start, dtype=np.int64)
+        # 结束时间取前缀最大值，保证单调，可以二分查找
+        self.ends = np.maximum.accumulate(np.maximum(np.asarray(timings.word_end, dtype=np.int64), self.starts))
+        widths, self.lead_space, self.punctuation = wordFeatures(timings)
+        self.cum_width = np.concatenate([[0], np.cumsum(widths)])
+        self.gaps = np.concatenate([[0], self.starts[1:] - self.ends[:-1]])  # 单词 k 之前的停顿
+
+        # 强制断点：停顿过长的单词之前
+        max_gap_ms = int(self.options["max_gap"] * 1000)
+        self.hard_breaks = np.append(np.flatnonzero(self.gaps > max_gap_ms), self.count)
+
+        self.line_width = max(1, int(self.options["max_line_width"]))
+        self.max_lines = max(1, int(self.options["max_lines"]))
+
+    def width(self, first, end):
+        """单词 [first, end) 组成一行的宽度，不计行首空格"""
+        return int(self.cum_width[end] - self.cum_width[first] - self.lead_space[first])
+
+    def lineEnd(self, first, end):
+        """从单词 first 开始的一行最多放到哪个单词之前（不超过 end），单个单词超过行宽时也放一个"""
+        np = lazyImport("numpy")
+        limit = self.cum_width[first] + self.lead_space[first] + self.line_width
+        return max(first + 1, min(end, int(np.searchsorted(self.cum_width, limit, side="right")) - 1))
+
+    def lineEnds(self, first, end):
+        """单词 first..end - 1 各自作为行首时这一行最多放到哪个单词之前，与 lineEnd 相同，一次二分查找算出"""
+        np = lazyImport("numpy")
+        limits = self.cum_width[first:end] + self.lead_space[first:end] + self.line_width
+        ends = np.searchsorted(self.cum_width[first:end + 1], limits, side="right") - 1 + first
+        return np.clip(ends, np.arange(first + 1, end + 1), end)
+
+    def linesNeeded(self, line_ends, first, end):
+        """从单词 first..end 开始逐行填满到 end 时需要的行数（即最少行数），下标相对于 first
+
+        每轮把所有位置同时前进一行，轮数等于从 first 开始的行数。
+        """
+        np = lazyImport("numpy")
+        size = end - first
+        following = np.append(line_ends - first, size)
+        position = np.arange(size + 1)
+        counts = np.zeros(size + 1, dtype=np.int64)
+        active = position < size
+        while active.any():
+            counts += active
+            position = following[position]
+            active = position < size
+        return counts
+
+    def cueRanges(self):
+        """把单词分成字幕条，返回 [(首个单词, 末尾单词 + 1), ...]"""
+        np = lazyImport("numpy")
+        max_duration_ms = int(self.options["max_duration"] * 1000)
+
+        ranges = []
+        first = 0
+        while first < self.count:
+            limit = int(self.hard_breaks[np.searchsorted(self.hard_breaks, first, side="right")])
+            # 逐行填满 max_lines 行能放下的单词，每行都不超过行宽
+            by_width = first
+            for _ in range(self.max_lines):
+                if by_width >= limit:
+                    break
+                by_width = self.lineEnd(by_width, limit)
+            by_time = int(np.searchsorted(self.ends, self.starts[first] + max_duration_ms, side="right"))
+            end = max(first + 1, min(limit, by_width, by_time))
+            if end < limit:
+                end = self.chooseBreak(first, end)
+            ranges.append((first, end))
+            first = end
+        return ranges
+
+    def chooseBreak(self, first, end):
+        """字幕条装满时，在后半段中选择断点：句末标点 > 句中标点 > 最长停顿"""
+        np = lazyImport("numpy")
+        half = self.cum_width[first] + (self.cum_width[end] - self.cum_width[first]) / 2
+        low = max(first + 1, int(np.searchsorted(self.cum_width, half, side="left")))
+        if low > end:
+            return end
+
+        if self.options["split_on_punctuation"]:
+            # 断点 k 表示在单词 k - 1 之后断开
+            levels = self.punctuation[low - 1:end]
+            best = int(levels.max())
+            if best > 0:
+                return low + int(np.flatnonzero(levels == best)[-1])
+
+        gaps = self.gaps[low:end + 1]
+        position = int(np.argmax(gaps))
+        if gaps[position] >= PAUSE_BREAK_MS:
+            return low + position
+        return end
+
+    def lineBreaks(self, first, end):
+        """把一条字幕分成最少的行数，在每行不超过行宽的前提下使各行宽度接近，返回每行的起始单词下标"""
+        np = lazyImport("numpy")
+        total = self.width(first, end)
+        line_ends = self.lineEnds(first, end)
+        needed = self.linesNeeded(line_ends, first, end)
+        lines = int(needed[0])
+        breaks = [first]
+        for line in range(1, lines):
+            target = self.cum_width[first] + self.lead_space[first] + total * line / lines
+            line_end = int(line_ends[breaks[-1] - first])
+            # 本行不超过行宽，剩下的单词还能放进剩下的行
+            candidates = np.arange(breaks[-1] + 1, min(line_end, end - 1) + 1)
+            candidates = candidates[needed[candidates - first] <= lines - line]
+            if len(candidates) == 0:
+                breaks.append(line_end)
+                continue
+            distance = np.abs(self.cum_width[candidates] - target)
+            if self.options["split_on_punctuation"]:
+                # 距离相差不到四分之一行宽时，优先在标点后换行
+                distance = distance - (self.punctuation[candidates - 1] > 0) * (self.line_width / 4)
+            breaks.append(int(candidates[np.argmin(distance)]))
+        return breaks
+
+    def text(self, first, end):
+        offsets = self.timings.word_text_offsets
+        lines = []
+        breaks = self.lineBreaks(first, end) + [end]
+        for line_first, line_end in zip(breaks, breaks[1:]):
+            raw = bytes(self.timings.word_text[offsets[line_first]:offsets[line_end]])
+            lines.append(raw.decode("utf-8", errors="replace").strip())
+        return "\n".join(line for line in lines if line)
+
+    def cues(self):
+        """生成与 Segment 属性一致的字幕条，可直接交给 TranscriptWriter"""
+        np = lazyImport("numpy")
+        ranges = self.cueRanges()
+        firsts = np.array([first for first, _ in ranges])
+        lasts = np.array([end - 1 for _, end in ranges])
+        starts = self.starts[firsts]
+        ends = self.ends[lasts]
+
+        # 过短的字幕条延长到最短时长，但不超过下一条的开始
+        min_duration_ms = int(self.options["min_duration"] * 1000)
+        next_starts = np.append(starts[1:], np.iinfo(np.int64).max)
+        ends = np.maximum(ends, np.minimum(starts + min_duration_ms, next_starts))
+
+        return [SimpleNamespace(start=start / 1000, end=end_ms / 1000, text=self.text(first, end), words=None)
+                for (first, end), start, end_ms in zip(ranges, starts.tolist(), ends.tolist())]
+
+
+def resegmentFile(timings_path, options=None, formats=RESEGMENT_FORMATS, output_dir=None):
+    """按新规则重新生成一个 .timings 对应的字幕，返回字幕条数"""
+    timings = Timings(timings_path)
+    cues = CueLayout(timings, options).cues()
+    base_name = os.path.splitext(os.path.basename(timings_path))[0]
+    with TranscriptWriter(output_dir or os.path.dirname(timings_path), base_name, formats) as writer:
+        for cue in cues:
+            writer.write(cue)
+        writer.info = timings.info
+    return len(cues)
+
+
+def findTimingsFiles(folder):
+    paths = []
+    for root, _, files in os.walk(folder):
+        paths.extend(os.path.join(root, name) for name in files if name.endswith("." + EXTENSION))
+    return sorted(paths)
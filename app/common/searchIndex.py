@@ -0,0 +1,226 @@
+"""转录结果全文索引
+
+使用 SQLite FTS5 为生成的字幕保存 段落文本 + 所属文件 + 起止毫秒。转录界面每完成一个任务就把它的段落
+写入索引；在程序外新增或修改的字幕文件，通过比较文件的修改时间和大小增量同步。
+中日韩文本没有空格分词，FTS5 使用 trigram 分词器做子串匹配，少于 3 个字符的查询退回 LIKE 扫描。
+
+每个线程使用各自的数据库连接，可以在工作线程中写入索引。
+"""
+import json
+import os
+import re
+import sqlite3
+import threading
+
+DEFAULT_INDEX_PATH = os.path.join(os.path.expanduser("~"), ".cache", "video-srt-gui", "search_index.sqlite3")
+
+# 同一转录结果有多种格式时，只索引优先级最高的一个
+INDEXED_EXTENSIONS = (".srt", ".vtt", ".json")
+
+# trigram 分词器的最短查询长度
+TRIGRAM_MIN_LENGTH = 3
+
+TIMESTAMP_LINE = re.compile(
+    r"(?:(\d+):)?(\d{1,2}):(\d{2})[,.](\d{3})\s*-->\s*(?:(\d+):)?(\d{1,2}):(\d{2})[,.](\d{3})")
+
+
+def timestampToMs(hours, minutes, seconds, milliseconds):
+    return ((int(hours or 0) * 60 + int(minutes)) * 60 + int(seconds)) * 1000 + int(milliseconds)
+
+
+def parseSubtitle(path):
+    """解析 SRT/WebVTT，返回 [(开始毫秒, 结束毫秒, 文本), ...]"""
+    with open(path, encoding="utf-8", errors="replace") as f:
+        lines = f.read().splitlines()
+
+    segments = []
+    i = 0
+    while i < len(lines):
+        match = TIMESTAMP_LINE.search(lines[i])
+        i += 1
+        if not match:
+            continue
+        groups = match.groups()
+        text_lines = []
+        while i < len(lines) and lines[i].strip():
+            text_lines.append(lines[i].strip())
+            i += 1
+        segments.append((timestampToMs(*groups[:4]), timestampToMs(*groups[4:]), " ".join(text_lines)))
+    return segments
+
+
+def parseJsonTranscript(path):
+    """解析 TranscriptWriter 输出的 JSON"""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return [(int(round(item["start"] * 1000)), int(round(item["end"] * 1000)), item["text"])
+            for item in data.get("segments", [])]
+
+
+def parseTranscript(path):
+    if path.lower().endswith(".json"):
+        return parseJsonTranscript(path)
+    return parseSubtitle(path)
+
+
+class SearchHit:
+    __slots__ = ("path", "media_path", "start_ms", "end_ms", "text")
+
+    def __init__(self, path, media_path, start_ms, end_ms, text):
+        self.path = path
+        self.media_path = media_path
+        self.start_ms = start_ms
+        self.end_ms = end_ms
+        self.text = text
+
+
+class SearchIndex:
+    """字幕段落的全文索引"""
+
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        self.path = path
+        self._local = threading.local()
+
+    def connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self.ensureSchema(conn)
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def ensureSchema(conn):
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS files (
+                id INTEGER PRIMARY KEY,
+                path TEXT UNIQUE NOT NULL,
+                media_path TEXT,
+                mtime REAL NOT NULL,
+                size INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS segments (
+                id INTEGER PRIMARY KEY,
+                file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+                start_ms INTEGER NOT NULL,
+                end_ms INTEGER NOT NULL,
+                text TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS segments_file ON segments(file_id);
+            CREATE TRIGGER IF NOT EXISTS segments_ai AFTER INSERT ON segments BEGIN
+                INSERT INTO segments_fts(rowid, text) VALUES (new.id, new.text);
+            END;
+            CREATE TRIGGER IF NOT EXISTS segments_ad AFTER DELETE ON segments BEGIN
+                INSERT INTO segments_fts(segments_fts, rowid, text) VALUES ('delete', old.id, old.text);
+            END;
+        """)
+        conn.execute("PRAGMA foreign_keys=ON")
+        try:
+            conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS segments_fts USING fts5("
+                         "text, content='segments', content_rowid='id', tokenize='trigram')")
+        except sqlite3.OperationalError:
+            # SQLite 3.34 之前没有 trigram 分词器
+            conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS segments_fts USING fts5("
+                         "text, content='segments', content_rowid='id')")
+        conn.commit()
+
+    def indexSegments(self, path, segments, media_path=None):
+        """写入（替换）一个字幕文件的段落，segments 为 [(开始毫秒, 结束毫秒, 文本), ...]"""
+        stat = os.stat(path)
+        conn = self.connection()
+        with conn:
+            row = conn.execute("SELECT id, media_path FROM files WHERE path = ?", (path,)).fetchone()
+            if row is None:
+                file_id = conn.execute("INSERT INTO files(path, media_path, mtime, size) VALUES (?, ?, ?, ?)",
+                                       (path, media_path, stat.st_mtime, stat.st_size)).lastrowid
+            else:
+                file_id = row[0]
+                conn.execute("UPDATE files SET media_path = ?, mtime = ?, size = ? WHERE id = ?",
+                             (media_path or row[1], stat.st_mtime, stat.st_size, file_id))
+                conn.execute("DELETE FROM segments WHERE file_id = ?", (file_id,))
+            conn.executemany("INSERT INTO segments(file_id, start_ms, end_ms, text) VALUES (?, ?, ?, ?)",
+                             ((file_id, start, end, text.strip()) for start, end, text in segments))
+
+    def indexFile(self, path, media_path=None):
+        self.indexSegments(path, parseTranscript(path), media_path)
+
+    def removeFile(self, path):
+        conn = self.connection()
+        with conn:
+            conn.execute("DELETE FROM files WHERE path = ?", (path,))
+
+    def sync(self, root):
+        """增量同步目录：重新索引新增或修改过的字幕，删除已不存在的文件，返回 (更新数, 删除数)"""
+        root = os.path.abspath(root)
+        chosen = {}
+        for dirpath, _, files in os.walk(root):
+            for name in files:
+                stem, ext = os.path.splitext(name)
+                ext = ext.lower()
+                if ext not in INDEXED_EXTENSIONS:
+                    continue
+                key = os.path.join(dirpath, stem)
+                current = chosen.get(key)
+                if current is None or INDEXED_EXTENSIONS.index(ext) < INDEXED_EXTENSIONS.index(current[1]):
+                    chosen[key] = (os.path.join(dirpath, name), ext)
+        wanted = {path for path, _ in chosen.values()}
+
+        conn = self.connection()
+        known = {path: (mtime, size) for path, mtime, size in conn.execute(
+            "SELECT path, mtime, size FROM files WHERE path >= ? AND path < ?", (root + os.sep, root + chr(ord(os.sep) + 1)))}
+
+        removed = 0
+        for path in known:
+            if path not in wanted and (not os.path.exists(path) or path.lower().endswith(INDEXED_EXTENSIONS)):
+                self.removeFile(path)
+                removed += 1
+
+        updated = 0
+        for path in wanted:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if known.get(path) == (stat.st_mtime, stat.st_size):
+                continue
+            try:
+                self.indexFile(path)
+                updated += 1
+            except (OSError, ValueError) as e:
+                print(f"索引字幕文件失败: {path}: {str(e)}")
+        return updated, removed
+
+    def search(self, query, limit=500):
+        """返回匹配的段落，FTS 查询按相关度排序"""
+        query = query.strip()
+        if not query:
+            return []
+
+        conn = self.connection()
+        if len(query) >= TRIGRAM_MIN_LENGTH:
+            rows = conn.execute(
+                "SELECT files.path, files.media_path, segments.start_ms, segments.end_ms, segments.text "
+                "FROM segments_fts JOIN segments ON segments.id = segments_fts.rowid "
+                "JOIN files ON files.id = segments.file_id "
+                "WHERE segments_fts MATCH ? ORDER BY segments_fts.rank LIMIT ?",
+                ('"' + query.replace('"', '""') + '"', limit))
+        else:
+            escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            rows = conn.execute(
+                "SELECT files.path, files.media_path, segments.start_ms, segments.end_ms, segments.text "
+                "FROM segments JOIN files ON files.id = segments.file_id "
+                "WHERE segments.text LIKE ? ESCAPE '\\' ORDER BY files.path, segments.start_ms LIMIT ?",
+                (f"%{escaped}%", limit))
+        return [SearchHit(*row) for row in rows]
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+# 全局索引
+searchIndex = SearchIndex()
@@ -0,0 +1,115 @@
+"""语音活动检测（VAD）预处理
+
+转录前先对整段音频运行 faster-whisper 自带的 Silero VAD，得到语音区间表。没有任何语音的文件在占用
+模型之前直接跳过；其余文件只把语音区间通过 clip_timestamps 交给模型，并统计跳过的静音秒数。
+"""
+from app.common.lazyModules import lazyImport
+
+SAMPLING_RATE = 16000
+
+# 间隔小于该秒数的相邻语音区间合并为一段，避免大量很短的分段各自占用一个解码窗口
+MERGE_GAP = 1.0
+
+# 参数设置界面中 VAD 参数的默认值，与 faster-whisper 的 VadOptions 一致
+DEFAULT_VAD_PARAMETERS = {
+    "threshold": 0.5,
+    "min_speech_duration_ms": 250,
+    "min_silence_duration_ms": 2000,
+    "speech_pad_ms": 400,
+}
+
+
+class SpeechMap:
+    """一个文件的语音区间表，区间单位为秒"""
+
+    def __init__(self, duration, regions):
+        self.duration = duration
+        self.regions = regions
+
+    @property
+    def speechSeconds(self):
+        return sum(end - start for start, end in self.regions)
+
+    @property
+    def skippedSeconds(self):
+        return max(0.0, self.duration - self.speechSeconds)
+
+    def hasSpeech(self):
+        return bool(self.regions)
+
+    def summary(self):
+        if not self.duration:
+            return "跳过静音 0 秒"
+        return f"跳过静音 {self.skippedSeconds:.0f} 秒 ({self.skippedSeconds / self.duration * 100:.0f}%)"
+
+
+def decodeAudio(file_path):
+    """解码为 16kHz 单声道 float32 数组"""
+    return lazyImport("faster_whisper.audio").decode_audio(file_path, sampling_rate=SAMPLING_RATE)
+
+
+def probeDuration(file_path):
+    """读取容器头中的时长（秒），不解码；无法得到时返回 None"""
+    try:
+        with lazyImport("av").open(file_path) as container:
+            if container.duration:
+                return container.duration / 1000000  # av.time_base
+    except Exception:
+        pass
+    return None
+
+
+def detectSpeech(audio, vad_parameters=None):
+    """对已解码的音频运行 VAD，返回 SpeechMap"""
+    vad = lazyImport("faster_whisper.vad")
+    options = vad.VadOptions(**dict(DEFAULT_VAD_PARAMETERS, **(vad_parameters or {})))
+    timestamps = vad.get_speech_timestamps(audio, options)
+
+    regions = []
+    for item in timestamps:
+        start, end = item["start"] / SAMPLING_RATE, item["end"] / SAMPLING_RATE
+        if regions and start - regions[-1][1] < MERGE_GAP:
+            regions[-1] = (regions[-1][0], end)
+        else:
+            regions.append((start, end))
+
+    return SpeechMap(len(audio) / SAMPLING_RATE, regions)
+
+
+def buildSpeechMap(file_path, vad_parameters=None):
+    """解码文件并生成语音区间表"""
+    return detectSpeech(decodeAudio(file_path), vad_parameters)
+
+
+def intersectRegions(regions, clip_timestamps):
+    """语音区间与手动分段 [起, 止, 起, 止, ...] 求交集，最后一段可以没有结束时间"""
+    if not clip_timestamps:
+        return list(regions)
+
+    points = list(clip_timestamps)
+    if len(points) % 2:
+        points.append(float("inf"))
+    clips = list(zip(points[0::2], points[1::2]))
+
+    result = []
+    for start, end in regions:
+        for clip_start, clip_end in clips:
+            overlap_start, overlap_end = max(start, clip_start), min(end, clip_end)
+            if overlap_end > overlap_start:
+                result.append((overlap_start, overlap_end))
+    return sorted(result)
+
+
+def applySpeechMap(params, speech_map):
+    """只转录语音区间：去掉 transcribe 自带的 VAD，改为用 clip_timestamps 指定语音区间"""
+    params = dict(params)
+    params.pop("vad_filter", None)
+    params.pop("vad_parameters", None)
+
+    regions = intersectRegions(speech_map.regions, params.get("clip_timestamps"))
+    if regions:
+        params["clip_timestamps"] = [point for region in regions for point in region]
+    else:
+        # 空列表会被 faster-whisper 当作从头转录，从音频结尾开始则不会产生任何段落
+        params["clip_timestamps"] = [speech_map.duration]
+    return params
@@ -0,0 +1,157 @@
+"""启动耗时报告
+
+`python main.py --startup-report [路径]` 时启用，记录解释器启动、各顶层模块导入、主窗口各子界面构造、
+initNavigation 以及首次显示/首次绘制的耗时，输出 JSON 文件并在控制台打印按耗时排序的表格。
+未启用时所有记录接口都是空操作。
+"""
+import builtins
+import json
+import os
+import sys
+import time
+import unicodedata
+from contextlib import contextmanager
+
+from app.common.lazyModules import loadedHeavyModules
+
+
+def processUptime():
+    """进程创建至今经过的秒数，无法获取时返回 None"""
+    try:
+        import psutil
+        return time.time() - psutil.Process().create_time()
+    except ImportError:
+        pass
+
+    # Linux 下没有 psutil 时读取 /proc
+    try:
+        with open("/proc/self/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        # starttime 是 stat 的第 22 个字段，单位为时钟滴答
+        return uptime - int(fields[19]) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def displayWidth(text):
+    """文本在控制台中的显示宽度，中日韩全角字符按 2 计算"""
+    return sum(2 if unicodedata.east_asian_width(char) in "WF" else 1 for char in text)
+
+
+def padText(text, width):
+    return text + " " * max(0, width - displayWidth(text))
+
+
+class StartupReport:
+    """启动阶段耗时记录器"""
+
+    def __init__(self):
+        self.enabled = False
+        self.output_path = None
+        self.origin = time.perf_counter()
+        self.records = []
+        self.depth = 0
+        self.imported = set()
+        self.original_import = None
+
+    def enable(self, output_path):
+        """启用记录，以调用时刻为计时原点，并记录解释器启动耗时"""
+        self.enabled = True
+        self.output_path = output_path
+        self.origin = time.perf_counter()
+
+        interpreter_time = processUptime()
+        if interpreter_time is not None:
+            self.records.append({
+                "phase": "解释器启动",
+                "start": -interpreter_time,
+                "duration": interpreter_time,
+                "depth": 0,
+            })
+
+        self.installImportHook()
+
+    @contextmanager
+    def phase(self, name):
+        """记录 with 块的耗时"""
+        if not self.enabled:
+            yield
+            return
+
+        record = {"phase": name, "start": time.perf_counter() - self.origin, "duration": None, "depth": self.depth}
+        self.records.append(record)
+        self.depth += 1
+        try:
+            yield
+        finally:
+            self.depth -= 1
+            record["duration"] = time.perf_counter() - self.origin - record["start"]
+
+    def mark(self, name):
+        """记录一个时间点（如首次绘制），耗时为距计时原点的时间"""
+        if not self.enabled:
+            return
+
+        elapsed = time.perf_counter() - self.origin
+        self.records.append({"phase": name, "start": elapsed, "duration": elapsed, "depth": 0})
+
+    def installImportHook(self):
+        """替换 __import__，记录每个顶层模块第一次导入的耗时（包含其依赖的导入）"""
+        if self.original_import is not None:
+            return
+
+        original_import = builtins.__import__
+        self.original_import = original_import
+        self.imported.update(name.partition(".")[0] for name in sys.modules)
+
+        def timedImport(name, globals=None, locals=None, fromlist=(), level=0):
+            top_name = name.partition(".")[0]
+            if level or not top_name or top_name in self.imported:
+                return original_import(name, globals, locals, fromlist, level)
+
+            self.imported.add(top_name)
+            with self.phase(f"import {top_name}"):
+                return original_import(name, globals, locals, fromlist, level)
+
+        builtins.__import__ = timedImport
+
+    def uninstallImportHook(self):
+        if self.original_import is not None:
+            builtins.__import__ = self.original_import
+            self.original_import = None
+
+    def write(self, printTable=True):
+        """写入 JSON 文件，并打印排序后的表格"""
+        if not self.enabled:
+            return
+
+        records = [record for record in self.records if record["duration"] is not None]
+        report = {
+            "python": sys.version,
+            "argv": sys.argv,
+            "heavy_modules_loaded": loadedHeavyModules(),
+            "phases": records,
+        }
+
+        output_dir = os.path.dirname(os.path.abspath(self.output_path))
+        os.makedirs(output_dir, exist_ok=True)
+        with open(self.output_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+        if printTable:
+            self.printTable(records)
+            print(f"启动报告已保存: {self.output_path}")
+
+    def printTable(self, records):
+        """按耗时从大到小打印"""
+        width = max([displayWidth(record["phase"]) + 2 * record["depth"] for record in records] + [10])
+        print(f"{padText('阶段', width)}  {'开始(ms)':>10}  {'耗时(ms)':>10}")
+        for record in sorted(records, key=lambda r: r["duration"], reverse=True):
+            name = padText("  " * record["depth"] + record["phase"], width)
+            print(f"{name}  {record['start'] * 1000:>10.1f}  {record['duration'] * 1000:>10.1f}")
+
+
+# 全局记录器
+startupReport = StartupReport()
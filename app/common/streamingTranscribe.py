@@ -0,0 +1,183 @@
+"""流式解码转录
+
+整段解码会把整个文件转成一个 float32 数组（每小时约 230MB），十小时的录音仅 PCM 就要数 GB。
+流式模式通过 ffmpeg 管道顺序读取 16kHz 单声道 PCM，每次只保留一个 30 秒解码窗口加上其后的上下文，
+峰值内存与文件长度无关。
+
+窗口衔接与整段解码一致：每次对 窗口 + 上下文 调用 transcribe，只保留第一个窗口（seek 为 0）输出的段落；
+上下文中第二个窗口的段落的 seek 正是整段解码时下一个窗口的起点，下一次从该位置继续。
+末尾未完整输出的段落因此和整段解码一样被丢弃并在下一个窗口重新解码，不会在窗口边界截断或重复。
+开启循环提示时，已输出的文本作为下一次的提示词，与整段解码使用前文 token 作为提示相同。
+整段解码按全文件的最大能量截断梅尔特征的下限，流式按每段音频计算，只有音量起伏极大的录音会有细微差别。
+
+代价是吞吐量：为了得到第二个窗口的起点，每次调用都要把第二个窗口（上下文部分）完整编码并解码，
+该部分的结果随后丢弃，在下一次调用中重新解码。每 30 秒窗口多一次编码器计算（编码器耗时约翻倍）
+和最多 CONTEXT_SECONDS 秒音频的解码（解码耗时最多增加约三分之一），适合内存受限而不是追求速度的场景。
+窗口以完整段落结束时也无法省去这次计算：faster-whisper 要解码完下一个窗口才会返回其中的段落，
+而只读 30 秒时，无法区分“窗口以完整段落结束”和“剩余音频没有语音”，下一个窗口的起点会出错。
+
+VAD 和手动分段需要整段音频，设置了这些参数时回退到整段解码。
+"""
+import shutil
+import subprocess
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.common.parallelTranscribe import shiftSegmentDict
+from app.common.speechMap import SAMPLING_RATE, probeDuration
+from app.common.transcriptionCache import segmentFromDict, segmentToDict
+
+# Whisper 的解码窗口
+WINDOW_SECONDS = 30
+
+# 窗口之后多读取的音频：保证窗口末尾的特征完整，并让模型输出第二个窗口的起点
+CONTEXT_SECONDS = 10
+
+# 梅尔特征每秒帧数（hop_length = 160）
+FRAMES_PER_SECOND = 100
+
+# 作为下一次提示词的已输出文本长度，faster-whisper 只使用最后 223 个 token
+PROMPT_CHARS = 1000
+
+# 流式模式不支持的参数
+STREAMING_UNSUPPORTED_PARAMS = {
+    "vad_filter": "VAD",
+    "clip_timestamps": "手动分段",
+}
+
+# 流式模式常驻的 PCM 大小（窗口 + 上下文 + 一次读取的余量）
+STREAMING_BUFFER_SECONDS = WINDOW_SECONDS + CONTEXT_SECONDS * 2
+
+
+def streamingFallbackReason(params):
+    """返回不能使用流式模式的原因，可以使用时返回 None"""
+    if shutil.which("ffmpeg") is None:
+        return "未找到 ffmpeg"
+    for key, name in STREAMING_UNSUPPORTED_PARAMS.items():
+        if params.get(key):
+            return name
+    return None
+
+
+class PcmStream:
+    """从 ffmpeg 管道顺序读取 PCM，只保留当前位置之后的部分"""
+
+    def __init__(self, file_path):
+        self.process = subprocess.Popen(
+            ["ffmpeg", "-nostdin", "-v", "error", "-i", file_path,
+             "-f", "f32le", "-ac", "1", "-ar", str(SAMPLING_RATE), "-"],
+            stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        self.buffer = np.empty(0, dtype=np.float32)
+        self.offset = 0  # buffer[0] 在整个文件中的采样位置
+        self.eof = False
+
+    def read(self, start, length):
+        """返回 [start, start + length) 的采样，文件结束时可能更短；start 只能向后移动"""
+        if start < self.offset:
+            raise ValueError("流式解码不能回退")
+
+        # 丢弃 start 之前的采样
+        drop = min(start - self.offset, len(self.buffer))
+        self.buffer = self.buffer[drop:]
+        self.offset += drop
+        if start > self.offset:
+            self.skip(start - self.offset)
+
+        missing = length - len(self.buffer)
+        if missing > 0 and not self.eof:
+            data = self.process.stdout.read(missing * 4)
+            if len(data) < missing * 4:
+                self.finish()
+            data = data[:len(data) // 4 * 4]
+            self.buffer = np.concatenate([self.buffer, np.frombuffer(data, dtype=np.float32)])
+        return self.buffer[:length].copy()
+
+    def skip(self, samples):
+        while samples > 0 and not self.eof:
+            block = min(samples, WINDOW_SECONDS * SAMPLING_RATE)
+            data = self.process.stdout.read(block * 4)
+            if len(data) < block * 4:
+                self.finish()
+            samples -= len(data) // 4
+            self.offset += len(data) // 4
+
+    def finish(self):
+        self.eof = True
+        if self.process.wait() != 0:
+            raise RuntimeError(f"ffmpeg 解码失败（返回码 {self.process.returncode}）")
+
+    def close(self):
+        if self.process.poll() is None:
+            self.process.kill()
+        self.process.stdout.close()
+        self.process.wait()
+
+
+class StreamingTranscriber:
+    """调用方式与 WhisperModel.transcribe 一致，输入为文件路径，返回 (段落生成器, info)"""
+
+    def __init__(self, model):
+        self.model = model
+
+    def transcribe(self, file_path, **params):
+        stream = PcmStream(file_path)
+        try:
+            chunk_samples = (WINDOW_SECONDS + CONTEXT_SECONDS) * SAMPLING_RATE
+            chunk = stream.read(0, chunk_samples)
+            # 第一次调用时检测语言，与整段解码一样使用开头 30 秒
+            segments, first_info = self.model.transcribe(chunk, **params)
+        except Exception:
+            stream.close()
+            raise
+
+        duration = probeDuration(file_path) or 0.0
+        info = SimpleNamespace(language=first_info.language, language_probability=first_info.language_probability,
+                               duration=duration)
+        return self.iterSegments(stream, segments, len(chunk) < chunk_samples, params, info.language), info
+
+    def iterSegments(self, stream, segments, at_end, params, language):
+        chunk_samples = (WINDOW_SECONDS + CONTEXT_SECONDS) * SAMPLING_RATE
+        window_samples = WINDOW_SECONDS * SAMPLING_RATE
+        condition = params.get("condition_on_previous_text", True)
+        history = params.get("initial_prompt") or ""
+
+        # 之后的调用沿用检测到的语言；prefix 只用于开头
+        params = dict(params, language=language)
+        params.pop("prefix", None)
+
+        seek = 0  # 当前块在文件中的起点（采样）
+        try:
+            while True:
+                offset = seek / SAMPLING_RATE
+                next_seek = None
+                last_end = None
+                for segment in segments:
+                    if segment.seek != 0 and not at_end:
+                        # 第二个窗口的起点即整段解码时的下一个 seek
+                        next_seek = seek + segment.seek * SAMPLING_RATE // FRAMES_PER_SECOND
+                        break
+                    last_end = segment.end
+                    history += segment.text
+                    yield segmentFromDict(shiftSegmentDict(segmentToDict(segment), offset))
+                segments.close()
+
+                if at_end:
+                    return
+
+                if next_seek is None:
+                    # 上下文中没有输出段落：从最后一个段落结束处继续，没有段落时跳过整个窗口
+                    next_seek = seek + (int(last_end * SAMPLING_RATE) if last_end else window_samples)
+                seek = max(next_seek, seek + 1)
+
+                chunk = stream.read(seek, chunk_samples)
+                if len(chunk) == 0:
+                    return
+                at_end = len(chunk) < chunk_samples
+                if condition:
+                    params["initial_prompt"] = history[-PROMPT_CHARS:]
+                else:
+                    params.pop("initial_prompt", None)
+                segments, _ = self.model.transcribe(chunk, **params)
+        finally:
+            stream.close()
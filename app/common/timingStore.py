@@ -0,0 +1,187 @@
+"""段落和单词时间戳的列式存储
+
+开启单词时间戳时，一个长文件会产生几十万个 Word 对象。转录时把它们写成一个紧凑的列式文件（.timings）：
+起止时间为整数毫秒（int32），概率为 float32，文本拼接成一个 UTF-8 字节块并用偏移数组索引。
+读取时整个文件以内存映射方式打开，只有访问到的部分才会读入内存，几毫秒即可加载，
+重新导出字幕、重新断句都基于它完成，无需为每个单词保留 Python 对象，也无需重新运行模型。
+
+文件结构:
+    8 字节标识 | 4 字节头部长度（小端）| JSON 头部 | 按 64 字节对齐的各数组原始数据
+"""
+import json
+import os
+import struct
+import sys
+from array import array
+from types import SimpleNamespace
+
+from app.common.lazyModules import lazyImport
+
+MAGIC = b"VSGTIM01"
+ALIGN = 64
+EXTENSION = "timings"
+
+BYTE_ORDER = "<" if sys.byteorder == "little" else ">"
+
+# 数组名 -> (array 类型码, numpy dtype)
+ARRAY_TYPES = {
+    "seg_start": ("i", "i4"),  # 段落开始，毫秒
+    "seg_end": ("i", "i4"),  # 段落结束，毫秒
+    "seg_text_offsets": ("q", "i8"),  # 段落文本在 seg_text 中的偏移，长度为段落数 + 1
+    "seg_word_offsets": ("q", "i8"),  # 段落的第一个单词下标，长度为段落数 + 1
+    "word_start": ("i", "i4"),
+    "word_end": ("i", "i4"),
+    "word_prob": ("f", "f4"),
+    "word_text_offsets": ("q", "i8"),  # 单词文本在 word_text 中的偏移，长度为单词数 + 1
+    "seg_text": ("B", "u1"),  # 段落文本 UTF-8 字节块
+    "word_text": ("B", "u1"),  # 单词文本 UTF-8 字节块（保留 faster-whisper 单词前的空格）
+}
+
+
+def timingsPath(output_dir, base_name):
+    return os.path.join(output_dir, f"{base_name}.{EXTENSION}")
+
+
+def toMilliseconds(seconds):
+    return int(round(seconds * 1000))
+
+
+class TimingsBuilder:
+    """逐段追加时间戳，使用 array 保存，不为每个单词保留对象"""
+
+    def __init__(self):
+        self.arrays = {name: array(typecode) for name, (typecode, _) in ARRAY_TYPES.items()}
+        self.arrays["seg_text_offsets"].append(0)
+        self.arrays["seg_word_offsets"].append(0)
+        self.arrays["word_text_offsets"].append(0)
+
+    def add(self, segment):
+        arrays = self.arrays
+        arrays["seg_start"].append(toMilliseconds(segment.start))
+        arrays["seg_end"].append(toMilliseconds(segment.end))
+        arrays["seg_text"].frombytes(segment.text.strip().encode("utf-8"))
+        arrays["seg_text_offsets"].append(len(arrays["seg_text"]))
+
+        for word in getattr(segment, "words", None) or ():
+            arrays["word_start"].append(toMilliseconds(word.start))
+            arrays["word_end"].append(toMilliseconds(word.end))
+            arrays["word_prob"].append(word.probability)
+            arrays["word_text"].frombytes(word.word.encode("utf-8"))
+            arrays["word_text_offsets"].append(len(arrays["word_text"]))
+        arrays["seg_word_offsets"].append(len(arrays["word_start"]))
+
+    def write(self, f, info=None):
+        """写入已打开的二进制文件"""
+        specs = {}
+        offset = 0
+        for name, (_, dtype) in ARRAY_TYPES.items():
+            data = self.arrays[name]
+            specs[name] = {"dtype": BYTE_ORDER + dtype, "offset": offset, "count": len(data)}
+            offset += -(-len(data) * data.itemsize // ALIGN) * ALIGN
+
+        header = {"version": 1, "arrays": specs}
+        if info is not None:
+            header["info"] = {
+                "language": info.language,
+                "language_probability": info.language_probability,
+                "duration": info.duration,
+            }
+        header_bytes = json.dumps(header, ensure_ascii=False).encode("utf-8")
+
+        # 数据区起点按 ALIGN 对齐，数组偏移都相对于数据区起点
+        prefix = len(MAGIC) + 4 + len(header_bytes)
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(header_bytes)))
+        f.write(header_bytes)
+        f.write(b"\0" * (-prefix % ALIGN))
+        for name in ARRAY_TYPES:
+            data = self.arrays[name]
+            raw = data.tobytes()
+            f.write(raw)
+            f.write(b"\0" * (-len(raw) % ALIGN))
+
+
+class TimingsWriter:
+    """TranscriptWriter 的 timings 格式：转录过程中追加到内存，close 时一次写出
+
+    数据只在 close 时写出，先写到临时文件，写完才改名为正式文件（atomic），
+    程序中途退出时不会留下同名的空文件或不完整的文件。
+    """
+
+    binary = True
+    atomic = True
+
+    def __init__(self, f):
+        self.f = f
+        self.builder = TimingsBuilder()
+
+    def write(self, index, segment):
+        self.builder.add(segment)
+
+    def close(self, info=None):
+        self.builder.write(self.f, info)
+
+
+class Timings:
+    """以内存映射方式读取 .timings 文件
+
+    时间数组单位为毫秒；segments() 生成与 faster-whisper Segment 属性一致的对象，可直接交给 TranscriptWriter。
+    """
+
+    def __init__(self, path, mmap=True):
+        np = lazyImport("numpy")
+        with open(path, "rb") as f:
+            magic = f.read(len(MAGIC))
+            if not magic:
+                raise ValueError(f"时间轴数据文件为空，对应的转录可能未完成: {path}")
+            if magic != MAGIC:
+                raise ValueError(f"不是时间轴数据文件: {path}")
+            (header_length,) = struct.unpack("<I", f.read(4))
+            header = json.loads(f.read(header_length).decode("utf-8"))
+
+        self.path = path
+        self.info = SimpleNamespace(**header["info"]) if "info" in header else None
+        data_start = len(MAGIC) + 4 + header_length
+        data_start += -data_start % ALIGN
+        raw = np.memmap(path, dtype=np.uint8, mode="r") if mmap else np.fromfile(path, dtype=np.uint8)
+
+        for name, spec in header["arrays"].items():
+            dtype = np.dtype(spec["dtype"])
+            start = data_start + spec["offset"]
+            setattr(self, name, raw[start:start + spec["count"] * dtype.itemsize].view(dtype))
+
+    @property
+    def segmentCount(self):
+        return len(self.seg_start)
+
+    @property
+    def wordCount(self):
+        return len(self.word_start)
+
+    def segmentText(self, i):
+        return bytes(self.seg_text[self.seg_text_offsets[i]:self.seg_text_offsets[i + 1]]).decode("utf-8")
+
+    def wordText(self, j):
+        return bytes(self.word_text[self.word_text_offsets[j]:self.word_text_offsets[j + 1]]).decode("utf-8")
+
+    def wordTexts(self):
+        """全部单词文本的列表"""
+        blob = bytes(self.word_text)
+        offsets = self.word_text_offsets.tolist()
+        return [blob[offsets[j]:offsets[j + 1]].decode("utf-8") for j in range(self.wordCount)]
+
+    def segmentWords(self, i):
+        """段落 i 的单词下标范围"""
+        return range(int(self.seg_word_offsets[i]), int(self.seg_word_offsets[i + 1]))
+
+    def segments(self):
+        for i in range(self.segmentCount):
+            words = [SimpleNamespace(start=self.word_start[j] / 1000, end=self.word_end[j] / 1000,
+                                     word=self.wordText(j), probability=float(self.word_prob[j]))
+                     for j in self.segmentWords(i)]
+            yield SimpleNamespace(start=self.seg_start[i] / 1000, end=self.seg_end[i] / 1000,
+                                  text=self.segmentText(i), words=words or None)
+
+
+def loadTimings(path, mmap=True):
+    return Timings(path, mmap)
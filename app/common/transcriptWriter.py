@@ -0,0 +1,184 @@
+"""转录结果写出
+
+faster-whisper 返回的 segments 是只能遍历一次的生成器。TranscriptWriter 只遍历一次，把每个段落同时写入
+所选的全部格式（SRT、TXT、WebVTT、带单词时间戳的 JSON、列式时间轴数据），每写完一段就刷新到磁盘，
+长时间转录过程中也能看到已经生成的部分结果。
+"""
+import json
+import os
+
+from app.common.timingStore import TimingsWriter
+
+# 支持的输出格式（同时也是文件扩展名）
+OUTPUT_FORMATS = ("srt", "txt", "vtt", "json", "timings")
+
+
+def formatTimestamp(seconds, separator=","):
+    """将秒数转换为 HH:MM:SS,mmm 时间戳
+
+    使用整数毫秒计算，小时数不会在 24 小时处回绕。
+    """
+    total_ms = max(0, int(round(seconds * 1000)))
+    hours, total_ms = divmod(total_ms, 3600000)
+    minutes, total_ms = divmod(total_ms, 60000)
+    secs, milliseconds = divmod(total_ms, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{milliseconds:03d}"
+
+
+class SrtWriter:
+    """SRT字幕格式"""
+
+    def __init__(self, f):
+        self.f = f
+
+    def write(self, index, segment):
+        self.f.write(f"{index}\n")
+        self.f.write(f"{formatTimestamp(segment.start)} --> {formatTimestamp(segment.end)}\n")
+        self.f.write(f"{segment.text.strip()}\n\n")
+
+    def close(self, info=None):
+        pass
+
+
+class TxtWriter:
+    """纯文本格式"""
+
+    def __init__(self, f):
+        self.f = f
+
+    def write(self, index, segment):
+        self.f.write(f"{segment.text.strip()}\n")
+
+    def close(self, info=None):
+        pass
+
+
+class VttWriter:
+    """WebVTT字幕格式"""
+
+    def __init__(self, f):
+        self.f = f
+        self.f.write("WEBVTT\n\n")
+
+    def write(self, index, segment):
+        self.f.write(f"{formatTimestamp(segment.start, '.')} --> {formatTimestamp(segment.end, '.')}\n")
+        self.f.write(f"{segment.text.strip()}\n\n")
+
+    def close(self, info=None):
+        pass
+
+
+class JsonWriter:
+    """JSON格式，包含单词级时间戳
+
+    segments 数组边转录边写入，文件在 close 时补全语言信息和结尾括号。
+    """
+
+    def __init__(self, f):
+        self.f = f
+        self.f.write('{"segments": [')
+
+    def write(self, index, segment):
+        item = {
+            "id": index,
+            "start": segment.start,
+            "end": segment.end,
+            "text": segment.text.strip(),
+        }
+        words = getattr(segment, "words", None)
+        if words:
+            item["words"] = [
+                {"start": word.start, "end": word.end, "word": word.word, "probability": word.probability}
+                for word in words
+            ]
+
+        self.f.write(("\n" if index == 1 else ",\n") + json.dumps(item, ensure_ascii=False))
+
+    def close(self, info=None):
+        self.f.write("\n]")
+        if info is not None:
+            self.f.write(f', "language": {json.dumps(info.language)}')
+            self.f.write(f', "language_probability": {info.language_probability}')
+            self.f.write(f', "duration": {info.duration}')
+        self.f.write("}\n")
+
+
+FORMAT_WRITERS = {
+    "srt": SrtWriter,
+    "txt": TxtWriter,
+    "vtt": VttWriter,
+    "json": JsonWriter,
+    "timings": TimingsWriter,
+}
+
+
+class TranscriptWriter:
+    """把段落同时写入多个格式的文件
+
+    用法:
+        with TranscriptWriter(output_dir, name, ["srt", "txt"]) as writer:
+            for segment in segments:
+                writer.write(segment)
+            writer.info = info
+    """
+
+    def __init__(self, output_dir, base_name, formats=("srt", "txt")):
+        self.paths = {}
+        self.files = []
+        self.writers = []
+        self.replacements = []  # (临时路径, 正式路径)，atomic 格式关闭时才改名为正式文件
+        self.count = 0
+        self.info = None
+
+        os.makedirs(output_dir, exist_ok=True)
+        try:
+            for fmt in formats:
+                path = os.path.join(output_dir, f"{base_name}.{fmt}")
+                writer_class = FORMAT_WRITERS[fmt]
+                open_path = path
+                if getattr(writer_class, "atomic", False):
+                    open_path = path + ".tmp"
+                    self.replacements.append((open_path, path))
+                if getattr(writer_class, "binary", False):
+                    f = open(open_path, "wb")
+                else:
+                    f = open(open_path, "w", encoding="utf-8")
+                self.files.append(f)
+                self.writers.append(writer_class(f))
+                self.paths[fmt] = path
+        except Exception:
+            self.closeFiles()
+            for temp_path, _ in self.replacements:
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+            raise
+
+    def write(self, segment):
+        """写入一个段落并刷新到磁盘"""
+        self.count += 1
+        for writer in self.writers:
+            writer.write(self.count, segment)
+        for f in self.files:
+            f.flush()
+
+    def close(self):
+        for writer in self.writers:
+            writer.close(self.info)
+        self.closeFiles()
+        for temp_path, path in self.replacements:
+            os.replace(temp_path, path)
+        self.replacements = []
+
+    def closeFiles(self):
+        for f in self.files:
+            f.close()
+        self.files = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
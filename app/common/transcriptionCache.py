@@ -0,0 +1,156 @@
+"""转录结果缓存
+
+以媒体文件内容、模型（路径、计算精度、是否 v3）和规范化后的转录参数作为键，把转录得到的段落及单词
+时间戳保存为 JSON。再次转录同一文件时直接用缓存重新生成各格式的输出，不再运行模型。
+缓存目录超过容量上限时按最近使用时间淘汰。
+"""
+import hashlib
+import json
+import os
+import threading
+from types import SimpleNamespace
+
+from app.common.whisperParams import normalizedParamsKey
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "video-srt-gui", "transcripts")
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# 快速哈希时从文件开头、中间、结尾各读取的字节数
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def mediaHash(file_path):
+    """媒体文件的快速内容哈希
+
+    小文件读取全部内容；大文件只读取开头、中间、结尾各 1 MiB 并混入文件大小，几 GB 的视频也只需几毫秒。
+    """
+    size = os.path.getsize(file_path)
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(str(size).encode())
+
+    with open(file_path, "rb") as f:
+        if size <= 3 * HASH_CHUNK_SIZE:
+            digest.update(f.read())
+        else:
+            for offset in (0, size // 2, size - HASH_CHUNK_SIZE):
+                f.seek(offset)
+                digest.update(f.read(HASH_CHUNK_SIZE))
+
+    return digest.hexdigest()
+
+
+def modelIdentity(model_param):
+    """缓存键中的模型标识：模型路径、计算精度、是否 v3 模型
+
+    批处理模式按 VAD 切块、多进程分片模式按进程数确定切分点，结果与标准模式不同，标识中另外加上推理模式。
+    """
+    identity = (os.path.abspath(model_param["model_size_or_path"]), model_param["compute_type"],
+                model_param.get("use_v3_model", False))
+    mode = model_param.get("inference_mode", "sequential")
+    if mode == "parallel" and int(model_param.get("process_count", 1)) > 1:
+        identity += ("parallel", int(model_param["process_count"]))
+    elif mode == "batched":
+        identity += ("batched",)
+    return identity
+
+
+def transcriptionKey(file_path, model_identity, params):
+    """媒体内容 + 模型标识 + 规范化参数 的组合哈希，相同的键意味着相同的转录结果"""
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(mediaHash(file_path).encode())
+    digest.update(json.dumps(model_identity, sort_keys=True, default=str).encode())
+    digest.update(normalizedParamsKey(params).encode())
+    return digest.hexdigest()
+
+
+def segmentToDict(segment):
+    item = {"start": segment.start, "end": segment.end, "text": segment.text}
+    words = getattr(segment, "words", None)
+    if words:
+        item["words"] = [[word.start, word.end, word.word, word.probability] for word in words]
+    return item
+
+
+def segmentFromDict(item):
+    """还原为与 faster-whisper Segment 属性一致的对象，供 TranscriptWriter 使用"""
+    words = None
+    if item.get("words"):
+        words = [SimpleNamespace(start=start, end=end, word=word, probability=probability)
+                 for start, end, word, probability in item["words"]]
+    return SimpleNamespace(start=item["start"], end=item["end"], text=item["text"], words=words)
+
+
+class TranscriptionCache:
+    """持久化的转录结果缓存，按最近使用时间（文件 mtime）淘汰"""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def makeKey(self, file_path, model_identity, params):
+        """model_identity 为 (模型路径, compute_type, 是否 v3) 之类可序列化的值"""
+        return transcriptionKey(file_path, model_identity, params)
+
+    def entryPath(self, key):
+        return os.path.join(self.cache_dir, key + ".json")
+
+    def get(self, key):
+        """返回 (段落列表, info)，未命中返回 None"""
+        path = self.entryPath(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            # 更新 mtime，作为最近使用时间
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+
+        segments = [segmentFromDict(item) for item in data["segments"]]
+        return segments, SimpleNamespace(**data["info"])
+
+    def put(self, key, segment_dicts, info):
+        """写入缓存，segment_dicts 为 segmentToDict 的结果列表"""
+        data = {
+            "info": {
+                "language": info.language,
+                "language_probability": info.language_probability,
+                "duration": info.duration,
+            },
+            "segments": segment_dicts,
+        }
+
+        # 先写临时文件再替换，避免并发读取到写了一半的缓存
+        path = self.entryPath(key)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(temp_path, path)
+
+        self.evict()
+
+    def evict(self):
+        """总大小超过上限时删除最久未使用的条目"""
+        with self.lock:
+            entries = []
+            total = 0
+            for entry in os.scandir(self.cache_dir):
+                if not entry.name.endswith(".json"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+
+            entries.sort()
+            for mtime, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    pass
@@ -0,0 +1,138 @@
+"""可续传的转录日志
+
+转录过程中每完成一个段落就追加写入任务日志（JSON Lines，每行写完立即 fsync）。程序或机器中途退出后，
+再次转录同一文件时读取日志，已完成的段落直接写入输出，模型只需从最后一个已提交段落的结束时间继续，
+通过 faster-whisper 的 clip_timestamps 跳过已转录的部分。转录成功后删除日志。
+
+faster-whisper 在指定 clip_timestamps 时会忽略 vad_filter，启用 VAD 的任务续传时用语音区间表与剩余部分
+求交集，只转录剩余的语音区间。
+"""
+import json
+import os
+
+from app.common.speechMap import applySpeechMap
+from app.common.transcriptionCache import segmentFromDict, segmentToDict
+
+
+def journalPath(output_path, base_name):
+    return os.path.join(output_path, f".{base_name}.journal.jsonl")
+
+
+def pairClips(clip_timestamps):
+    """[起, 止, 起, 止, ...] 转换为 [(起, 止), ...]，最后一段没有结束时间时为 None"""
+    points = list(clip_timestamps)
+    if len(points) % 2:
+        points.append(None)
+    return list(zip(points[0::2], points[1::2]))
+
+
+def remainingClips(clip_timestamps, resume_from):
+    """从 resume_from 秒继续时仍需转录的 clip_timestamps"""
+    if not clip_timestamps:
+        return [resume_from]
+
+    remaining = []
+    for start, end in pairClips(clip_timestamps):
+        if end is not None and end <= resume_from:
+            continue
+        remaining.append(max(start, resume_from))
+        if end is not None:
+            remaining.append(end)
+    return remaining
+
+
+def resumeParams(params, committed_segments, speech_map=None, prompt_segments=3):
+    """根据已提交的段落生成续传时使用的转录参数
+
+    clip_timestamps 从最后一个已提交段落的结束时间开始；启用 VAD 且有语音区间表时只保留其中的语音区间，
+    返回的参数中不再有 vad_filter。没有语音区间表时 vad_filter 原样保留，但 faster-whisper 会忽略它，
+    续传部分不做 VAD。开启循环提示时，把最后 prompt_segments 段文本接在用户的 initial_prompt 之后作为上文。
+
+    续传只是近似接续：连续转录时 faster-whisper 以 initial_prompt 加此前最多 max_length // 2 - 1 个输出
+    token（含时间戳 token）为上文，并在高温度回退后清空；日志只保存段落文本，无法还原这些 token 和回退
+    记录，续传部分的解码结果可能与不中断时不同。
+    """
+    resume_from = committed_segments[-1].end
+    params = dict(params)
+
+    clip_timestamps = params.get("clip_timestamps")
+    if isinstance(clip_timestamps, str):
+        clip_timestamps = [float(point) for point in clip_timestamps.split(",") if point.strip()]
+    params["clip_timestamps"] = remainingClips(clip_timestamps, resume_from)
+    if params.get("vad_filter") and speech_map is not None:
+        params = applySpeechMap(params, speech_map)
+
+    if params.get("condition_on_previous_text", True):
+        previous = "".join(segment.text for segment in committed_segments[-prompt_segments:]).strip()
+        # 用户的 initial_prompt 放在最前面，不被已提交的文本替换
+        user_prompt = params.get("initial_prompt")
+        user_prompt = user_prompt.strip() if isinstance(user_prompt, str) else ""
+        params["initial_prompt"] = " ".join(prompt for prompt in (user_prompt, previous) if prompt)
+
+    return params
+
+
+class TranscriptionJournal:
+    """单个转录任务的段落日志
+
+    第一行记录任务键（媒体内容、模型、参数的哈希），键不一致的旧日志会被丢弃，
+    避免用不同参数的结果续传。
+    """
+
+    def __init__(self, output_path, base_name, job_key):
+        self.path = journalPath(output_path, base_name)
+        self.job_key = job_key
+        self.f = None
+
+    def load(self):
+        """读取已提交的段落，日志不存在或与当前任务不匹配时返回空列表"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                lines = f.read().split("\n")
+        except OSError:
+            return []
+
+        try:
+            header = json.loads(lines[0])
+        except ValueError:
+            return []
+        if header.get("key") != self.job_key:
+            return []
+
+        segments = []
+        # 最后一行可能在写入时中断，只接受以换行结尾的完整行
+        for line in lines[1:-1]:
+            try:
+                segments.append(segmentFromDict(json.loads(line)))
+            except (ValueError, KeyError):
+                break
+        return segments
+
+    def open(self, committed_segments):
+        """重写日志，保留已提交的段落，之后的段落追加写入"""
+        self.f = open(self.path, "w", encoding="utf-8")
+        self.f.write(json.dumps({"key": self.job_key}) + "\n")
+        for segment in committed_segments:
+            self.f.write(json.dumps(segmentToDict(segment), ensure_ascii=False) + "\n")
+        self.sync()
+
+    def append(self, segment):
+        self.f.write(json.dumps(segmentToDict(segment), ensure_ascii=False) + "\n")
+        self.sync()
+
+    def sync(self):
+        self.f.flush()
+        os.fsync(self.f.fileno())
+
+    def close(self):
+        if self.f is not None:
+            self.f.close()
+            self.f = None
+
+    def remove(self):
+        """任务完成后删除日志"""
+        self.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
@@ -0,0 +1,110 @@
+# coding:utf-8
+"""
+WhisperModel 的创建
+
+模型页面的加载线程和多进程分片转录的子进程都通过这里创建模型，
+保证 v3 模型的 mel 滤波器修正在各处一致。
+
+加载后可在合成音频上预热一次：首次推理要扩展内存分配器的内存池、由 CTranslate2 选择计算内核，
+预热后第一个文件的速度与之后的文件一致。
+"""
+import os
+
+from app.common.lazyModules import getWhisperModel, lazyImport
+
+# 传给 WhisperModel 构造函数的参数名
+MODEL_ARGS = ("model_size_or_path", "device", "device_index", "compute_type", "cpu_threads", "num_workers")
+
+# 预热音频的长度（秒）
+WARM_UP_SECONDS = 5
+
+READ_BLOCK_BYTES = 16 * 1024 * 1024
+
+
+def applyV3MelFilters(model):
+    """v3 模型使用 128 个 mel 滤波器"""
+    extractor = model.feature_extractor
+    extractor.mel_filters = extractor.get_mel_filters(extractor.sampling_rate, extractor.n_fft, n_mels=128)
+
+
+def createWhisperModel(model_param, use_v3_model=False, **overrides):
+    """按 model_param 创建 WhisperModel，overrides 覆盖其中的构造参数（如子进程改用 CPU）"""
+    kwargs = {name: model_param[name] for name in MODEL_ARGS if name in model_param}
+    kwargs.update(overrides)
+
+    WhisperModel = getWhisperModel()
+    model = WhisperModel(**kwargs)
+    if use_v3_model:
+        applyV3MelFilters(model)
+    return model
+
+
+def readModelFiles(model_path):
+    """顺序读取模型目录中的文件，返回读取的字节数
+
+    文件读入系统页缓存后，构建模型只剩反序列化和内存分配，可以分别统计磁盘读取和构建的耗时。
+    """
+    if not os.path.isdir(model_path):
+        return 0
+    total = 0
+    buffer = memoryview(bytearray(READ_BLOCK_BYTES))
+    for name in sorted(os.listdir(model_path)):
+        path = os.path.join(model_path, name)
+        if not os.path.isfile(path):
+            continue
+        with open(path, "rb", buffering=0) as f:
+            while True:
+                size = f.readinto(buffer)
+                if not size:
+                    break
+                total += size
+    return total
+
+
+def readaheadModelFiles(model_path):
+    """提示系统在后台把模型文件读入页缓存，立即返回提示的字节数
+
+    使用 posix_fadvise(WILLNEED)，由内核异步预读；不支持的系统（Windows、macOS）不做处理，
+    加载时仍由 readModelFiles 顺序读取。
+    """
+    if not hasattr(os, "posix_fadvise") or not os.path.isdir(model_path):
+        return 0
+    total = 0
+    for name in sorted(os.listdir(model_path)):
+        path = os.path.join(model_path, name)
+        if not os.path.isfile(path):
+            continue
+        try:
+            fd = os.open(path, os.O_RDONLY)
+            try:
+                size = os.fstat(fd).st_size
+                os.posix_fadvise(fd, 0, size, os.POSIX_FADV_WILLNEED)
+                total += size
+            finally:
+                os.close(fd)
+        except OSError:
+            continue
+    return total
+
+
+def warmUpAudio(seconds=WARM_UP_SECONDS, sampling_rate=16000):
+    """合成预热音频：音高缓慢变化的谐波按音节节奏起伏，再加少量噪声，让编码器和解码器都实际运行"""
+    np = lazyImport("numpy")
+    t = np.arange(int(seconds * sampling_rate)) / sampling_rate
+    pitch = 140 + 40 * np.sin(2 * np.pi * 0.5 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / sampling_rate
+    voice = sum(np.sin(k * phase) / k for k in range(1, 6))
+    envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 3 * t)
+    noise = np.random.default_rng(0).standard_normal(len(t)) * 0.01
+    return (0.1 * voice * envelope + noise).astype(np.float32)
+
+
+def warmUpModel(model, seconds=WARM_UP_SECONDS):
+    """在合成音频上完整运行一次转录（含语言检测），结果丢弃
+
+    固定温度 0，避免合成音频触发温度回退而反复解码。
+    """
+    audio = warmUpAudio(seconds, model.feature_extractor.sampling_rate)
+    segments, _ = model.transcribe(audio, temperature=0.0, condition_on_previous_text=False)
+    for _ in segments:
+        pass
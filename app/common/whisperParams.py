@@ -0,0 +1,129 @@
+"""参数设置界面的参数与 WhisperModel.transcribe 参数之间的转换"""
+import json
+
+# 参数设置界面尚未打开过时使用的默认转录参数
+DEFAULT_TRANSCRIBE_PARAMS = {
+    "language": None,  # 自动检测语言
+    "task": "transcribe",  # 转录任务
+    "beam_size": 5,  # 默认波束大小
+    "word_timestamps": True,  # 生成单词级时间戳
+}
+
+# 参数设置界面中可以传给 WhisperModel.transcribe 的参数（faster-whisper 1.1.0）
+TRANSCRIBE_PARAM_NAMES = (
+    "language", "task", "beam_size", "best_of", "patience", "length_penalty", "repetition_penalty",
+    "no_repeat_ngram_size", "temperature", "compression_ratio_threshold", "log_prob_threshold",
+    "no_speech_threshold", "condition_on_previous_text", "prompt_reset_on_temperature", "initial_prompt",
+    "prefix", "suppress_blank", "suppress_tokens", "without_timestamps", "max_initial_timestamp",
+    "word_timestamps", "prepend_punctuations", "append_punctuations", "multilingual", "vad_filter",
+    "vad_parameters", "max_new_tokens", "chunk_length", "clip_timestamps", "hallucination_silence_threshold",
+    "hotwords", "language_detection_threshold", "language_detection_segments",
+)
+
+# Whisper 解码器一次最多处理的 token 数（WhisperModel.max_length）
+WHISPER_MAX_LENGTH = 448
+
+# 提示词最多占用的 token：sot_prev + 前文（max_length // 2 - 1 个）+ sot 序列（3 个）+ no_timestamps
+MAX_PROMPT_TOKENS = 1 + (WHISPER_MAX_LENGTH // 2 - 1) + 3 + 1
+
+# 提示词和新生成的 token 合计不能超过 max_length，否则 faster-whisper 抛出 ValueError
+MAX_NEW_TOKENS_LIMIT = WHISPER_MAX_LENGTH - MAX_PROMPT_TOKENS
+
+# 每段音频最长 30 秒（编码器输入为 3000 帧）
+MAX_CHUNK_LENGTH = 30
+
+
+def parseClockTime(text):
+    """将 HH:MM:SS.s / MM:SS.s / SS.s 转换为秒"""
+    seconds = 0.0
+    for part in text.strip().split(":"):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+
+def parseClipTimestamps(text, clip_mode):
+    """解析分段时间戳输入
+
+    clip_mode 为 1 时输入为 "0.0-10.0;25.0-36.0"，为 2 时输入为 "00:00:10.0-00:00:20.0;..."，
+    返回 transcribe 接受的 [起, 止, 起, 止, ...] 秒数列表，最后一段可以省略结束时间。
+    """
+    timestamps = []
+    for clip in text.split(";"):
+        clip = clip.strip()
+        if not clip:
+            continue
+        for point in clip.split("-"):
+            if point.strip():
+                timestamps.append(parseClockTime(point) if clip_mode == 2 else float(point))
+    return timestamps
+
+
+def toTranscribeParams(params):
+    """把 FasterWhisperInterface.getParameters() 的结果转换为 transcribe 的关键字参数
+
+    只保留 transcribe 支持的参数，并修正会让 faster-whisper 报错的取值；参数无效时抛出 ValueError。
+    """
+    transcribe_params = {key: value for key, value in params.items() if key in TRANSCRIBE_PARAM_NAMES}
+
+    # 未启用 VAD 时不传 VAD 参数，避免参数不同导致缓存键不同
+    if not transcribe_params.get("vad_filter"):
+        transcribe_params.pop("vad_filter", None)
+        transcribe_params.pop("vad_parameters", None)
+
+    clip_timestamps = params.get("clip_timestamps")
+    if clip_timestamps and params.get("clip_mode", 0) > 0:
+        transcribe_params["clip_timestamps"] = parseClipTimestamps(clip_timestamps, params["clip_mode"])
+    else:
+        transcribe_params.pop("clip_timestamps", None)
+
+    # FeatureExtractor 用 chunk_length 计算帧数并传给 range()，必须是整数
+    if transcribe_params.get("chunk_length") is not None:
+        chunk_length = int(round(float(transcribe_params["chunk_length"])))
+        if not 1 <= chunk_length <= MAX_CHUNK_LENGTH:
+            raise ValueError(f"音频块长度应在 1-{MAX_CHUNK_LENGTH} 秒之间")
+        transcribe_params["chunk_length"] = chunk_length
+
+    # max_new_tokens 加上提示词不能超过 max_length：达到或超过 max_length 视为不限制，其余按提示词最长时截断；
+    # 热词的长度无法预先确定，设置热词时不限制
+    max_new_tokens = transcribe_params.pop("max_new_tokens", None)
+    if max_new_tokens is not None and int(max_new_tokens) < WHISPER_MAX_LENGTH and not params.get("hotwords"):
+        if int(max_new_tokens) < 1:
+            raise ValueError("最大新 token 数必须是正整数")
+        transcribe_params["max_new_tokens"] = min(int(max_new_tokens), MAX_NEW_TOKENS_LIMIT)
+
+    for key, name in (("beam_size", "波束大小"), ("best_of", "候选数"), ("language_detection_segments", "语言检测段数")):
+        if key in transcribe_params and int(transcribe_params[key]) < 1:
+            raise ValueError(f"{name}必须是正整数")
+    if isinstance(transcribe_params.get("temperature"), list) and not transcribe_params["temperature"]:
+        raise ValueError("温度不能为空")
+
+    return transcribe_params
+
+
+def normalizedParamsKey(params):
+    """参数的规范化字符串，键排序，用于缓存等需要比较参数是否相同的地方"""
+    return json.dumps(params, sort_keys=True, ensure_ascii=False, default=str)
+
+
+# 批处理推理（BatchedInferencePipeline）不支持的参数，设置了这些参数时回退到标准模式
+BATCHED_UNSUPPORTED_PARAMS = {
+    "condition_on_previous_text": "循环提示",
+    "hallucination_silence_threshold": "幻听静音阈值",
+    "clip_timestamps": "手动分段",
+}
+
+
+def batchedFallbackReason(params):
+    """返回导致不能使用批处理的参数名称，可以使用批处理时返回 None"""
+    for key, name in BATCHED_UNSUPPORTED_PARAMS.items():
+        if params.get(key):
+            return name
+    return None
+
+
+def toBatchedParams(params, batch_size):
+    """去掉批处理不使用的参数并加入 batch_size"""
+    batched_params = {key: value for key, value in params.items()
+                      if key not in BATCHED_UNSUPPORTED_PARAMS and key != "prompt_reset_on_temperature"}
+    batched_params["batch_size"] = batch_size
+    return batched_params
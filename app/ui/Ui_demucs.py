@@ -5,6 +5,7 @@ from qfluentwidgets import (CardWidget, PrimaryPushButton, DoubleSpinBox, ComboB
                             FluentIcon as FIF, TransparentPushButton, ScrollArea)
 from ..view.fileNameListViewInterface import FileNameListView
 from ..view.outputLabelLineEditButtonWidget import OutputGroupWidget
+from ..view.hotFolderWatcher import HotFolderWidget
 
 
 class Ui_demucs(object):
@@ -33,6 +34,10 @@ class Ui_demucs(object):
         self.outputGroupWidget = OutputGroupWidget(demucsInterface)
         self.verticalLayout.addWidget(self.outputGroupWidget)
 
+        # 监视文件夹
+        self.hotFolderWidget = HotFolderWidget(demucsInterface)
+        self.verticalLayout.addWidget(self.hotFolderWidget)
+
         # 提取按钮
         self.process_button = PrimaryPushButton(demucsInterface)
         self.process_button.setText(self.tr("提取"))
@@ -40,6 +45,11 @@ class Ui_demucs(object):
         self.process_button.setMinimumHeight(36)
         self.verticalLayout.addWidget(self.process_button)
 
+        # 当前处理状态（含内存不足时的等待原因）
+        self.statusLabel = BodyLabel(demucsInterface)
+        self.statusLabel.setWordWrap(True)
+        self.verticalLayout.addWidget(self.statusLabel)
+
         QMetaObject.connectSlotsByName(demucsInterface)
 
     def createDemucsParamCard(self, parent):
@@ -149,6 +149,41 @@ class Ui_fasterwhisper(object):
 
         self.verticalLayout.addWidget(self.audioSegmentsCard)
 
+        # === 语音活动检测 ===
+        self.vadCard = ParameterCard(u"语音活动检测 (VAD)", self.scrollWidget)
+
+        # 启用VAD
+        self.vadFilterSwitch = SwitchButton(self.vadCard)
+        container = self.vadCard.addItem(u"启用VAD", self.vadFilterSwitch,
+                                         u"转录前先检测语音区间，没有语音的文件直接跳过，其余文件只转录语音部分。")
+        container.layout().setAlignment(self.vadFilterSwitch, Qt.AlignLeft)
+
+        # 语音阈值
+        self.vadThresholdLineEdit = LineEdit(self.vadCard)
+        self.vadThresholdLineEdit.setText("0.5")
+        self.vadCard.addItem(u"语音阈值", self.vadThresholdLineEdit,
+                             u"语音概率高于此值的片段视为语音，嘈杂的录音可以适当调高。")
+
+        # 最短语音时长
+        self.vadMinSpeechLineEdit = LineEdit(self.vadCard)
+        self.vadMinSpeechLineEdit.setText("250")
+        self.vadCard.addItem(u"最短语音时长(ms)", self.vadMinSpeechLineEdit,
+                             u"短于此时长的语音片段将被丢弃。")
+
+        # 最短静音时长
+        self.vadMinSilenceLineEdit = LineEdit(self.vadCard)
+        self.vadMinSilenceLineEdit.setText("2000")
+        self.vadCard.addItem(u"最短静音时长(ms)", self.vadMinSilenceLineEdit,
+                             u"语音片段之间的静音长于此时长时才会被切开。")
+
+        # 语音前后填充
+        self.vadSpeechPadLineEdit = LineEdit(self.vadCard)
+        self.vadSpeechPadLineEdit.setText("400")
+        self.vadCard.addItem(u"语音前后填充(ms)", self.vadSpeechPadLineEdit,
+                             u"每个语音片段前后额外保留的时长，避免切掉首尾的字词。")
+
+        self.verticalLayout.addWidget(self.vadCard)
+
         # === 幻听参数 ===
         self.hallucinationCard = ParameterCard(u"幻听参数", self.scrollWidget)
 
@@ -3,7 +3,7 @@ from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QGridLayout,
                                QRadioButton, QLabel, QFrame)
 from PySide6.QtGui import QFont
 from qfluentwidgets import (TitleLabel, SubtitleLabel, BodyLabel, LineEdit,
-                            ComboBox, SwitchButton, PrimaryPushButton, RadioButton,
+                            ComboBox, SwitchButton, PrimaryPushButton, PushButton, RadioButton,
                             ToolButton, FluentIcon as FIF, CardWidget,
                             StrongBodyLabel, CaptionLabel, HorizontalSeparator)
 from qfluentwidgets import InfoBar, InfoBarPosition
@@ -54,10 +54,30 @@ class Ui_model(object):
         font = QFont()
         font.setBold(True)
         self.modelNotLoadedLabel.setFont(font)
-        self.statusCardLayout.addWidget(self.modelNotLoadedLabel)
+
+        # 加载耗时明细
+        self.loadTimeLabel = CaptionLabel(u"")
+        self.loadTimeLabel.setObjectName(u"loadTimeLabel")
+
+        self.statusTextLayout = QVBoxLayout()
+        self.statusTextLayout.setSpacing(2)
+        self.statusTextLayout.addWidget(self.modelNotLoadedLabel)
+        self.statusTextLayout.addWidget(self.loadTimeLabel)
+        self.statusCardLayout.addLayout(self.statusTextLayout)
 
         self.statusCardLayout.addStretch()
 
+        # 自动调优按钮
+        self.autotuneButton = PushButton(u"自动调优")
+        self.autotuneButton.setObjectName(u"autotuneButton")
+        self.autotuneButton.setIcon(FIF.SPEED_HIGH)
+        self.autotuneButton.setFixedHeight(44)
+        self.autotuneButton.setToolTip(
+            u"在合成音频上测试 int8 / int8_float32 / float32 与不同线程划分的组合，\n"
+            u"把实时率最低的计算精度、线程数和并发数填入下方参数。结果按机器保存，同一模型只需测试一次。")
+        self.statusCardLayout.addWidget(self.autotuneButton)
+        self.statusCardLayout.addSpacing(10)
+
         # 加载模型按钮
         self.loadModelButton = PrimaryPushButton(u"加载模型")
         self.loadModelButton.setObjectName(u"loadModelButton")
@@ -186,7 +206,7 @@ class Ui_model(object):
         self.computeTypeComboBox = ComboBox()
         self.computeTypeComboBox.setObjectName(u"computeTypeComboBox")
         self.computeTypeComboBox.addItems([u"int8", u"int8_float16", u"int8_bfloat16",
-                                           u"int16", u"float16", u"float32", u"bfloat16"])
+                                           u"int16", u"float16", u"float32", u"bfloat16", u"int8_float32"])
         self.computeTypeComboBox.setCurrentIndex(5)
         self.computeTypeComboBox.setToolTip(
             u"要使用的计算精度，尽管某些设备不支持半精度，\n但事实上不论选择什么精度类型都可以隐式转换。")
@@ -214,6 +234,66 @@ class Ui_model(object):
         self.paramsGridLayout.addWidget(self.numWorkersLabel, 2, 2)
         self.paramsGridLayout.addWidget(self.numWorkersLineEdit, 2, 3)
 
+        # 推理模式
+        self.inferenceModeLabel = BodyLabel(u"推理模式")
+        self.inferenceModeLabel.setObjectName(u"inferenceModeLabel")
+        self.inferenceModeComboBox = ComboBox()
+        self.inferenceModeComboBox.setObjectName(u"inferenceModeComboBox")
+        self.inferenceModeComboBox.addItems([u"标准", u"批处理", u"多进程分片", u"流式解码(低内存)"])
+        self.inferenceModeComboBox.setToolTip(
+            u"批处理模式先用VAD把音频切分成语音块，再成批编码解码，适合语音密集的长音频。\n"
+            u"开启循环提示、幻听静音阈值或手动分段时不支持批处理，会自动使用标准模式。\n"
+            u"多进程分片模式在静音处把单个长文件切成多段，由多个进程各自加载CPU模型并行转录后按时间拼接。\n"
+            u"流式解码模式通过 ffmpeg 边解码边转录，只保留 30 秒窗口和上下文的音频，适合超长录音；开启VAD时使用标准模式。\n"
+            u"流式模式每个窗口要额外编码并解码一次上下文，编码耗时约翻倍、解码耗时最多增加约三分之一，比标准模式慢。")
+        self.paramsGridLayout.addWidget(self.inferenceModeLabel, 3, 0)
+        self.paramsGridLayout.addWidget(self.inferenceModeComboBox, 3, 1)
+
+        # 批大小
+        self.batchSizeLabel = BodyLabel(u"批大小")
+        self.batchSizeLabel.setObjectName(u"batchSizeLabel")
+        self.batchSizeLineEdit = LineEdit()
+        self.batchSizeLineEdit.setObjectName(u"batchSizeLineEdit")
+        self.batchSizeLineEdit.setText("8")
+        self.batchSizeLineEdit.setToolTip(u"批处理模式下每批同时解码的语音块数量，值越大占用内存越多。")
+        self.paramsGridLayout.addWidget(self.batchSizeLabel, 3, 2)
+        self.paramsGridLayout.addWidget(self.batchSizeLineEdit, 3, 3)
+
+        # 分片进程数
+        self.processCountLabel = BodyLabel(u"分片进程数")
+        self.processCountLabel.setObjectName(u"processCountLabel")
+        self.processCountLineEdit = LineEdit()
+        self.processCountLineEdit.setObjectName(u"processCountLineEdit")
+        self.processCountLineEdit.setText("2")
+        self.processCountLineEdit.setToolTip(
+            u"多进程分片模式下的进程数，每个进程加载一份CPU模型，\n"
+            u"线程数（CPU）会平均分配给各进程，内存占用随进程数成倍增加。")
+        self.paramsGridLayout.addWidget(self.processCountLabel, 4, 0)
+        self.paramsGridLayout.addWidget(self.processCountLineEdit, 4, 1)
+
+        # 加载后预热
+        self.warmUpLabel = BodyLabel(u"加载后预热")
+        self.warmUpLabel.setObjectName(u"warmUpLabel")
+        self.warmUpSwitch = SwitchButton()
+        self.warmUpSwitch.setObjectName(u"warmUpSwitch")
+        self.warmUpSwitch.setChecked(True)
+        self.warmUpSwitch.setToolTip(
+            u"加载后在几秒合成音频上运行一次转录，提前完成内存池扩展和计算内核选择，\n"
+            u"第一个文件的速度与之后的文件一致，加载时间会相应增加。")
+        self.paramsGridLayout.addWidget(self.warmUpLabel, 4, 2)
+        self.paramsGridLayout.addWidget(self.warmUpSwitch, 4, 3)
+
+        # 启动时预加载
+        self.preloadLabel = BodyLabel(u"启动时预加载")
+        self.preloadLabel.setObjectName(u"preloadLabel")
+        self.preloadSwitch = SwitchButton()
+        self.preloadSwitch.setObjectName(u"preloadSwitch")
+        self.preloadSwitch.setToolTip(
+            u"开启后，程序启动时预读模型文件，并在后台按上次成功加载的参数加载模型，\n"
+            u"加载期间添加的转录任务会排队等待，加载完成后自动开始。")
+        self.paramsGridLayout.addWidget(self.preloadLabel, 5, 0)
+        self.paramsGridLayout.addWidget(self.preloadSwitch, 5, 1)
+
         # 添加到布局
         self.modelParamsLayout.addLayout(self.paramsGridLayout)
 
@@ -223,7 +303,71 @@ class Ui_model(object):
         self.paramDescriptionLabel.setObjectName(u"paramDescriptionLabel")
         self.modelParamsLayout.addWidget(self.paramDescriptionLabel)
 
+        # 自动调优结果
+        self.autotuneLabel = CaptionLabel(u"")
+        self.autotuneLabel.setObjectName(u"autotuneLabel")
+        self.autotuneLabel.setWordWrap(True)
+        self.modelParamsLayout.addWidget(self.autotuneLabel)
+
         self.verticalLayout.addWidget(self.modelParamsCard)
+        self.verticalLayout.addSpacing(24)
+
+        # 常驻模型池
+        self.modelPoolCard = CardWidget()
+        self.modelPoolCard.setObjectName(u"modelPoolCard")
+        self.modelPoolLayout = QVBoxLayout(self.modelPoolCard)
+        self.modelPoolLayout.setContentsMargins(20, 16, 20, 20)
+        self.modelPoolLayout.setSpacing(16)
+
+        self.modelPoolTitle = StrongBodyLabel(u"常驻模型")
+        self.modelPoolTitle.setObjectName(u"modelPoolTitle")
+        self.modelPoolLayout.addWidget(self.modelPoolTitle)
+
+        self.modelPoolSeparator = HorizontalSeparator()
+        self.modelPoolLayout.addWidget(self.modelPoolSeparator)
+
+        self.poolBudgetLayout = QHBoxLayout()
+        self.poolBudgetLayout.setSpacing(12)
+        self.poolBudgetLabel = BodyLabel(u"内存预算(GB)")
+        self.poolBudgetLabel.setObjectName(u"poolBudgetLabel")
+        self.poolBudgetLineEdit = LineEdit()
+        self.poolBudgetLineEdit.setObjectName(u"poolBudgetLineEdit")
+        self.poolBudgetLineEdit.setText("8")
+        self.poolBudgetLineEdit.setFixedWidth(100)
+        self.poolBudgetLineEdit.setToolTip(
+            u"已加载的模型保留在内存中，再次加载相同模型时无需重新读取。\n超出预算时淘汰最久未使用且未在转录中的模型。")
+        self.poolUsageLabel = CaptionLabel(u"")
+        self.poolUsageLabel.setObjectName(u"poolUsageLabel")
+        self.poolBudgetLayout.addWidget(self.poolBudgetLabel)
+        self.poolBudgetLayout.addWidget(self.poolBudgetLineEdit)
+        self.poolBudgetLayout.addWidget(self.poolUsageLabel)
+        self.poolBudgetLayout.addStretch()
+        self.modelPoolLayout.addLayout(self.poolBudgetLayout)
+
+        # 转录、音频分离任务的内存准入预算（含常驻模型）
+        self.jobBudgetLayout = QHBoxLayout()
+        self.jobBudgetLayout.setSpacing(12)
+        self.jobBudgetLabel = BodyLabel(u"任务内存上限(GB)")
+        self.jobBudgetLabel.setObjectName(u"jobBudgetLabel")
+        self.jobBudgetLineEdit = LineEdit()
+        self.jobBudgetLineEdit.setObjectName(u"jobBudgetLineEdit")
+        self.jobBudgetLineEdit.setFixedWidth(100)
+        self.jobBudgetLineEdit.setToolTip(
+            u"常驻模型与正在运行的转录、音频分离任务的估算内存之和超过该值时，新任务排队等待")
+        self.jobUsageLabel = CaptionLabel(u"")
+        self.jobUsageLabel.setObjectName(u"jobUsageLabel")
+        self.jobBudgetLayout.addWidget(self.jobBudgetLabel)
+        self.jobBudgetLayout.addWidget(self.jobBudgetLineEdit)
+        self.jobBudgetLayout.addWidget(self.jobUsageLabel)
+        self.jobBudgetLayout.addStretch()
+        self.modelPoolLayout.addLayout(self.jobBudgetLayout)
+
+        self.modelPoolListLabel = BodyLabel(u"暂无常驻模型")
+        self.modelPoolListLabel.setObjectName(u"modelPoolListLabel")
+        self.modelPoolListLabel.setWordWrap(True)
+        self.modelPoolLayout.addWidget(self.modelPoolListLabel)
+
+        self.verticalLayout.addWidget(self.modelPoolCard)
         self.verticalLayout.addStretch()
 
         QMetaObject.connectSlotsByName(modelInterface)
\ No newline at end of file
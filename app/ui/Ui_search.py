@@ -0,0 +1,73 @@
+from PySide6.QtCore import QMetaObject
+from PySide6.QtWidgets import QVBoxLayout, QHBoxLayout, QTableView, QHeaderView, QAbstractItemView
+from qfluentwidgets import (CardWidget, BodyLabel, TitleLabel, SearchLineEdit, PushButton, FluentIcon as FIF)
+from ..view.outputLabelLineEditButtonWidget import OutputGroupWidget
+
+
+class Ui_search(object):
+    def setupUi(self, searchInterface):
+        if not searchInterface.objectName():
+            searchInterface.setObjectName(u"searchInterface")
+
+        # 主布局
+        self.verticalLayout = QVBoxLayout(searchInterface)
+        self.verticalLayout.setSpacing(20)
+        self.verticalLayout.setContentsMargins(36, 10, 36, 10)
+        self.verticalLayout.setObjectName(u"verticalLayout")
+
+        # 标题部分
+        self.titleLabel = TitleLabel(u"Search")
+        self.subtitleLabel = BodyLabel(u"在已转录的字幕中搜索，双击结果跳转到对应时间")
+        self.verticalLayout.addWidget(self.titleLabel)
+        self.verticalLayout.addWidget(self.subtitleLabel)
+
+        # 索引目录
+        self.outputGroupWidget = OutputGroupWidget(searchInterface)
+        self.outputGroupWidget.titleLabel.setText(u"字幕目录")
+        self.outputGroupWidget.label.setText(u"同步时扫描该目录下的 SRT/VTT/JSON，只重新索引新增或修改过的文件")
+        self.outputGroupWidget.lineEdit.setToolTip(u"需要建立索引的字幕目录")
+        self.verticalLayout.addWidget(self.outputGroupWidget)
+
+        # 搜索栏
+        self.searchCardWidget = CardWidget(searchInterface)
+        self.searchLayout = QHBoxLayout(self.searchCardWidget)
+        self.searchLayout.setContentsMargins(20, 12, 20, 12)
+        self.searchLayout.setSpacing(12)
+
+        self.searchLineEdit = SearchLineEdit(self.searchCardWidget)
+        self.searchLineEdit.setPlaceholderText(u"输入要搜索的文字")
+        self.searchLineEdit.setClearButtonEnabled(True)
+        self.searchLayout.addWidget(self.searchLineEdit, 1)
+
+        self.syncButton = PushButton(u"同步索引", self.searchCardWidget)
+        self.syncButton.setIcon(FIF.SYNC)
+        self.syncButton.setToolTip(u"索引在程序外新增或修改的字幕文件，并移除已删除文件的索引")
+        self.searchLayout.addWidget(self.syncButton)
+
+        self.verticalLayout.addWidget(self.searchCardWidget)
+
+        self.resultLabel = BodyLabel(u"")
+        self.verticalLayout.addWidget(self.resultLabel)
+
+        # 搜索结果
+        self.resultTableView = QTableView(searchInterface)
+        self.resultTableView.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.resultTableView.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.resultTableView.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.resultTableView.setWordWrap(False)
+        self.resultTableView.verticalHeader().setVisible(False)
+        self.verticalLayout.addWidget(self.resultTableView, 1)
+
+        QMetaObject.connectSlotsByName(searchInterface)
+
+    def setupResultHeader(self):
+        """结果模型设置后调整列宽"""
+        header = self.resultTableView.horizontalHeader()
+        header.setSectionResizeMode(0, QHeaderView.Interactive)
+        header.resizeSection(0, 240)
+        header.setSectionResizeMode(1, QHeaderView.Fixed)
+        header.resizeSection(1, 110)
+        header.setSectionResizeMode(2, QHeaderView.Stretch)
+
+    def tr(self, text):
+        return QMetaObject.tr(self, text)
@@ -1,13 +1,16 @@
 from PySide6.QtCore import QMetaObject, Qt, QSize
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
-                               QSizePolicy, QFrame, QTableWidget, QTableWidgetItem,
-                               QHeaderView, QAbstractItemView)
+                               QSizePolicy, QFrame, QTableView, QHeaderView, QAbstractItemView)
 from PySide6.QtGui import QIcon
 from qfluentwidgets import (CardWidget, PrimaryPushButton, BodyLabel, TitleLabel,
                             IconWidget, FluentIcon as FIF, TransparentPushButton,
-                            ToolButton, ScrollArea)
+                            ToolButton, ScrollArea, CheckBox, StrongBodyLabel, SwitchButton, ComboBox,
+                            SpinBox, DoubleSpinBox, PushButton)
 from ..view.fileNameListViewInterface import FileNameListView
+from ..view.transcriptionTable import (ACTION_COLUMN, METRIC_COLUMN, MODEL_COLUMN, NAME_COLUMN, STATUS_COLUMN,
+                                       ActionDelegate, StatusDelegate, TranscriptionTableModel)
 from ..view.outputLabelLineEditButtonWidget import OutputGroupWidget
+from ..view.hotFolderWatcher import HotFolderWidget
 
 
 class Ui_transcription(object):
@@ -51,27 +54,113 @@ class Ui_transcription(object):
         self.outputGroupWidget = OutputGroupWidget(transcriptionInterface)
         self.verticalLayout.addWidget(self.outputGroupWidget)
 
+        # 监视文件夹
+        self.hotFolderWidget = HotFolderWidget(transcriptionInterface)
+        self.verticalLayout.addWidget(self.hotFolderWidget)
+
+        # 输出格式
+        self.formatCardWidget = CardWidget(transcriptionInterface)
+        self.formatLayout = QHBoxLayout(self.formatCardWidget)
+        self.formatLayout.setContentsMargins(20, 12, 20, 12)
+        self.formatLayout.setSpacing(16)
+
+        self.formatLabel = StrongBodyLabel(u"输出格式")
+        self.formatLayout.addWidget(self.formatLabel)
+
+        self.srtCheckBox = CheckBox(u"SRT")
+        self.srtCheckBox.setChecked(True)
+        self.txtCheckBox = CheckBox(u"TXT")
+        self.txtCheckBox.setChecked(True)
+        self.vttCheckBox = CheckBox(u"VTT")
+        self.jsonCheckBox = CheckBox(u"JSON")
+        self.jsonCheckBox.setToolTip(u"包含段落及单词级时间戳")
+        self.timingsCheckBox = CheckBox(u"时间轴数据")
+        self.timingsCheckBox.setChecked(True)
+        self.timingsCheckBox.setToolTip(u"紧凑的段落/单词时间戳文件（.timings），重新断句、重新导出字幕时无需再次转录")
+        self.formatCheckBoxes = {
+            "srt": self.srtCheckBox,
+            "txt": self.txtCheckBox,
+            "vtt": self.vttCheckBox,
+            "json": self.jsonCheckBox,
+            "timings": self.timingsCheckBox,
+        }
+        for checkBox in self.formatCheckBoxes.values():
+            self.formatLayout.addWidget(checkBox)
+        self.formatLayout.addStretch()
+
+        # 取消转录时是否保留已经写出的部分结果
+        self.keepPartialLabel = BodyLabel(u"取消时保留部分结果")
+        self.keepPartialSwitch = SwitchButton()
+        self.keepPartialSwitch.setChecked(True)
+        self.keepPartialSwitch.setToolTip(u"关闭后，取消转录时会删除已经生成的部分字幕/文本文件")
+        self.formatLayout.addWidget(self.keepPartialLabel)
+        self.formatLayout.addWidget(self.keepPartialSwitch)
+
+        self.verticalLayout.addWidget(self.formatCardWidget)
+
+        # 重新断句：按新的排版规则从 .timings 重新生成输出目录中的字幕，无需重新转录
+        self.createResegmentCard(transcriptionInterface)
+
         # 音视频文件列表显示
         self.tableCardWidget = CardWidget(transcriptionInterface)
         self.tableCardLayout = QVBoxLayout(self.tableCardWidget)
         self.tableCardLayout.setContentsMargins(20, 16, 20, 16)
         self.tableCardLayout.setSpacing(10)
 
+        self.tableHeaderLayout = QHBoxLayout()
         self.tableLabel = TitleLabel(u"音视频文件列表")
-        self.tableCardLayout.addWidget(self.tableLabel)
-
-        # 创建表格
-        self.fileTableWidget = QTableWidget()
-        self.fileTableWidget.setObjectName(u"fileTableWidget")
-        self.fileTableWidget.setColumnCount(3)
-        self.fileTableWidget.setHorizontalHeaderLabels([u"文件名", u"状态", u"操作"])
-        self.fileTableWidget.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
-        self.fileTableWidget.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeToContents)
-        self.fileTableWidget.horizontalHeader().setSectionResizeMode(2, QHeaderView.ResizeToContents)
-        self.fileTableWidget.setEditTriggers(QAbstractItemView.NoEditTriggers)
-        self.fileTableWidget.setSelectionBehavior(QAbstractItemView.SelectRows)
-
-        self.tableCardLayout.addWidget(self.fileTableWidget)
+        self.tableHeaderLayout.addWidget(self.tableLabel)
+        self.tableHeaderLayout.addStretch()
+
+        # 本批任务的转录缓存命中统计
+        self.cacheStatsLabel = BodyLabel(u"缓存命中 0 / 未命中 0")
+        self.tableHeaderLayout.addWidget(self.cacheStatsLabel)
+        self.tableHeaderLayout.addSpacing(16)
+
+        # 性能指标列默认隐藏，每批任务结束后自动导出到输出目录
+        self.showMetricsCheckBox = CheckBox(u"显示性能指标")
+        self.showMetricsCheckBox.setToolTip(u"时长、解码/推理耗时、实时率、每秒段落数、CPU 秒数和峰值内存")
+        self.tableHeaderLayout.addWidget(self.showMetricsCheckBox)
+        self.exportMetricsButton = TransparentPushButton(u"导出指标")
+        self.exportMetricsButton.setIcon(FIF.SAVE)
+        self.exportMetricsButton.setToolTip(u"将本批任务的性能指标导出为 CSV 和 JSON")
+        self.tableHeaderLayout.addWidget(self.exportMetricsButton)
+
+        self.tableCardLayout.addLayout(self.tableHeaderLayout)
+
+        # 创建表格，数据保存在模型中，状态更新只重绘对应单元格
+        self.fileTableModel = TranscriptionTableModel(transcriptionInterface)
+        self.fileTableView = QTableView()
+        self.fileTableView.setObjectName(u"fileTableView")
+        self.fileTableView.setModel(self.fileTableModel)
+        self.fileTableView.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.fileTableView.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.fileTableView.setWordWrap(False)
+
+        # 状态列显示进度条，操作列直接绘制按钮
+        self.statusDelegate = StatusDelegate(self.fileTableView)
+        self.fileTableView.setItemDelegateForColumn(STATUS_COLUMN, self.statusDelegate)
+        self.actionDelegate = ActionDelegate(self.fileTableView)
+        self.fileTableView.setItemDelegateForColumn(ACTION_COLUMN, self.actionDelegate)
+
+        # 行高和列宽固定，不按内容计算，状态文字变化时不重新排版
+        verticalHeader = self.fileTableView.verticalHeader()
+        verticalHeader.setSectionResizeMode(QHeaderView.Fixed)
+        verticalHeader.setDefaultSectionSize(36)
+        header = self.fileTableView.horizontalHeader()
+        header.setSectionResizeMode(NAME_COLUMN, QHeaderView.Stretch)
+        header.setSectionResizeMode(STATUS_COLUMN, QHeaderView.Fixed)
+        self.fileTableView.setColumnWidth(STATUS_COLUMN, 280)
+        header.setSectionResizeMode(MODEL_COLUMN, QHeaderView.Interactive)
+        self.fileTableView.setColumnWidth(MODEL_COLUMN, 200)
+        for column in range(METRIC_COLUMN, ACTION_COLUMN):
+            header.setSectionResizeMode(column, QHeaderView.Interactive)
+            self.fileTableView.setColumnWidth(column, 90)
+            self.fileTableView.setColumnHidden(column, True)
+        header.setSectionResizeMode(ACTION_COLUMN, QHeaderView.Fixed)
+        self.fileTableView.setColumnWidth(ACTION_COLUMN, 80)
+
+        self.tableCardLayout.addWidget(self.fileTableView)
         self.verticalLayout.addWidget(self.tableCardWidget)
 
         # 启动按钮
@@ -82,10 +171,66 @@ class Ui_transcription(object):
         self.startButton.setIcon(FIF.PLAY)
         self.startButton.setFixedHeight(40)
 
+        # 转录使用的模型，可选常驻模型池中的任一模型
+        self.modelSelectLabel = BodyLabel(u"使用模型")
+        self.modelComboBox = ComboBox()
+        self.modelComboBox.setObjectName(u"modelComboBox")
+        self.modelComboBox.setMinimumWidth(260)
+        self.modelComboBox.setToolTip(u"可在'加载模型'界面加载多个模型，它们会保留在常驻模型池中")
+
         self.startButtonLayout.addStretch()
+        self.startButtonLayout.addWidget(self.modelSelectLabel)
+        self.startButtonLayout.addWidget(self.modelComboBox)
+        self.startButtonLayout.addSpacing(16)
         self.startButtonLayout.addWidget(self.startButton)
         self.startButtonLayout.addStretch()
 
         self.verticalLayout.addLayout(self.startButtonLayout)
 
-        QMetaObject.connectSlotsByName(transcriptionInterface)
\ No newline at end of file
+        QMetaObject.connectSlotsByName(transcriptionInterface)
+
+    def createResegmentCard(self, parent):
+        self.resegmentCardWidget = CardWidget(parent)
+        self.resegmentLayout = QHBoxLayout(self.resegmentCardWidget)
+        self.resegmentLayout.setContentsMargins(20, 12, 20, 12)
+        self.resegmentLayout.setSpacing(12)
+
+        self.resegmentLabel = StrongBodyLabel(u"重新断句")
+        self.resegmentLabel.setToolTip(u"使用时间轴数据（.timings）中的单词时间戳，按下列规则重新生成输出目录中的 SRT/VTT")
+        self.resegmentLayout.addWidget(self.resegmentLabel)
+
+        self.lineWidthSpinBox = SpinBox()
+        self.lineWidthSpinBox.setRange(10, 200)
+        self.lineWidthSpinBox.setValue(42)
+        self.lineWidthSpinBox.setToolTip(u"每行最大宽度，按半角字符计算，中日韩文字占 2 个宽度")
+        self.maxLinesSpinBox = SpinBox()
+        self.maxLinesSpinBox.setRange(1, 5)
+        self.maxLinesSpinBox.setValue(2)
+        self.maxLinesSpinBox.setToolTip(u"每条字幕最多行数")
+        self.minDurationSpinBox = DoubleSpinBox()
+        self.minDurationSpinBox.setRange(0.0, 10.0)
+        self.minDurationSpinBox.setSingleStep(0.1)
+        self.minDurationSpinBox.setValue(1.0)
+        self.minDurationSpinBox.setToolTip(u"最短显示时间（秒），不会与下一条字幕重叠")
+        self.maxDurationSpinBox = DoubleSpinBox()
+        self.maxDurationSpinBox.setRange(1.0, 30.0)
+        self.maxDurationSpinBox.setSingleStep(0.5)
+        self.maxDurationSpinBox.setValue(7.0)
+        self.maxDurationSpinBox.setToolTip(u"最长显示时间（秒）")
+
+        for text, spinBox in ((u"行宽", self.lineWidthSpinBox), (u"行数", self.maxLinesSpinBox),
+                              (u"最短(s)", self.minDurationSpinBox), (u"最长(s)", self.maxDurationSpinBox)):
+            self.resegmentLayout.addWidget(BodyLabel(text))
+            self.resegmentLayout.addWidget(spinBox)
+
+        self.punctuationCheckBox = CheckBox(u"按标点断句")
+        self.punctuationCheckBox.setChecked(True)
+        self.punctuationCheckBox.setToolTip(u"字幕条或行接近装满时，优先在句末、句中标点处断开")
+        self.resegmentLayout.addWidget(self.punctuationCheckBox)
+        self.resegmentLayout.addStretch()
+
+        self.resegmentButton = PushButton(u"重新生成字幕")
+        self.resegmentButton.setIcon(FIF.SYNC)
+        self.resegmentLayout.addWidget(self.resegmentButton)
+
+        self.verticalLayout.addWidget(self.resegmentCardWidget)
\ No newline at end of file
@@ -1,7 +1,7 @@
 # coding:utf-8
 import sys
 
-from PySide6.QtCore import Qt, QUrl,Slot
+from PySide6.QtCore import Qt, QUrl, Slot, QEvent, QTimer
 from PySide6.QtGui import QIcon, QDesktopServices
 from PySide6.QtWidgets import QApplication, QFrame, QHBoxLayout
 from qfluentwidgets import (NavigationItemPosition, MessageBox, setTheme, Theme, FluentWindow,
@@ -9,40 +9,62 @@ from qfluentwidgets import (NavigationItemPosition, MessageBox, setTheme, Theme,
                             InfoBadgePosition, InfoBar, InfoBarPosition)
 from qfluentwidgets import FluentIcon as FIF
 
+from ..common.lastModel import lastModelStore
+from ..common.startupReport import startupReport
 from ..view.homeInterface import homeInterface
+from ..view.lazyInterface import LazyInterface
 from ..view.downvideoInterface import downvideoInterface
 from ..view.demucsInterface import demucsInterface
 from ..view.modelInterface import modelInterface
 from ..view.fasterwhisperInterface import FasterWhisperInterface
 from ..view.transcription import transcriptionInterface
+from ..view.searchInterface import searchInterface
 
 class MainWindow(FluentWindow):
     def __init__(self):
         super().__init__()
 
-        # 创建子接口
-        self.homeInterface = homeInterface()
-        self.downvideoInterface = downvideoInterface(self)
-        self.demucsInterface = demucsInterface(self)
-        self.modelInterface =modelInterface(self)
-        self.whisperInterface = FasterWhisperInterface(self)
-        self.transcriptionInterface = transcriptionInterface(self)
+        # 创建子接口（除主页外均为占位页，首次切换到该页面时才创建真正的界面）
+        with startupReport.phase("构建 homeInterface"):
+            self.homeInterface = homeInterface()
+        self.downvideoInterface = LazyInterface("downvideoInterface", downvideoInterface, self)
+        self.demucsInterface = LazyInterface("demucsInterface", demucsInterface, self)
+        self.modelInterface = LazyInterface("modelInterface", modelInterface, self)
+        self.whisperInterface = LazyInterface("fasterwhisperInterface", FasterWhisperInterface, self)
+        self.transcriptionInterface = LazyInterface("transcriptionInterface", transcriptionInterface, self)
+        self.searchInterface = LazyInterface("searchInterface", searchInterface, self)
         # self.downvideoInterface = Widget('Download Video Interface', self)
 
 
         # 初始化导航栏
-        self.initNavigation()
+        with startupReport.phase("initNavigation"):
+            self.initNavigation()
         # 初始化界面
-        self.initWindow()
+        with startupReport.phase("initWindow"):
+            self.initWindow()
         # 连接信号
         self.connectSignals()
 
+        # 窗口显示后在后台预加载上次使用的模型
+        QTimer.singleShot(0, self.preloadLastModel)
+
     def connectSignals(self):
         """连接信号"""
         # 连接首页界面发出的导航信号
         self.homeInterface.navigateToInterface.connect(self.navigateToInterface)
 
-        self.modelInterface.modelLoaded.connect(self.onModelLoaded)
+        # 模型界面创建后再连接模型加载信号
+        self.modelInterface.whenBuilt(self.connectModelSignals)
+
+        # 转录界面开始转录时从参数设置界面读取参数
+        self.transcriptionInterface.whenBuilt(
+            lambda interface: interface.setParametersProvider(self.getWhisperParameters))
+
+    def connectModelSignals(self, interface):
+        interface.modelLoaded.connect(self.onModelLoaded)
+        interface.modelPreloaded.connect(self.onModelPreloaded)
+        interface.loadingChanged.connect(
+            lambda loading: self.transcriptionInterface.whenBuilt(lambda widget: widget.setModelPending(loading)))
 
     def initNavigation(self):
 
@@ -56,6 +78,7 @@ class MainWindow(FluentWindow):
         self.addSubInterface(self.modelInterface, FIF.PAGE_RIGHT, "加载模型", NavigationItemPosition.SCROLL)
         self.addSubInterface(self.whisperInterface, FIF.SETTING, "参数设置", NavigationItemPosition.SCROLL)
         self.addSubInterface(self.transcriptionInterface, FIF.HEADPHONE, "转录", NavigationItemPosition.SCROLL)
+        self.addSubInterface(self.searchInterface, FIF.SEARCH, "字幕搜索", NavigationItemPosition.SCROLL)
         # 添加作者信息
         # self.navigationInterface.addWidget(
         #     routeKey='cherish',
@@ -65,6 +88,17 @@ class MainWindow(FluentWindow):
         # )
 
 
+    def watchFirstPaint(self):
+        """启动报告：记录窗口第一次绘制的时间"""
+        self.installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        if obj is self and event.type() == QEvent.Paint:
+            self.removeEventFilter(self)
+            startupReport.mark("首次绘制")
+            QTimer.singleShot(0, startupReport.write)
+        return super().eventFilter(obj, event)
+
     def initWindow(self):
         self.resize(1200, 900) # 设置窗口大小
         self.setWindowIcon(QIcon('resources/images/1.jpg'))  # 添加应用图标
@@ -85,6 +119,7 @@ class MainWindow(FluentWindow):
              "model": self.modelInterface,
              "whisper": self.whisperInterface,
              "transcription": self.transcriptionInterface,
+             "search": self.searchInterface,
             # "batch": self.batchInterface
         }
 
@@ -92,14 +127,41 @@ class MainWindow(FluentWindow):
         if route in routeMap:
             self.switchTo(routeMap[route])
 
+    def getWhisperParameters(self):
+        """获取参数设置界面的参数，参数界面未打开过时返回 None（使用转录界面的默认参数）"""
+        if not self.whisperInterface.isBuilt():
+            return None
+        return self.whisperInterface.widget().getParameters()
+
+    def preloadLastModel(self):
+        """开启了启动时预加载时，按上次成功加载的参数在后台加载模型"""
+        model_param = lastModelStore.modelParam()
+        if model_param is None or not lastModelStore.preloadEnabled():
+            return
+        with startupReport.phase("预加载模型"):
+            self.modelInterface.widget().preloadModel(model_param)
+
+    def setTranscriptionModel(self, model):
+        # 将模型及其加载参数传递给转录界面（转录界面尚未创建时，等创建后再传递）
+        # 回调中读取模型页面的当前模型，不持有已被替换的旧模型
+        modelInterface = self.modelInterface.widget()
+        self.transcriptionInterface.whenBuilt(
+            lambda interface: interface.setModel(modelInterface.model, modelInterface.model_param))
+
+    def onModelPreloaded(self, model):
+        """后台预加载完成，不打断当前操作"""
+        self.setTranscriptionModel(model)
+        InfoBar.success(
+            title="模型已就绪",
+            content="已在后台加载上次使用的模型",
+            duration=3000,
+            position=InfoBarPosition.TOP,
+            parent=self
+        )
+
     def onModelLoaded(self, model):
         """模型加载完成"""
-        # 将模型传递给转录界面
-        self.transcriptionInterface.setModel(model)
-
-        # 获取Whisper参数设置并传递给转录界面
-        whisper_params = self.fasterwhisperInterface.getParameters()
-        self.transcriptionInterface.setWhisperParameters(whisper_params)
+        self.setTranscriptionModel(model)
 
         # 切换到转录界面
         self.switchTo(self.transcriptionInterface)
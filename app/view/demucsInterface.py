@@ -3,13 +3,12 @@ from PySide6.QtWidgets import QWidget, QFileDialog, QMessageBox
 from qfluentwidgets import InfoBar, InfoBarPosition, FluentIcon as FIF
 
 import os
-import torch
-from torchaudio.pipelines import HDEMUCS_HIGH_MUSDB_PLUS
-from torchaudio.transforms import Fade
-import torchaudio
-import numpy as np
 
+from app.common.admission import admissionController, estimateSeparationBytes
+from app.common.lazyModules import getTorch, getTorchaudio
+from app.common.speechMap import probeDuration
 from app.ui.Ui_demucs import Ui_demucs
+from app.view.hotFolderWatcher import HotFolderWatcher
 # from .style_sheet import StyleSheet
 
 
@@ -34,8 +33,11 @@ class DemucsWorker(QThread):
     def run(self):
         self.is_running = True
 
+        torch = getTorch()
         device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         print(f"设备: {device}")
+        if device.type == "cuda":
+            print(f"使用GPU: {torch.cuda.get_device_name()}")
 
         if not self.is_running:
             return
@@ -54,76 +56,96 @@ class DemucsWorker(QThread):
             if not self.is_running:
                 break
 
-            self.file_process_status.emit({"file": audio_file, "status": False, "task": "重采样音频"})
-            print(f"当前任务: {audio_file}")
-            print("重采样音频...")
+            # 按时长和分段长度估算内存，超出全局预算时等待其他任务释放
+            admission_key = ("separation", audio_file)
+            nbytes = estimateSeparationBytes(probeDuration(audio_file), self.segment, self.sampleRate)
+            if not admissionController.wait(
+                    admission_key, nbytes, f"音频分离 {os.path.basename(audio_file)}",
+                    should_stop=lambda: not self.is_running,
+                    on_wait=lambda reason, audio_file=audio_file: self.file_process_status.emit(
+                        {"file": audio_file, "status": False, "task": reason})):
+                break
 
             try:
-                samples = self.load_audio(audio_file, 44100, device=device)
-            except Exception as e:
-                print(f"重采样音频出错:\n{str(e)}")
-                continue
+                if not self.separateFile(audio_file, device, torch):
+                    break
+            finally:
+                admissionController.release(admission_key)
 
-            if not self.is_running:
-                break
+        # 处理完成，发送完成信号
+        self.signal_vr_over.emit(True)
+        print("处理完成!")
 
-            print("分离音轨...")
-            self.file_process_status.emit({"file": audio_file, "status": False, "task": "分离音轨"})
+        # 清理资源
+        del self.model
+        self.model = None
 
-            try:
-                sources = self.separate_sources(
-                    self.model,
-                    samples[None],
-                    self.segment,
-                    self.overlap,
-                    device,
-                    self.sampleRate
-                )
-            except Exception as e:
-                print(f"\n分离音轨出错:\n    {str(e)}")
-                continue
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
 
-            if (sources is None) or (not self.is_running):
-                continue
+        self.stop()
 
-            self.file_process_status.emit({"file": audio_file, "status": False, "task": "保存文件"})
-            print("保存文件...")
+    def separateFile(self, audio_file, device, torch):
+        """处理单个文件，需要停止处理时返回 False"""
+        self.file_process_status.emit({"file": audio_file, "status": False, "task": "重采样音频"})
+        print(f"当前任务: {audio_file}")
+        print("重采样音频...")
 
-            try:
-                self.save_result(
-                    sources=sources,
-                    file_path=audio_file,
-                    model=self.model,
-                    stems=self.stems,
-                    output_path=self.output_path
-                )
+        try:
+            samples = self.load_audio(audio_file, 44100, device=device)
+        except Exception as e:
+            print(f"重采样音频出错:\n{str(e)}")
+            return True
 
-            except Exception as e:
-                print(f"保存音频出错:\n{str(e)}")
-                continue
+        if not self.is_running:
+            return False
 
-            if not self.is_running:
-                break
+        print("分离音轨...")
+        self.file_process_status.emit({"file": audio_file, "status": False, "task": "分离音轨"})
 
-            self.file_process_status.emit({"file": audio_file, "status": True, "task": "处理完成"})
-            del samples
-            del sources
+        try:
+            sources = self.separate_sources(
+                self.model,
+                samples[None],
+                self.segment,
+                self.overlap,
+                device,
+                self.sampleRate
+            )
+        except Exception as e:
+            print(f"\n分离音轨出错:\n    {str(e)}")
+            return True
 
-            if torch.cuda.is_available():
-                torch.cuda.empty_cache()
+        if (sources is None) or (not self.is_running):
+            return True
 
-        # 处理完成，发送完成信号
-        self.signal_vr_over.emit(True)
-        print("处理完成!")
+        self.file_process_status.emit({"file": audio_file, "status": False, "task": "保存文件"})
+        print("保存文件...")
 
-        # 清理资源
-        del self.model
-        self.model = None
+        try:
+            self.save_result(
+                sources=sources,
+                file_path=audio_file,
+                model=self.model,
+                stems=self.stems,
+                output_path=self.output_path
+            )
+
+        except Exception as e:
+            print(f"保存音频出错:\n{str(e)}")
+            return True
+
+        if not self.is_running:
+            return False
+
+        self.file_process_status.emit({"file": audio_file, "status": True, "task": "处理完成"})
+        del samples
+        del sources
 
         if torch.cuda.is_available():
             torch.cuda.empty_cache()
 
-        self.stop()
+        return True
 
     def stop(self):
         self.is_running = False
@@ -134,6 +156,9 @@ class DemucsWorker(QThread):
         os.makedirs(os.path.dirname(self.model_path), exist_ok=True)
         print(f"模型路径: {self.model_path}")
 
+        torch = getTorch()
+        from torchaudio.pipelines import HDEMUCS_HIGH_MUSDB_PLUS
+
         # 不直接设置模型路径，而是让torchaudio自动处理下载
         bundle = HDEMUCS_HIGH_MUSDB_PLUS
 
@@ -168,6 +193,8 @@ class DemucsWorker(QThread):
 
     def load_audio(self, file_path, sample_rate, device):
         """加载并重采样音频"""
+        torch = getTorch()
+        torchaudio = getTorchaudio()
         file_path = os.path.abspath(file_path)
 
         try:
@@ -219,6 +246,9 @@ class DemucsWorker(QThread):
 
     def separate_sources(self, model, mix, segment=10.0, overlap=0.1, device=None, sample_rate=44100):
         """分离音轨"""
+        torch = getTorch()
+        from torchaudio.transforms import Fade
+
         if device is None:
             device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
             model.to(device)
@@ -314,7 +344,7 @@ class DemucsWorker(QThread):
             output_fileName = os.path.join(output_path, f"{file_output}_{stem}.wav")
             print(f"保存文件: {output_fileName}")
 
-            torchaudio.save(output_fileName, spec, self.sampleRate)
+            getTorchaudio().save(output_fileName, spec, self.sampleRate)
 
 class demucsInterface(QWidget, Ui_demucs):
     def __init__(self, parent=None):
@@ -330,15 +360,13 @@ class demucsInterface(QWidget, Ui_demucs):
         # 初始化工作线程
         self.demucs_worker = None
 
+        # 监视文件夹，处理中出现的新文件等本次处理结束后再处理
+        self.hotFolderWatcher = HotFolderWatcher(self.isSeparated, self)
+        self.watch_pending = []
+
         # 连接信号
         self.connectSignals()
 
-        # 检查可用设备
-        if torch.cuda.is_available():
-            print(f"使用GPU: {torch.cuda.get_device_name()}")
-        else:
-            print("使用CPU (GPU不可用)")
-
         # 添加警告屏蔽
         import warnings
         warnings.filterwarnings("ignore", category=FutureWarning, module="torchaudio.pipelines")
@@ -351,6 +379,10 @@ class demucsInterface(QWidget, Ui_demucs):
         # 连接输出目录选择
         self.outputGroupWidget.toolButton.clicked.connect(self.selectOutputDirectory)
 
+        # 监视文件夹
+        self.hotFolderWidget.watchToggled.connect(self.setWatchFolder)
+        self.hotFolderWatcher.fileReady.connect(self.onWatchedFileReady)
+
     def selectOutputDirectory(self):
         """选择输出目录"""
         directory = QFileDialog.getExistingDirectory(
@@ -392,6 +424,10 @@ class demucsInterface(QWidget, Ui_demucs):
             )
             return
 
+        self.startWorker(files)
+
+    def startWorker(self, files):
+        """创建工作线程处理 files"""
         # 获取参数
         segment = self.spinBox_segment.value()
         overlap = self.spinBox_overlap.value()
@@ -414,6 +450,8 @@ class demucsInterface(QWidget, Ui_demucs):
         # 连接信号
         self.demucs_worker.signal_vr_over.connect(self.processingFinished)
         self.demucs_worker.file_process_status.connect(self.updateProcessStatus)
+        # 线程真正退出后再处理期间出现的新文件，完成信号发出后、线程退出前到达的文件也不会遗漏
+        self.demucs_worker.finished.connect(lambda worker=self.demucs_worker: self.onWorkerStopped(worker))
 
         # 开始处理
         self.demucs_worker.start()
@@ -451,9 +489,58 @@ class demucsInterface(QWidget, Ui_demucs):
         else:
             status_text = task
 
-        # 这里可以添加状态显示逻辑，比如状态栏或进度条
+        self.statusLabel.setText(status_text)
         print(status_text)
 
+    def setWatchFolder(self, enabled, folder):
+        """开启/关闭监视文件夹，新文件写入完成后自动分离"""
+        if not enabled:
+            self.hotFolderWatcher.stop()
+            self.hotFolderWidget.setWatching(False)
+            return
+
+        if not self.hotFolderWatcher.start(folder):
+            self.hotFolderWidget.setWatching(False)
+            InfoBar.error(
+                title=self.tr("错误"),
+                content=self.tr(f"无法监视文件夹: {folder or '未选择'}"),
+                parent=self,
+                position=InfoBarPosition.TOP,
+                duration=3000
+            )
+            return
+        self.hotFolderWidget.setWatching(True)
+
+    def isSeparated(self, file_path):
+        """输出目录中已有比媒体文件新的分离结果"""
+        data_dir, file_name = os.path.split(file_path)
+        base_name = os.path.splitext(file_name)[0]
+        output_dir = os.path.join(self.outputGroupWidget.lineEdit.text() or data_dir, base_name)
+        try:
+            media_mtime = os.path.getmtime(file_path)
+            return any(entry.name.startswith(base_name + "_") and entry.name.endswith(".wav")
+                       and entry.stat().st_mtime >= media_mtime for entry in os.scandir(output_dir))
+        except OSError:
+            return False
+
+    def onWorkerStopped(self, worker):
+        """工作线程退出后处理期间监视文件夹中出现的新文件"""
+        if worker is not self.demucs_worker or not self.watch_pending:
+            return
+        # finished 在线程结束前发出，等线程完全退出，之后到达的文件看到的就是空闲状态
+        worker.wait()
+        files, self.watch_pending = self.watch_pending, []
+        self.startWorker(files)
+
+    def onWatchedFileReady(self, file_path):
+        """监视文件夹中的新文件：加入文件列表，空闲时立即处理，否则等本次处理结束"""
+        self.fileListView.addFilesToList([file_path])
+        if self.demucs_worker and self.demucs_worker.isRunning():
+            if file_path not in self.watch_pending and file_path not in self.demucs_worker.audio_files:
+                self.watch_pending.append(file_path)
+            return
+        self.startWorker([file_path])
+
     def getParam(self):
         """获取界面参数"""
         param = {}
@@ -5,7 +5,8 @@ from PySide6.QtWidgets import QWidget, QFileDialog, QMessageBox
 from PySide6.QtCore import Qt, QThread, Signal
 from app.ui.Ui_downvideo import Ui_downvideo
 from qfluentwidgets import InfoBar, InfoBarPosition
-import yt_dlp
+
+from app.common.lazyModules import getYtDlp
 
 
 class DownloadThread(QThread):
@@ -42,7 +43,7 @@ class DownloadThread(QThread):
             if self.cookies_path and os.path.exists(self.cookies_path):
                 ydl_opts['cookiefile'] = self.cookies_path
 
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            with getYtDlp().YoutubeDL(ydl_opts) as ydl:
                 ydl.download([self.url])
 
             self.finished_signal.emit(True, "下载完成！")
@@ -69,7 +70,7 @@ class InfoThread(QThread):
             if self.cookies_path and os.path.exists(self.cookies_path):
                 ydl_opts['cookiefile'] = self.cookies_path
 
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            with getYtDlp().YoutubeDL(ydl_opts) as ydl:
                 info = ydl.extract_info(self.url, download=False)
                 self.info_signal.emit(info)
         except Exception as e:
@@ -81,6 +81,15 @@ class FasterWhisperInterface(QWidget, Ui_fasterwhisper):
         else:
             params["clip_timestamps"] = None
 
+        # VAD参数
+        params["vad_filter"] = self.vadFilterSwitch.isChecked()
+        params["vad_parameters"] = {
+            "threshold": float(self.vadThresholdLineEdit.text()),
+            "min_speech_duration_ms": int(self.vadMinSpeechLineEdit.text()),
+            "min_silence_duration_ms": int(self.vadMinSilenceLineEdit.text()),
+            "speech_pad_ms": int(self.vadSpeechPadLineEdit.text()),
+        }
+
         # 幻听参数
         hallucination_threshold = self.hallucinationThresholdLineEdit.text()
         params["hallucination_silence_threshold"] = float(hallucination_threshold) if hallucination_threshold else 0.0
@@ -161,6 +170,14 @@ class FasterWhisperInterface(QWidget, Ui_fasterwhisper):
         if params.get("clip_timestamps"):
             self.clipTimestampsLineEdit.setText(params["clip_timestamps"])
 
+        # VAD参数
+        self.vadFilterSwitch.setChecked(params.get("vad_filter", False))
+        vad_parameters = params.get("vad_parameters") or {}
+        self.vadThresholdLineEdit.setText(str(vad_parameters.get("threshold", 0.5)))
+        self.vadMinSpeechLineEdit.setText(str(vad_parameters.get("min_speech_duration_ms", 250)))
+        self.vadMinSilenceLineEdit.setText(str(vad_parameters.get("min_silence_duration_ms", 2000)))
+        self.vadSpeechPadLineEdit.setText(str(vad_parameters.get("speech_pad_ms", 400)))
+
         # 幻听参数
         if "hallucination_silence_threshold" in params:
             self.hallucinationThresholdLineEdit.setText(str(params["hallucination_silence_threshold"]))
@@ -96,11 +96,13 @@ class FileNameListView(CardWidget):
     def addFilesToList(self, files):
         """将文件添加到列表"""
         current_files = self.listModel.stringList()
+        existing = set(current_files)
         new_files = []
 
-        # 过滤已经存在的文件和不存在的文件
+        # 过滤已经存在的文件和不存在的文件，用集合判重，一次添加上万个文件也不会变慢
         for file in files:
-            if file not in current_files and os.path.isfile(file):
+            if file not in existing and os.path.isfile(file):
+                existing.add(file)
                 new_files.append(file)
 
         if not new_files:
@@ -0,0 +1,167 @@
+from PySide6.QtCore import Qt, Signal, QObject, QTimer, QFileSystemWatcher
+from PySide6.QtWidgets import QHBoxLayout, QVBoxLayout, QFileDialog
+from qfluentwidgets import (CardWidget, TitleLabel, BodyLabel, LineEdit, ToolButton, SwitchButton,
+                            FluentIcon as FIF)
+
+import os
+import time
+
+# 监视文件夹时处理的媒体文件类型，与添加文件对话框中的类型一致
+MEDIA_EXTENSIONS = (".mp3", ".wav", ".flac", ".ogg", ".aac", ".m4a", ".mp4", ".avi", ".mkv", ".mov")
+
+CHECK_INTERVAL_MS = 1000
+STABLE_SECONDS = 3.0  # 大小和修改时间保持不变的时间，超过后认为文件已写完
+
+
+class HotFolderWatcher(QObject):
+    """监视文件夹，把新出现且已写完的媒体文件交给处理队列
+
+    QFileSystemWatcher 只通知目录发生了变化（Linux 上基于 inotify），收到通知后扫描目录找出新文件；
+    仍在写入的文件每秒检查一次大小和修改时间，连续 STABLE_SECONDS 秒不变后才发出 fileReady。
+    同一文件（路径 + 大小 + 修改时间）只发出一次，is_finished(path) 返回 True 的文件视为已处理过。
+    """
+
+    fileReady = Signal(str)
+
+    def __init__(self, is_finished=None, parent=None):
+        super().__init__(parent)
+        self.is_finished = is_finished
+        self.folder = ""
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self.scan)
+        self.pending = {}  # 文件路径 -> ((大小, 修改时间), 开始保持不变的时间)
+        self.handled = {}  # 文件路径 -> 已处理时的 (大小, 修改时间)
+        self.timer = QTimer(self)
+        self.timer.setInterval(CHECK_INTERVAL_MS)
+        self.timer.timeout.connect(self.checkPending)
+
+    def isWatching(self):
+        return bool(self.folder)
+
+    def start(self, folder):
+        self.stop()
+        folder = os.path.abspath(folder)
+        if not os.path.isdir(folder) or not self.watcher.addPath(folder):
+            return False
+        self.folder = folder
+        self.scan()
+        return True
+
+    def stop(self):
+        if self.watcher.directories():
+            self.watcher.removePaths(self.watcher.directories())
+        self.folder = ""
+        self.pending.clear()
+        self.timer.stop()
+
+    def scan(self, *_):
+        """目录变化时找出新文件，加入待检查列表"""
+        if not self.folder:
+            return
+        try:
+            entries = list(os.scandir(self.folder))
+        except OSError:
+            return
+
+        now = time.monotonic()
+        for entry in entries:
+            if not entry.name.lower().endswith(MEDIA_EXTENSIONS) or entry.name.startswith("."):
+                continue
+            try:
+                if not entry.is_file():
+                    continue
+                stat = entry.stat()
+            except OSError:
+                continue
+            path = entry.path
+            snapshot = (stat.st_size, stat.st_mtime)
+            if path in self.pending or self.handled.get(path) == snapshot:
+                continue
+            self.pending[path] = (snapshot, now)
+
+        if self.pending and not self.timer.isActive():
+            self.timer.start()
+
+    def checkPending(self):
+        now = time.monotonic()
+        for path, (snapshot, since) in list(self.pending.items()):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                # 文件被移走或删除
+                del self.pending[path]
+                continue
+
+            current = (stat.st_size, stat.st_mtime)
+            if current != snapshot or stat.st_size == 0:
+                self.pending[path] = (current, now)
+                continue
+            if now - since < STABLE_SECONDS:
+                continue
+
+            del self.pending[path]
+            self.handled[path] = current
+            if self.is_finished is not None and self.is_finished(path):
+                continue
+            self.fileReady.emit(path)
+
+        if not self.pending:
+            self.timer.stop()
+
+
+class HotFolderWidget(CardWidget):
+    """监视文件夹设置：目录输入框、选择按钮和开关"""
+
+    watchToggled = Signal(bool, str)  # 是否开启, 目录
+
+    def __init__(self, parent=None):
+        super().__init__(parent=parent)
+        self.setupUi()
+        self.toolButton.clicked.connect(self.selectFolder)
+        self.switchButton.checkedChanged.connect(lambda checked: self.watchToggled.emit(checked, self.folder()))
+
+    def setupUi(self):
+        self.mainLayout = QVBoxLayout(self)
+        self.mainLayout.setContentsMargins(20, 16, 20, 16)
+        self.mainLayout.setSpacing(10)
+
+        self.titleLayout = QHBoxLayout()
+        self.titleLabel = TitleLabel(self.tr("监视文件夹"))
+        self.switchButton = SwitchButton()
+        self.switchButton.setToolTip(self.tr("开启后，放入该文件夹的新媒体文件写入完成后自动加入处理队列"))
+        self.titleLayout.addWidget(self.titleLabel)
+        self.titleLayout.addStretch()
+        self.titleLayout.addWidget(self.switchButton)
+        self.mainLayout.addLayout(self.titleLayout)
+
+        self.label = BodyLabel(self.tr("文件大小和修改时间稳定后才会处理，已处理过的文件不会重复处理"))
+        self.label.setAlignment(Qt.AlignLeft | Qt.AlignVCenter)
+        self.mainLayout.addWidget(self.label)
+
+        self.hLayout = QHBoxLayout()
+        self.hLayout.setSpacing(8)
+        self.lineEdit = LineEdit()
+        self.lineEdit.setPlaceholderText(self.tr("选择需要监视的文件夹"))
+        self.lineEdit.setClearButtonEnabled(True)
+        self.toolButton = ToolButton()
+        self.toolButton.setIcon(FIF.FOLDER)
+        self.toolButton.setToolTip(self.tr("选择监视的文件夹"))
+        self.hLayout.addWidget(self.lineEdit)
+        self.hLayout.addWidget(self.toolButton)
+        self.mainLayout.addLayout(self.hLayout)
+
+    def folder(self):
+        return self.lineEdit.text().strip()
+
+    def selectFolder(self):
+        directory = QFileDialog.getExistingDirectory(self, self.tr("选择监视的文件夹"), self.folder())
+        if directory:
+            self.lineEdit.setText(directory)
+
+    def setWatching(self, watching):
+        """同步开关状态（例如目录无效时关闭开关），不重复发出 watchToggled"""
+        self.switchButton.blockSignals(True)
+        self.switchButton.setChecked(watching)
+        self.switchButton.blockSignals(False)
+        self.lineEdit.setEnabled(not watching)
+        self.toolButton.setEnabled(not watching)
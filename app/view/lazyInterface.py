@@ -0,0 +1,55 @@
+from PySide6.QtCore import Signal
+from PySide6.QtWidgets import QWidget, QVBoxLayout
+
+from app.common.startupReport import startupReport
+
+
+class LazyInterface(QWidget):
+    """子界面占位页
+
+    注册到导航栏的是这个占位页，真正的界面在第一次显示（switchTo/导航切换）或第一次被访问时才创建。
+    """
+
+    built = Signal(QWidget)
+
+    def __init__(self, objectName, factory, parent=None):
+        super().__init__(parent=parent)
+        # 导航栏使用 objectName 作为路由键
+        self.setObjectName(objectName)
+        self.factory = factory
+        self.interface = None
+        self.pendingCallbacks = []
+
+        self.vBoxLayout = QVBoxLayout(self)
+        self.vBoxLayout.setContentsMargins(0, 0, 0, 0)
+
+    def isBuilt(self):
+        return self.interface is not None
+
+    def widget(self):
+        """返回真正的界面，尚未创建时立即创建"""
+        if self.interface is None:
+            with startupReport.phase(f"构建 {self.objectName()}"):
+                self.interface = self.factory(self)
+            self.vBoxLayout.addWidget(self.interface)
+            self.interface.show()
+
+            # 执行界面创建之前积攒的跨界面调用
+            callbacks, self.pendingCallbacks = self.pendingCallbacks, []
+            for callback in callbacks:
+                callback(self.interface)
+
+            self.built.emit(self.interface)
+
+        return self.interface
+
+    def whenBuilt(self, callback):
+        """界面已创建时立即调用 callback(界面)，否则等到创建后再调用"""
+        if self.interface is not None:
+            callback(self.interface)
+        else:
+            self.pendingCallbacks.append(callback)
+
+    def showEvent(self, event):
+        self.widget()
+        super().showEvent(event)
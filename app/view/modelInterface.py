@@ -3,49 +3,74 @@ from PySide6.QtWidgets import QWidget, QFileDialog
 from PySide6.QtGui import QFont
 from qfluentwidgets import InfoBar, InfoBarPosition, FluentIcon as FIF
 
+from app.common.admission import admissionController
+from app.common.autotune import autotuneStore, formatCandidate, formatMemory, modelTuneKey, runAutotune
+from app.common.lastModel import lastModelStore
+from app.common.modelPool import modelKey, modelPool
+from app.common.whisperModelLoader import (MODEL_ARGS, applyV3MelFilters, createWhisperModel,
+                                           readaheadModelFiles, readModelFiles, warmUpModel)
 from app.ui.Ui_model import Ui_model
-from faster_whisper import WhisperModel
-import torch
 import os
+import time
+
+# 推理模式，顺序与界面下拉框一致
+INFERENCE_MODES = ["sequential", "batched", "parallel", "streaming"]
+
+# 模型加载的各阶段，顺序与加载过程一致
+LOAD_STAGES = (
+    ("read", "读取文件"),
+    ("build", "构建模型"),
+    ("mel", "mel 滤波器修正"),
+    ("warm_up", "预热"),
+)
+
+
+def formatLoadTimes(load_times):
+    """加载耗时明细，如：读取文件 1.20s · 构建模型 2.31s · 合计 3.51s"""
+    parts = [f"{name} {load_times[stage]:.2f}s" for stage, name in LOAD_STAGES if stage in load_times]
+    parts.append(f"合计 {sum(load_times.values()):.2f}s")
+    return " · ".join(parts)
 
 
 class LoadModelWorker(QThread):
     setStatusSignal = Signal(bool)
     loadModelOverSignal = Signal(bool)
 
-    def __init__(self, modelParam, use_v3_model=False, parent=None):
+    def __init__(self, modelParam, use_v3_model=False, warm_up=False, parent=None):
         super().__init__(parent=parent)
         self.isRunning = False
+        self.model_param = modelParam
         self.model_size_or_path = modelParam["model_size_or_path"]
-        self.device = modelParam["device"]
-        self.device_index = modelParam["device_index"]
-        self.compute_type = modelParam["compute_type"]
-        self.cpu_threads = modelParam["cpu_threads"]
-        self.num_workers = modelParam["num_workers"]
         self.use_v3_model = use_v3_model
+        self.warm_up = warm_up
 
         self.model = None
+        self.load_times = {}  # 阶段 -> 耗时（秒），见 LOAD_STAGES
 
     def run(self) -> None:
         self.isRunning = True
 
         try:
-            self.model = WhisperModel(
-                model_size_or_path=self.model_size_or_path,
-                device=self.device,
-                device_index=self.device_index,
-                compute_type=self.compute_type,
-                cpu_threads=self.cpu_threads,
-                num_workers=self.num_workers
-            )
-
+            self.load_times = {}
+            stage_start = time.perf_counter()
+
+            def finishStage(stage):
+                nonlocal stage_start
+                now = time.perf_counter()
+                self.load_times[stage] = now - stage_start
+                stage_start = now
+
+            read_bytes = readModelFiles(self.model_size_or_path)
+            finishStage("read")
+            self.model = createWhisperModel(self.model_param)
+            finishStage("build")
             if self.use_v3_model:
                 print("\n[Using V3 model, modify number of mel-filters to 128]")
-                self.model.feature_extractor.mel_filters = self.model.feature_extractor.get_mel_filters(
-                    self.model.feature_extractor.sampling_rate,
-                    self.model.feature_extractor.n_fft,
-                    n_mels=128
-                )
+                applyV3MelFilters(self.model)
+                finishStage("mel")
+            if self.warm_up:
+                warmUpModel(self.model)
+                finishStage("warm_up")
 
             print("\nLoad over")
             print(self.model_size_or_path)
@@ -54,6 +79,7 @@ class LoadModelWorker(QThread):
             print("time_precision: ", self.model.time_precision)
             print("tokens_per_second: ", self.model.tokens_per_second)
             print("input_stride: ", self.model.input_stride)
+            print(f"read {read_bytes / 1024 ** 2:.0f} MB, {formatLoadTimes(self.load_times)}")
 
             self.setStatusSignal.emit(True)
             self.loadModelOverSignal.emit(True)
@@ -68,22 +94,63 @@ class LoadModelWorker(QThread):
         self.isRunning = False
 
 
+class AutotuneWorker(QThread):
+    progressSignal = Signal(str)
+    autotuneOverSignal = Signal(object, object)  # 最快的组合（全部失败时为 None）, 全部结果
+
+    def __init__(self, modelParam, parent=None):
+        super().__init__(parent=parent)
+        self.model_param = modelParam
+        self.stop_requested = False
+
+    def run(self) -> None:
+        def progress(index, total, candidate):
+            self.progressSignal.emit(f"自动调优中 {index + 1}/{total}: {formatCandidate(candidate)}")
+
+        best, results = runAutotune(self.model_param, progress=progress, should_stop=lambda: self.stop_requested)
+        # 中途停止时只填入已测组合中最快的，不保存
+        if best is not None and not self.stop_requested:
+            autotuneStore.put(self.model_param, best, results)
+        self.autotuneOverSignal.emit(best, results)
+
+    def stop(self):
+        self.stop_requested = True
+
+
 class modelInterface(QWidget, Ui_model):
-    modelLoaded = Signal(WhisperModel)
+    modelLoaded = Signal(object)  # WhisperModel，避免在导入时加载 faster_whisper
+    modelPreloaded = Signal(object)  # 启动时后台预加载完成，不切换界面
+    loadingChanged = Signal(bool)  # 开始/结束后台加载
 
     def __init__(self, parent=None):
         super().__init__(parent=parent)
         self.setupUi(self)
         self.model = None
+        self.model_param = None
         self.load_model_worker = None
+        self.preloading = False
+        self.autotune_worker = None
+        self.autotune_rerun_key = None  # 已套用保存结果的模型，再次点击时重新测试
+
+        # 填入上次成功加载的参数
+        last_model_param = lastModelStore.modelParam()
+        if last_model_param is not None:
+            self.applyModelParam(last_model_param)
+        self.preloadSwitch.setChecked(lastModelStore.preloadEnabled())
 
         # 信号连接
         self.connectSignals()
+        modelPool.addListener(self.updatePoolStatus)
+        self.updatePoolStatus()
 
     def connectSignals(self):
         self.modelLocalRadioButton.toggled.connect(self.setModelLocationLayout)
         self.modelPathButton.clicked.connect(self.selectModelPath)
         self.loadModelButton.clicked.connect(self.loadModel)
+        self.autotuneButton.clicked.connect(self.autotune)
+        self.preloadSwitch.checkedChanged.connect(lastModelStore.setPreload)
+        self.poolBudgetLineEdit.editingFinished.connect(self.setPoolBudget)
+        self.jobBudgetLineEdit.editingFinished.connect(self.setJobBudget)
 
     def setModelLocationLayout(self):
         # 设置本地模型相关控件的启用状态
@@ -95,11 +162,55 @@ class modelInterface(QWidget, Ui_model):
         if model_path:
             self.modelPathLineEdit.setText(model_path)
 
-    def loadModel(self):
-        if self.load_model_worker and self.load_model_worker.isRunning:
+    def applyModelParam(self, model_param):
+        """把保存的加载参数填入界面"""
+        self.modelLocalRadioButton.setChecked(True)
+        self.modelPathLineEdit.setText(model_param["model_size_or_path"])
+        self.deviceComboBox.setCurrentText(model_param.get("device", "cpu"))
+        device_index = model_param.get("device_index", 0)
+        if isinstance(device_index, list):
+            self.deviceIndexLineEdit.setText(",".join(str(idx) for idx in device_index))
+        else:
+            self.deviceIndexLineEdit.setText(str(device_index))
+        self.computeTypeComboBox.setCurrentText(model_param.get("compute_type", "float32"))
+        self.cpuThreadsLineEdit.setText(str(model_param.get("cpu_threads", 4)))
+        self.numWorkersLineEdit.setText(str(model_param.get("num_workers", 1)))
+        self.useV3Switch.setChecked(bool(model_param.get("use_v3_model", False)))
+        inference_mode = model_param.get("inference_mode", "sequential")
+        if inference_mode in INFERENCE_MODES:
+            self.inferenceModeComboBox.setCurrentIndex(INFERENCE_MODES.index(inference_mode))
+        self.batchSizeLineEdit.setText(str(model_param.get("batch_size", 8)))
+        self.processCountLineEdit.setText(str(model_param.get("process_count", 2)))
+
+    def preloadModel(self, model_param):
+        """启动时按上次的参数在后台加载模型：先让系统预读模型文件，加载完成后不切换界面"""
+        if self.model is not None or (self.load_model_worker and self.load_model_worker.isRunning):
             return
+        if self.autotune_worker is not None:
+            return
+        self.applyModelParam(model_param)
+        readahead_bytes = readaheadModelFiles(model_param["model_size_or_path"])
+        print(f"\n[Preload] readahead {readahead_bytes / 1024 ** 2:.0f} MB: {model_param['model_size_or_path']}")
+
+        self.preloading = True
+        self.loadModel()
+        # 加载线程已启动时加载按钮处于禁用状态；参数无效未开始加载，或直接取用了常驻模型时不再标记预加载
+        if self.preloading and not self.loadModelButton.isEnabled():
+            self.modelNotLoadedLabel.setText("正在后台预加载上次使用的模型...")
+        else:
+            self.preloading = False
+
+    def emitModelLoaded(self):
+        """保存本次成功加载的参数并通知主窗口，后台预加载时发出 modelPreloaded"""
+        lastModelStore.save(self.model_param)
+        preloading, self.preloading = self.preloading, False
+        if preloading:
+            self.modelPreloaded.emit(self.model)
+        else:
+            self.modelLoaded.emit(self.model)
 
-        # 检查模型路径
+    def checkModelPath(self):
+        """返回填写的模型路径，未填写或不存在时提示并返回 None"""
         model_path = self.modelPathLineEdit.text().strip()
         if not model_path:
             InfoBar.error(
@@ -109,7 +220,7 @@ class modelInterface(QWidget, Ui_model):
                 duration=2000,
                 position=InfoBarPosition.TOP
             )
-            return
+            return None
 
         if not os.path.exists(model_path):
             InfoBar.error(
@@ -119,6 +230,25 @@ class modelInterface(QWidget, Ui_model):
                 duration=2000,
                 position=InfoBarPosition.TOP
             )
+            return None
+        return model_path
+
+    def parseDeviceIndex(self):
+        """解析设备索引，多个索引用逗号分隔；格式错误时抛出 ValueError"""
+        device_index_text = self.deviceIndexLineEdit.text().strip()
+        if ',' in device_index_text:
+            return [int(idx.strip()) for idx in device_index_text.split(',')]
+        return int(device_index_text)
+
+    def loadModel(self):
+        if self.load_model_worker and self.load_model_worker.isRunning:
+            return
+        if self.autotune_worker is not None:
+            return
+
+        # 检查模型路径
+        model_path = self.checkModelPath()
+        if model_path is None:
             return
 
         # 禁用加载按钮
@@ -129,12 +259,8 @@ class modelInterface(QWidget, Ui_model):
         device = self.deviceComboBox.currentText()
 
         # 解析设备索引
-        device_index_text = self.deviceIndexLineEdit.text().strip()
         try:
-            if ',' in device_index_text:
-                device_index = [int(idx.strip()) for idx in device_index_text.split(',')]
-            else:
-                device_index = int(device_index_text)
+            device_index = self.parseDeviceIndex()
         except ValueError:
             InfoBar.error(
                 title="错误",
@@ -179,6 +305,40 @@ class modelInterface(QWidget, Ui_model):
             self.loadModelButton.setText("加载模型")
             return
 
+        # 解析批大小
+        try:
+            batch_size = int(self.batchSizeLineEdit.text())
+            if batch_size < 1:
+                raise ValueError
+        except ValueError:
+            InfoBar.error(
+                title="错误",
+                content="批大小必须是正整数",
+                parent=self,
+                duration=2000,
+                position=InfoBarPosition.TOP
+            )
+            self.loadModelButton.setEnabled(True)
+            self.loadModelButton.setText("加载模型")
+            return
+
+        # 解析分片进程数
+        try:
+            process_count = int(self.processCountLineEdit.text())
+            if process_count < 1:
+                raise ValueError
+        except ValueError:
+            InfoBar.error(
+                title="错误",
+                content="分片进程数必须是正整数",
+                parent=self,
+                duration=2000,
+                position=InfoBarPosition.TOP
+            )
+            self.loadModelButton.setEnabled(True)
+            self.loadModelButton.setText("加载模型")
+            return
+
         # 是否使用v3模型
         use_v3_model = self.useV3Switch.isChecked()
 
@@ -192,11 +352,47 @@ class modelInterface(QWidget, Ui_model):
             "num_workers": num_workers,
         }
 
+        # 保存本次加载参数（含是否 v3 模型及推理模式），供转录界面调度和缓存使用
+        self.model_param = dict(
+            model_param,
+            use_v3_model=use_v3_model,
+            inference_mode=INFERENCE_MODES[self.inferenceModeComboBox.currentIndex()],
+            batch_size=batch_size,
+            process_count=process_count,
+        )
+
+        # 常驻模型池中已有相同模型时直接取用，不再重新加载
+        entry = modelPool.get(modelKey(self.model_param))
+        if entry is not None:
+            # 线程数、并发数等构造参数以模型实际创建时为准，推理模式等调度参数使用本次填写的
+            entry.model_param.update({name: value for name, value in self.model_param.items()
+                                      if name not in MODEL_ARGS})
+            self.model_param = dict(entry.model_param)
+            self.applyModelParam(self.model_param)
+            modelPool.setDefault(entry.key)
+            self.load_model_worker = None
+            self.updateModelStatus(True)
+            self.loadModelButton.setEnabled(True)
+            self.loadModelButton.setText("加载模型")
+            self.model = entry.model
+            self.loadTimeLabel.setText("使用常驻模型，无需加载")
+            self.emitModelLoaded()
+            InfoBar.success(
+                title="成功",
+                content=f"已使用常驻模型: {entry.label}",
+                parent=self,
+                duration=2000,
+                position=InfoBarPosition.TOP
+            )
+            return
+
         # 创建加载模型的工作线程
-        self.load_model_worker = LoadModelWorker(model_param, use_v3_model, self)
+        self.loadTimeLabel.setText("")
+        self.load_model_worker = LoadModelWorker(model_param, use_v3_model, self.warmUpSwitch.isChecked(), self)
         self.load_model_worker.setStatusSignal.connect(self.updateModelStatus)
         self.load_model_worker.loadModelOverSignal.connect(self.onModelLoaded)
         self.load_model_worker.start()
+        self.loadingChanged.emit(True)
 
     def updateModelStatus(self, success):
         if success:
@@ -214,7 +410,14 @@ class modelInterface(QWidget, Ui_model):
 
         if success:
             self.model = self.load_model_worker.model
-            self.modelLoaded.emit(self.model)
+            # 模型只由模型池和当前界面引用，被淘汰后才能真正释放
+            self.load_model_worker.model = None
+            self.loadTimeLabel.setText("加载耗时: " + formatLoadTimes(self.load_model_worker.load_times))
+            entry = modelPool.add(self.model_param, self.model)
+            modelPool.setDefault(entry.key)
+            self.emitModelLoaded()
+            # 先交付模型再结束加载状态，等待模型的任务才不会被当作加载失败
+            self.loadingChanged.emit(False)
 
             InfoBar.success(
                 title="成功",
@@ -224,10 +427,167 @@ class modelInterface(QWidget, Ui_model):
                 position=InfoBarPosition.TOP
             )
         else:
+            self.preloading = False
+            self.loadingChanged.emit(False)
             InfoBar.error(
                 title="错误",
                 content="模型加载失败",
                 parent=self,
                 duration=2000,
                 position=InfoBarPosition.TOP
-            )
\ No newline at end of file
+            )
+
+    def autotune(self):
+        """测试计算精度和线程划分的组合，把最快的填入参数；本机已有结果时直接套用"""
+        if self.autotune_worker is not None:
+            self.autotune_worker.stop()
+            self.autotuneButton.setEnabled(False)
+            self.autotuneButton.setText("正在停止...")
+            return
+        if self.load_model_worker and self.load_model_worker.isRunning:
+            return
+
+        model_path = self.checkModelPath()
+        if model_path is None:
+            return
+        try:
+            device_index = self.parseDeviceIndex()
+        except ValueError:
+            InfoBar.error(
+                title="错误",
+                content="设备索引格式错误",
+                parent=self,
+                duration=2000,
+                position=InfoBarPosition.TOP
+            )
+            return
+
+        model_param = {
+            "model_size_or_path": model_path,
+            "device": self.deviceComboBox.currentText(),
+            "device_index": device_index,
+            "use_v3_model": self.useV3Switch.isChecked(),
+        }
+
+        key = modelTuneKey(model_param)
+        record = autotuneStore.get(model_param)
+        if record and record.get("best") and self.autotune_rerun_key != key:
+            self.autotune_rerun_key = key
+            self.applyAutotune(record["best"], len(record["results"]), record.get("time"))
+            InfoBar.success(
+                title="成功",
+                content="已使用本机保存的调优结果，再次点击重新测试",
+                parent=self,
+                duration=3000,
+                position=InfoBarPosition.TOP
+            )
+            return
+        self.autotune_rerun_key = None
+
+        self.loadModelButton.setEnabled(False)
+        self.autotuneButton.setText("停止调优")
+        self.autotuneLabel.setText("自动调优中...")
+        self.autotune_worker = AutotuneWorker(model_param, self)
+        self.autotune_worker.progressSignal.connect(self.autotuneLabel.setText)
+        self.autotune_worker.autotuneOverSignal.connect(self.onAutotuneOver)
+        self.autotune_worker.finished.connect(self.autotune_worker.deleteLater)
+        self.autotune_worker.start()
+
+    def onAutotuneOver(self, best, results):
+        stopped = self.autotune_worker.stop_requested
+        self.autotune_worker = None
+        self.loadModelButton.setEnabled(True)
+        self.autotuneButton.setEnabled(True)
+        self.autotuneButton.setText("自动调优")
+
+        if best is None:
+            errors = [result["error"] for result in results if "error" in result]
+            self.autotuneLabel.setText("自动调优失败: " + errors[0] if errors else "自动调优已停止")
+            if errors:
+                InfoBar.error(
+                    title="错误",
+                    content="所有组合均测试失败",
+                    parent=self,
+                    duration=2000,
+                    position=InfoBarPosition.TOP
+                )
+            return
+
+        self.applyAutotune(best, len(results))
+        InfoBar.success(
+            title="成功",
+            content=f"已填入最快的组合: {formatCandidate(best)}" + ("（已停止，未保存）" if stopped else ""),
+            parent=self,
+            duration=3000,
+            position=InfoBarPosition.TOP
+        )
+
+    def applyAutotune(self, best, tested, tuned_time=None):
+        """把调优结果填入计算精度、线程数和并发数"""
+        self.computeTypeComboBox.setCurrentText(best["compute_type"])
+        self.cpuThreadsLineEdit.setText(str(best["cpu_threads"]))
+        self.numWorkersLineEdit.setText(str(best["num_workers"]))
+        detail = f"共测试 {tested} 种组合" + (f"，{tuned_time}" if tuned_time else "")
+        self.autotuneLabel.setText(
+            f"自动调优: {formatCandidate(best)} · RTF {best['rtf']:.3f} · {formatMemory(best['memory_mb'])}（{detail}）")
+
+    def setPoolBudget(self):
+        """修改常驻模型池的内存预算"""
+        try:
+            budget = float(self.poolBudgetLineEdit.text())
+            if budget <= 0:
+                raise ValueError
+        except ValueError:
+            InfoBar.error(
+                title="错误",
+                content="内存预算必须是正数",
+                parent=self,
+                duration=2000,
+                position=InfoBarPosition.TOP
+            )
+            self.poolBudgetLineEdit.setText(f"{modelPool.budget_bytes / 1024 ** 3:g}")
+            return
+        modelPool.setBudget(int(budget * 1024 ** 3))
+        self.updatePoolStatus()
+
+    def setJobBudget(self):
+        """修改转录、音频分离任务的内存准入预算"""
+        try:
+            budget = float(self.jobBudgetLineEdit.text())
+            if budget <= 0:
+                raise ValueError
+        except ValueError:
+            InfoBar.error(
+                title="错误",
+                content="内存上限必须是正数",
+                parent=self,
+                duration=2000,
+                position=InfoBarPosition.TOP
+            )
+            self.jobBudgetLineEdit.setText(f"{admissionController.budget_bytes / 1024 ** 3:.1f}")
+            return
+        admissionController.setBudget(int(budget * 1024 ** 3))
+        self.updatePoolStatus()
+
+    def updatePoolStatus(self):
+        """显示常驻模型池中的模型及内存占用"""
+        self.poolUsageLabel.setText(
+            f"已用 {modelPool.usedBytes / 1024 ** 3:.1f} / {modelPool.budget_bytes / 1024 ** 3:g} GB")
+        if not self.jobBudgetLineEdit.text():
+            self.jobBudgetLineEdit.setText(f"{admissionController.budget_bytes / 1024 ** 3:.1f}")
+        self.jobUsageLabel.setText(
+            f"常驻模型 {admissionController.resident_bytes / 1024 ** 3:.1f} GB + "
+            f"运行中任务 {admissionController.reservedBytes / 1024 ** 3:.1f} GB")
+        if not modelPool.entries:
+            self.modelPoolListLabel.setText("暂无常驻模型")
+            return
+
+        lines = []
+        for entry in reversed(modelPool.entries.values()):
+            line = f"{entry.label}  {entry.nbytes / 1024 ** 3:.1f} GB"
+            if entry.key == modelPool.default_key:
+                line += "  (当前模型，不会被淘汰)"
+            if entry.in_use:
+                line += f"  (转录中 {entry.in_use})"
+            lines.append(line)
+        self.modelPoolListLabel.setText("\n".join(lines))
@@ -0,0 +1,178 @@
+from PySide6.QtCore import Qt, Signal, QThread, QTimer, QProcess, QUrl, QAbstractTableModel, QModelIndex
+from PySide6.QtGui import QDesktopServices
+from PySide6.QtWidgets import QWidget, QFileDialog, QApplication
+from qfluentwidgets import InfoBar, InfoBarPosition
+
+import os
+import shutil
+
+from app.common.searchIndex import searchIndex
+from app.common.transcriptWriter import formatTimestamp
+from app.ui.Ui_search import Ui_search
+
+SEARCH_DELAY_MS = 300  # 输入停止后再查询
+SEARCH_LIMIT = 500
+
+HEADERS = ["文件", "时间", "文本"]
+
+
+class SearchResultModel(QAbstractTableModel):
+    """搜索结果"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.hits = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.hits)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        hit = self.hits[index.row()]
+        column = index.column()
+        if role == Qt.DisplayRole:
+            if column == 0:
+                return os.path.basename(hit.path)
+            if column == 1:
+                return formatTimestamp(hit.start_ms / 1000)
+            return hit.text
+        if role == Qt.ToolTipRole:
+            if column == 0:
+                return hit.path if not hit.media_path else f"{hit.path}\n媒体文件: {hit.media_path}"
+            if column == 1:
+                return f"{hit.start_ms} ms - {hit.end_ms} ms"
+            return hit.text
+        return None
+
+    def setHits(self, hits):
+        self.beginResetModel()
+        self.hits = hits
+        self.endResetModel()
+
+    def hit(self, row):
+        return self.hits[row]
+
+
+class IndexSyncWorker(QThread):
+    finished_signal = Signal(int, int, str)  # 更新数, 删除数, 错误信息
+
+    def __init__(self, root):
+        super().__init__()
+        self.root = root
+
+    def run(self):
+        try:
+            updated, removed = searchIndex.sync(self.root)
+            self.finished_signal.emit(updated, removed, "")
+        except Exception as e:
+            self.finished_signal.emit(0, 0, str(e))
+
+
+class searchInterface(QWidget, Ui_search):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setupUi(self)
+
+        self.resultModel = SearchResultModel(self)
+        self.resultTableView.setModel(self.resultModel)
+        self.setupResultHeader()
+
+        self.sync_worker = None
+        self.searchTimer = QTimer(self)
+        self.searchTimer.setSingleShot(True)
+        self.searchTimer.setInterval(SEARCH_DELAY_MS)
+
+        self.outputGroupWidget.lineEdit.setText(os.path.join(os.getcwd(), "output", "transcription"))
+        self.connectSignals()
+
+    def connectSignals(self):
+        self.outputGroupWidget.toolButton.clicked.connect(self.selectIndexPath)
+        self.searchLineEdit.textChanged.connect(self.searchTimer.start)
+        self.searchLineEdit.searchSignal.connect(self.search)
+        self.searchLineEdit.returnPressed.connect(self.search)
+        self.searchTimer.timeout.connect(self.search)
+        self.syncButton.clicked.connect(self.syncIndex)
+        self.resultTableView.doubleClicked.connect(self.openHit)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        # 每次打开页面时增量同步，程序外新增的字幕也能搜索到
+        self.syncIndex()
+
+    def selectIndexPath(self):
+        dir_path = QFileDialog.getExistingDirectory(self, "选择字幕目录", self.outputGroupWidget.lineEdit.text())
+        if dir_path:
+            self.outputGroupWidget.lineEdit.setText(dir_path)
+            self.syncIndex()
+
+    def syncIndex(self):
+        root = self.outputGroupWidget.lineEdit.text()
+        if not root or not os.path.isdir(root) or self.sync_worker is not None:
+            return
+
+        self.syncButton.setEnabled(False)
+        self.resultLabel.setText("正在同步索引...")
+        self.sync_worker = IndexSyncWorker(root)
+        self.sync_worker.finished_signal.connect(self.onSyncFinished)
+        self.sync_worker.finished.connect(self.sync_worker.deleteLater)
+        self.sync_worker.start()
+
+    def onSyncFinished(self, updated, removed, error):
+        self.sync_worker = None
+        self.syncButton.setEnabled(True)
+        if error:
+            self.resultLabel.setText("")
+            InfoBar.error(title="同步索引失败", content=error, duration=5000,
+                          position=InfoBarPosition.TOP, parent=self)
+            return
+
+        self.resultLabel.setText(f"索引已同步：更新 {updated} 个文件，移除 {removed} 个文件")
+        if updated or removed:
+            self.search()
+
+    def search(self):
+        self.searchTimer.stop()
+        query = self.searchLineEdit.text().strip()
+        if not query:
+            self.resultModel.setHits([])
+            return
+
+        try:
+            hits = searchIndex.search(query, SEARCH_LIMIT)
+        except Exception as e:
+            InfoBar.error(title="搜索失败", content=str(e), duration=3000,
+                          position=InfoBarPosition.TOP, parent=self)
+            return
+
+        self.resultModel.setHits(hits)
+        more = "（仅显示前 {} 条）".format(SEARCH_LIMIT) if len(hits) >= SEARCH_LIMIT else ""
+        self.resultLabel.setText(f"找到 {len(hits)} 条结果{more}")
+
+    def openHit(self, index):
+        """跳转到结果所在时间：有播放器时从该时间播放媒体文件，否则打开字幕文件并复制时间戳"""
+        hit = self.resultModel.hit(index.row())
+        seconds = hit.start_ms / 1000
+        timestamp = formatTimestamp(seconds)
+
+        if hit.media_path and os.path.exists(hit.media_path):
+            if shutil.which("mpv"):
+                if QProcess.startDetached("mpv", [f"--start={seconds:.3f}", hit.media_path])[0]:
+                    return
+            if shutil.which("ffplay"):
+                if QProcess.startDetached("ffplay", ["-ss", f"{seconds:.3f}", hit.media_path])[0]:
+                    return
+
+        QApplication.clipboard().setText(timestamp)
+        QDesktopServices.openUrl(QUrl.fromLocalFile(hit.path))
+        InfoBar.info(title="已复制时间戳", content=f"{timestamp}（未找到 mpv/ffplay，已打开字幕文件）",
+                     duration=3000, position=InfoBarPosition.TOP, parent=self)
@@ -1,31 +1,138 @@
-from PySide6.QtCore import Qt, Signal, QThread
-from PySide6.QtWidgets import QWidget, QFileDialog, QTableWidgetItem, QPushButton, QHBoxLayout
+from PySide6.QtCore import Qt, Signal, QThread, QObject, QTimer
+from PySide6.QtWidgets import QWidget, QFileDialog
 from PySide6.QtGui import QFont
-from qfluentwidgets import InfoBar, InfoBarPosition, ToolButton, FluentIcon as FIF
+from qfluentwidgets import InfoBar, InfoBarPosition
 
 import os
-import torch
 import time
+from collections import OrderedDict, deque
+from itertools import islice
 from pathlib import Path
-from datetime import timedelta
 
+from app.common.admission import admissionController, estimateTranscriptionBytes
+from app.common.audioPrefetch import PREFETCH_AHEAD, DecodedAudioStore, estimateDecodedBytes
+from app.common.jobMetrics import JobMetrics, exportMetrics, formatMetric
+from app.common.lazyModules import getFasterWhisper
+from app.common.modelPool import modelKey, modelLabel, modelPool
+from app.common.resegment import RESEGMENT_FORMATS, findTimingsFiles, resegmentFile
+from app.common.searchIndex import searchIndex
+from app.common.speechMap import applySpeechMap, decodeAudio, detectSpeech, probeDuration
+from app.common.transcriptionCache import TranscriptionCache, modelIdentity, segmentToDict, transcriptionKey
+from app.common.transcriptionJournal import TranscriptionJournal, resumeParams
+from app.common.transcriptWriter import TranscriptWriter
+from app.common.whisperParams import (DEFAULT_TRANSCRIBE_PARAMS, batchedFallbackReason, toBatchedParams,
+                                     toTranscribeParams)
 from app.ui.Ui_transcription import Ui_transcription
+from app.view.hotFolderWatcher import HotFolderWatcher
+from app.view.transcriptionTable import ACTION_COLUMN, METRIC_COLUMN
+
+MODEL_LOAD_FAILED_STATUS = "失败: 模型加载失败，请重新加载模型"
+
+
+def formatDuration(seconds):
+    """将秒数格式化为 HH:MM:SS"""
+    seconds = max(0, int(seconds))
+    hours, remainder = divmod(seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+
+
+class ProgressTracker:
+    """根据已转录到的音频位置计算进度、实时率和剩余时间
+
+    剩余时间按最近 window 秒内的处理速度估算；update 返回是否应当发送进度信号，
+    两次发送至少间隔 interval 秒，避免大量短段落时刷爆界面线程。
+    """
+
+    def __init__(self, duration, interval=0.25, window=20.0, start_position=0.0):
+        self.duration = duration
+        self.interval = interval
+        self.window = window
+        self.start_time = time.monotonic()
+        self.last_emit = 0.0
+        self.start_position = start_position  # 续传时从该位置开始计算速度
+        self.position = start_position
+        self.samples = deque([(self.start_time, start_position)])
+
+    def update(self, position):
+        now = time.monotonic()
+        self.position = position
+        self.samples.append((now, position))
+        while len(self.samples) > 2 and now - self.samples[0][0] > self.window:
+            self.samples.popleft()
+
+        if now - self.last_emit < self.interval:
+            return False
+        self.last_emit = now
+        return True
+
+    @property
+    def fraction(self):
+        if not self.duration:
+            return 0.0
+        return min(1.0, self.position / self.duration)
+
+    def realTimeFactor(self):
+        """处理耗时 / 音频时长，小于 1 表示快于实时"""
+        processed = self.position - self.start_position
+        if processed <= 0:
+            return None
+        return (time.monotonic() - self.start_time) / processed
+
+    def eta(self):
+        """剩余秒数"""
+        (t0, p0), (t1, p1) = self.samples[0], self.samples[-1]
+        if p1 <= p0 or t1 <= t0:
+            return None
+        return (self.duration - self.position) / ((p1 - p0) / (t1 - t0))
+
+    def text(self):
+        parts = [f"{self.fraction * 100:.0f}%"]
+        rtf = self.realTimeFactor()
+        if rtf is not None:
+            parts.append(f"RTF {rtf:.2f}")
+        eta = self.eta()
+        if eta is not None:
+            parts.append(f"剩余 {formatDuration(eta)}")
+        return "  ".join(parts)
 
 
 class TranscriptionWorker(QThread):
     update_progress_signal = Signal(str, str)  # 文件路径, 状态
+    progress_signal = Signal(str, float, str)  # 文件路径, 进度(0~1), 进度说明
     transcription_finished_signal = Signal(str, bool, str)  # 文件路径, 成功/失败, 消息
+    transcription_cancelled_signal = Signal(str)  # 文件路径
+
+    cache_signal = Signal(str, bool)  # 文件路径, 是否命中缓存
+    speed_signal = Signal(str, str, float)  # 文件路径, 推理模式, 速度（音频秒数/耗时秒数）
+    metrics_signal = Signal(str, object)  # 文件路径, 性能指标字典
 
-    def __init__(self, file_path, model, output_path, params):
+    def __init__(self, job, model, cache=None, model_identity=None, model_param=None, baseline_speed=None):
         super().__init__()
-        self.file_path = file_path
+        self.job = job
+        self.file_path = job.file_path
         self.model = model
-        self.output_path = output_path
-        self.params = params
+        self.output_path = job.output_path
+        self.params = job.params
+        self.formats = job.formats
+        self.keep_partial = job.keep_partial  # 取消时是否保留已写出的部分结果
+        self.cache = cache
+        self.model_identity = model_identity
+        self.model_param = model_param or {}
+        self.inference_mode = self.model_param.get("inference_mode", "sequential")
+        self.batch_size = self.model_param.get("batch_size", 8)
+        self.process_count = self.model_param.get("process_count", 2)
+        self.baseline_speed = baseline_speed  # 标准模式的平均速度，用于报告批处理、多进程的加速比
         self.is_running = False
+        self.cancel_requested = False
 
     def run(self):
         self.is_running = True
+        segments = None
+        writer = None
+        journal = None
+        completed = False  # 所有段落都已写入，之后到达的取消请求不再删除输出
+        metrics = JobMetrics(self.file_path, self.job.model_entry.label if self.job.model_entry else "当前模型")
 
         try:
             # 更新状态为处理中
@@ -38,62 +145,641 @@ class TranscriptionWorker(QThread):
             file_name = os.path.basename(self.file_path)
             file_name_without_ext = os.path.splitext(file_name)[0]
 
+            # 选择推理模式，批处理不支持当前参数时回退到标准模式
+            transcribe, params, mode, mode_text = self.selectTranscriber(self.params)
+
+            # 媒体内容 + 模型 + 参数的哈希，作为缓存和续传日志的键
+            job_key = transcriptionKey(self.file_path, self.model_identity, params)
+
+            # 查询缓存，命中时直接用缓存的段落生成输出
+            if self.cache is not None:
+                cached = self.cache.get(job_key)
+                self.cache_signal.emit(self.file_path, cached is not None)
+                if cached is not None:
+                    start_time = time.perf_counter()
+                    cached_segments, info = cached
+                    with TranscriptWriter(self.output_path, file_name_without_ext, self.formats) as writer:
+                        for segment in cached_segments:
+                            writer.write(segment)
+                        writer.info = info
+                    self.indexTranscript(writer, ((s.start, s.end, s.text) for s in cached_segments))
+
+                    metrics.mode = "cache"
+                    self.metrics_signal.emit(self.file_path, metrics.finish(
+                        info.duration, 0.0, time.perf_counter() - start_time, len(cached_segments)))
+
+                    self.transcription_finished_signal.emit(
+                        self.file_path,
+                        True,
+                        f"转录完成(缓存): {file_name}\n语言: {info.language}\n可信度: {info.language_probability:.2f}"
+                    )
+                    self.is_running = False
+                    return
+
+            # 读取续传日志，已提交的段落不再转录
+            journal = TranscriptionJournal(self.output_path, file_name_without_ext, job_key)
+            committed = journal.load()
+            resume_from = 0.0
+            if committed:
+                # 续传依赖 clip_timestamps，批处理不支持，剩余部分使用标准模式
+                resume_from = committed[-1].end
+                resumed = resumeParams(self.params, committed, self.job.speech_map)
+                transcribe, params, mode, mode_text = self.selectTranscriber(resumed)
+                status = f"从 {formatDuration(resume_from)} 继续..."
+                if resumed.get("vad_filter"):
+                    # 没有语音区间表，指定 clip_timestamps 后 faster-whisper 会忽略 vad_filter
+                    status += "(续传部分不使用 VAD)"
+                    mode_text += "，续传部分不使用 VAD"
+                self.update_progress_signal.emit(self.file_path, status)
+
+            # 先解码再推理，分别计时；已预解码的直接使用数组
+            audio = self.job.audio
+            decode_seconds = self.job.decode_seconds or 0.0
+            if mode == "streaming":
+                # 边解码边转录，不需要整段音频
+                audio = self.file_path
+            elif audio is None:
+                decode_start = time.perf_counter()
+                audio = decodeAudio(self.file_path)
+                decode_seconds = time.perf_counter() - decode_start
+
             # 转写音频
-            segments, info = self.model.transcribe(
-                self.file_path,
-                **self.params
+            start_time = time.perf_counter()
+            segments, info = transcribe(
+                audio,
+                **params
             )
+            del audio
 
-            # 保存为SRT字幕文件
-            srt_file_path = os.path.join(self.output_path, file_name_without_ext + ".srt")
-            self.save_to_srt(segments, srt_file_path)
+            # segments 是生成器，只遍历一次，同时写入所有输出格式
+            segment_dicts = [segmentToDict(segment) for segment in committed]
+            tracker = ProgressTracker(info.duration, start_position=resume_from)
+            self.progress_signal.emit(self.file_path, tracker.fraction, tracker.text())
+            journal.open(committed)
+            with TranscriptWriter(self.output_path, file_name_without_ext, self.formats) as writer:
+                for segment in committed:
+                    writer.write(segment)
 
-            # 保存为TXT文本文件
-            txt_file_path = os.path.join(self.output_path, file_name_without_ext + ".txt")
-            self.save_to_txt(segments, txt_file_path)
+                # 每个段落之间检查取消请求
+                for segment in segments:
+                    if self.cancel_requested:
+                        break
+                    writer.write(segment)
+                    journal.append(segment)
+                    segment_dicts.append(segmentToDict(segment))
+                    if tracker.update(segment.end):
+                        self.progress_signal.emit(self.file_path, tracker.fraction, tracker.text())
+                        metrics.sampleMemory()
+                else:
+                    # 多进程分片等生成器收到取消请求后会提前结束而不抛出异常，遍历完不等于转录完
+                    completed = not self.cancel_requested
+                writer.info = info
 
-            # 发送完成信号
-            self.transcription_finished_signal.emit(
-                self.file_path,
-                True,
-                f"转录完成: {file_name}\n语言: {info.language}\n可信度: {info.language_probability:.2f}"
-            )
+            if self.cancel_requested and not completed:
+                self.onCancelled(segments, writer, journal)
+            else:
+                # 转录完成，不再需要续传日志
+                journal.remove()
+
+                # 完整转录的结果写入缓存，写入失败不影响本次结果
+                if self.cache is not None:
+                    try:
+                        self.cache.put(job_key, segment_dicts, info)
+                    except Exception as e:
+                        print(f"写入转录缓存失败: {str(e)}")
+                self.indexTranscript(writer, ((s["start"], s["end"], s["text"]) for s in segment_dicts))
+
+                # 发送性能指标和完成信号
+                elapsed = time.perf_counter() - start_time
+                metrics.mode = mode
+                values = metrics.finish(info.duration - resume_from, decode_seconds, elapsed,
+                                        len(segment_dicts) - len(committed))
+                self.metrics_signal.emit(self.file_path, values)
+
+                summary = self.speedSummary(mode, mode_text, info.duration - resume_from, elapsed, not committed)
+                summary += (f"\n解码 {decode_seconds:.1f} 秒，推理 {elapsed:.1f} 秒，"
+                            f"CPU {formatMetric(values['cpu_seconds'])} 秒，"
+                            f"峰值内存 {formatMetric(values['peak_rss_mb'])} MB")
+                if self.job.speech_map is not None:
+                    summary += f"\n{self.job.speech_map.summary()}"
+                self.transcription_finished_signal.emit(
+                    self.file_path,
+                    True,
+                    f"转录完成: {file_name}\n语言: {info.language}\n可信度: {info.language_probability:.2f}\n{summary}"
+                )
 
         except Exception as e:
-            # 发送错误信号
-            self.transcription_finished_signal.emit(self.file_path, False, f"错误: {str(e)}")
+            if self.cancel_requested and not completed:
+                self.onCancelled(segments, writer, journal)
+            else:
+                # 出错时保留续传日志，下次转录该文件时从中断处继续
+                if journal is not None:
+                    journal.close()
+                # 发送错误信号
+                self.transcription_finished_signal.emit(self.file_path, False, f"错误: {str(e)}")
 
         self.is_running = False
 
+    def selectTranscriber(self, params):
+        """返回 (转录函数, 参数, 推理模式, 模式说明)
+
+        批处理模式自带 VAD 切分；流式解码模式直接读取文件；
+        标准模式和多进程分片模式下如果已有语音区间表，只转录语音区间。
+        """
+        mode_text = "标准"
+        if self.inference_mode == "batched":
+            reason = batchedFallbackReason(params)
+            if reason is None:
+                pipeline = getFasterWhisper().BatchedInferencePipeline(model=self.model)
+                return (pipeline.transcribe, toBatchedParams(params, self.batch_size), "batched",
+                        f"批处理(batch_size={self.batch_size})")
+            mode_text = f"标准(批处理不支持{reason})"
+
+        if self.inference_mode == "streaming":
+            from app.common.streamingTranscribe import StreamingTranscriber, streamingFallbackReason
+            reason = streamingFallbackReason(params)
+            if reason is None:
+                return StreamingTranscriber(self.model).transcribe, params, "streaming", "流式解码"
+            mode_text = f"标准(流式不支持{reason})"
+
+        if self.job.speech_map is not None and params.get("vad_filter"):
+            params = applySpeechMap(params, self.job.speech_map)
+
+        if self.inference_mode == "parallel" and self.process_count > 1:
+            from app.common.parallelTranscribe import ParallelTranscriber
+            transcriber = ParallelTranscriber(self.model, self.model_param, self.process_count,
+                                              cancel_check=lambda: self.cancel_requested)
+            return transcriber.transcribe, params, "parallel", f"多进程分片({self.process_count} 进程)"
+        return self.model.transcribe, params, "sequential", mode_text
+
+    def speedSummary(self, mode, mode_text, audio_seconds, elapsed, record):
+        """生成推理模式和速度说明，record 为 True 时记录本次速度供后续比较"""
+        if audio_seconds <= 0 or elapsed <= 0:
+            return f"模式: {mode_text}"
+
+        speed = audio_seconds / elapsed
+        if record:
+            self.speed_signal.emit(self.file_path, mode, speed)
+
+        summary = f"模式: {mode_text}，速度 {speed:.1f}x 实时"
+        if mode != "sequential" and self.baseline_speed:
+            summary += f"，约为标准模式的 {speed / self.baseline_speed:.1f} 倍"
+        return summary
+
+    def indexTranscript(self, writer, segments):
+        """把完成的转录写入全文索引，segments 为 (开始秒, 结束秒, 文本)，索引失败不影响本次结果"""
+        path = next((writer.paths[fmt] for fmt in ("srt", "vtt", "json") if fmt in writer.paths),
+                    next(iter(writer.paths.values()), None))
+        if path is None:
+            return
+        try:
+            searchIndex.indexSegments(path, [(int(round(start * 1000)), int(round(end * 1000)), text)
+                                             for start, end, text in segments], self.file_path)
+        except Exception as e:
+            print(f"写入搜索索引失败: {str(e)}")
+
     def stop(self):
-        self.is_running = False
+        """请求取消，转录会在当前段落结束后停止，不阻塞调用线程；所有段落都已写入后才到达的请求不影响结果"""
+        self.cancel_requested = True
+
+    def onCancelled(self, segments, writer, journal):
+        """关闭生成器让 CTranslate2 停止解码，并按设置处理部分结果
+
+        保留部分结果时也保留续传日志，下次转录该文件时从取消处继续。
+        """
+        if segments is not None:
+            segments.close()
+
+        if journal is not None:
+            if self.keep_partial:
+                journal.close()
+            else:
+                journal.remove()
+
+        if writer is not None and not self.keep_partial:
+            for path in writer.paths.values():
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+        self.transcription_cancelled_signal.emit(self.file_path)
+
+
+class TranscriptionJob:
+    """单个文件的转录任务"""
+
+    def __init__(self, file_path, output_path, params, formats=("srt", "txt"), keep_partial=True, model_key=None):
+        self.file_path = file_path
+        self.output_path = output_path
+        self.params = params
+        self.formats = formats
+        self.keep_partial = keep_partial
+        self.model_key = model_key  # 常驻模型池中的模型，None 表示使用当前加载的模型
+        self.model_entry = None  # 运行时占用的模型池条目
+        self.speech_map = None  # 语音检测结果，未启用 VAD 时为 None
+        self.audio = None  # 预解码的 16kHz 音频，开始转录时由队列设置
+        self.decode_seconds = None  # 预解码耗时
+        self.prefetch_failed = False
+        self.cancelled = False
+        self.worker = None
+        self.memory_bytes = None  # 准入控制用的内存估算
+        self.admission_reason = None  # 因内存不足等待时的原因
+
+    @property
+    def admissionKey(self):
+        return ("transcription", self.file_path)
+
+    def needsTriage(self):
+        """启用 VAD 且尚未做语音检测"""
+        return bool(self.params.get("vad_filter")) and self.speech_map is None
+
+
+class SpeechTriageWorker(QThread):
+    """转录前的语音检测，在占用模型之前找出没有语音的文件
+
+    解码得到的音频随结果一起发出，内存预算允许时留给转录使用。
+    """
+
+    triage_finished_signal = Signal(str, object, object, float, str)  # 文件路径, 语音区间表（失败为 None）, 音频, 解码耗时, 错误信息
+
+    def __init__(self, job):
+        super().__init__()
+        self.job = job
+
+    def run(self):
+        try:
+            start_time = time.perf_counter()
+            audio = decodeAudio(self.job.file_path)
+            decode_seconds = time.perf_counter() - start_time
+            speech_map = detectSpeech(audio, self.job.params.get("vad_parameters"))
+            self.triage_finished_signal.emit(self.job.file_path, speech_map, audio, decode_seconds, "")
+        except Exception as e:
+            self.triage_finished_signal.emit(self.job.file_path, None, None, 0.0, str(e))
+
+
+class PrefetchWorker(QThread):
+    """在其他文件推理的同时预先解码排队中的文件"""
+
+    prefetch_finished_signal = Signal(str, bool, str)  # 文件路径, 是否成功, 错误信息（内存预算不足时为空）
+
+    def __init__(self, file_path, store):
+        super().__init__()
+        self.file_path = file_path
+        self.store = store
+
+    def run(self):
+        if not self.store.reserve(self.file_path, estimateDecodedBytes(self.file_path)):
+            self.prefetch_finished_signal.emit(self.file_path, False, "")
+            return
+
+        try:
+            start_time = time.perf_counter()
+            audio = decodeAudio(self.file_path)
+            decode_seconds = time.perf_counter() - start_time
+        except Exception as e:
+            self.store.release(self.file_path)
+            self.prefetch_finished_signal.emit(self.file_path, False, str(e))
+            return
+
+        self.prefetch_finished_signal.emit(self.file_path, self.store.put(self.file_path, audio, decode_seconds), "")
+
+
+class ResegmentWorker(QThread):
+    """按新的排版规则从 .timings 重新生成目录中的字幕"""
+
+    progress_signal = Signal(int, int)  # 已完成文件数, 文件总数
+    finished_signal = Signal(int, int, float, object)  # 成功文件数, 字幕条数, 耗时, 失败列表 [(文件, 错误)]
+
+    def __init__(self, folder, options, formats):
+        super().__init__()
+        self.folder = folder
+        self.options = options
+        self.formats = formats
+
+    def run(self):
+        start_time = time.perf_counter()
+        paths = findTimingsFiles(self.folder)
+        done = 0
+        cues = 0
+        errors = []
+        for i, path in enumerate(paths, 1):
+            try:
+                cues += resegmentFile(path, self.options, self.formats)
+                done += 1
+            except Exception as e:
+                errors.append((os.path.basename(path), str(e)))
+            self.progress_signal.emit(i, len(paths))
+        self.finished_signal.emit(done, cues, time.perf_counter() - start_time, errors)
+
+
+class TranscriptionQueue(QObject):
+    """转录任务队列
+
+    所有任务先进入等待队列，同时运行的工作线程数不超过模型的并发数（num_workers），
+    一个线程结束后再从队列中取下一个任务，不会为排队中的任务提前创建线程。
+    启用 VAD 的任务先逐个经过语音检测（不需要模型），没有语音的文件不会进入转录队列。
+    等待队列最前面的几个文件会在其他文件推理时预先解码，受已解码音频的内存预算限制。
+    任务启动前经过全局内存准入控制，预算不足时队首任务等待，每秒重试一次。
+    """
+
+    jobStatusChanged = Signal(str, str)  # 文件路径, 状态
+    jobProgressChanged = Signal(str, float, str)  # 文件路径, 进度(0~1), 进度说明
+    jobFinished = Signal(str, bool, str)  # 文件路径, 成功/失败, 消息
+    jobCacheChecked = Signal(str, bool)  # 文件路径, 是否命中缓存
+    jobModelChanged = Signal(str, str)  # 文件路径, 使用的模型
+    jobMetrics = Signal(str, object)  # 文件路径, 性能指标字典
+    queueIdle = Signal()  # 所有任务（含语音检测）都已结束
+
+    def __init__(self, parent=None):
+        super().__init__(parent=parent)
+        self.model = None
+        self.model_param = None
+        self.model_pending = False  # 模型正在加载，没有模型的任务等待加载完成
+        self.max_workers = 1
+        self.mode_speeds = {}  # 推理模式 -> 最近任务的速度
+        self.cache = TranscriptionCache()
+        self.pending = OrderedDict()  # 文件路径 -> 等待中的任务，按加入顺序
+        self.running = {}  # 文件路径 -> 运行中的任务
+        self.triage_pending = OrderedDict()  # 文件路径 -> 等待语音检测的任务
+        self.triage_job = None  # 正在语音检测的任务
+        self.triage_worker = None
+        self.audio_store = DecodedAudioStore()
+        self.prefetch_worker = None
+        self.prefetch_blocked = False  # 内存预算不足，等有音频释放后再继续预解码
+        self.admission_timer = QTimer(self)
+        self.admission_timer.setInterval(1000)
+        self.admission_timer.timeout.connect(self.dispatch)
+
+    def setModel(self, model, model_param=None):
+        """设置模型及其加载参数
+
+        该模型是未指定模型的任务使用的默认模型。num_workers 决定同时运行的任务数；
+        每个任务的推理模式、缓存键中的模型标识取自它实际使用的模型的加载参数。
+        """
+        self.model = model
+        self.model_param = model_param
+        if model_param:
+            self.max_workers = max(1, int(model_param["num_workers"]))
+            # 多进程分片模式下每个任务已占满所有 CPU 线程，同一时间只运行一个
+            if model_param.get("inference_mode") == "parallel":
+                self.max_workers = 1
+        else:
+            self.max_workers = 1
+        self.dispatch()
+
+    def setModelPending(self, pending):
+        self.model_pending = pending
+
+    def failWaiting(self, status):
+        """模型加载失败：移出所有等待模型的任务并显示状态，返回移出的文件数"""
+        failed = [file_path for file_path in list(self.triage_pending) + list(self.pending) if self.remove(file_path)]
+        for file_path in failed:
+            self.jobStatusChanged.emit(file_path, status)
+        self.checkIdle()
+        return len(failed)
+
+    def averageSpeed(self, mode):
+        """该推理模式最近完成任务的平均速度（音频秒数/耗时秒数），没有记录时返回 None"""
+        speeds = self.mode_speeds.get(mode)
+        if not speeds:
+            return None
+        return sum(speeds) / len(speeds)
+
+    def recordSpeed(self, file_path, mode, speed):
+        speeds = self.mode_speeds.setdefault(mode, deque(maxlen=20))
+        speeds.append(speed)
+
+    def isActive(self, file_path):
+        """任务是否在排队、语音检测或运行中"""
+        return (file_path in self.pending or file_path in self.running or file_path in self.triage_pending
+                or (self.triage_job is not None and self.triage_job.file_path == file_path))
+
+    def enqueue(self, job):
+        """加入队列，已在队列或运行中时返回 False"""
+        if self.isActive(job.file_path):
+            return False
+
+        if job.needsTriage():
+            self.triage_pending[job.file_path] = job
+            self.jobStatusChanged.emit(job.file_path, "排队中(语音检测)")
+            self.dispatchTriage()
+        else:
+            self.pending[job.file_path] = job
+            self.jobStatusChanged.emit(job.file_path, "排队中" if self.model is not None else "排队中(等待模型加载)")
+            self.dispatch()
+        return True
+
+    def remove(self, file_path):
+        """从等待队列中移除任务，任务已在运行时返回 False"""
+        if self.triage_pending.pop(file_path, None) is not None:
+            return True
+        job = self.pending.pop(file_path, None)
+        if job is None:
+            return False
+        admissionController.release(job.admissionKey)
+        self.releaseAudio(file_path)
+        return True
+
+    def cancel(self, file_path):
+        """取消排队或运行中的任务，任务不存在时返回 False"""
+        if self.remove(file_path):
+            self.jobStatusChanged.emit(file_path, "已取消")
+            return True
+
+        # 正在语音检测的任务：检测结果到达后直接丢弃
+        if self.triage_job is not None and self.triage_job.file_path == file_path:
+            self.triage_job.cancelled = True
+            self.jobStatusChanged.emit(file_path, "已取消")
+            return True
+
+        job = self.running.get(file_path)
+        if job is None:
+            return False
+
+        # 只发出取消请求，工作线程在段落间检查后自行退出，不在界面线程中等待
+        job.worker.stop()
+        self.jobStatusChanged.emit(file_path, "取消中...")
+        return True
+
+    def dispatch(self):
+        """在并发数允许的范围内启动等待中的任务"""
+        self.admission_timer.stop()
+        while self.model is not None and self.pending and len(self.running) < self.max_workers:
+            job = next(iter(self.pending.values()))
+            if not self.admit(job):
+                self.admission_timer.start()
+                break
+            self.pending.popitem(last=False)
+            self.startJob(job)
+        self.dispatchPrefetch()
+
+    def admit(self, job):
+        """按探测的时长和所用模型估算内存并申请准入，需要等待时在状态中显示原因"""
+        if job.memory_bytes is None:
+            entry = modelPool.entries.get(job.model_key) if job.model_key is not None else None
+            model_param = entry.model_param if entry is not None else self.model_param
+            job.memory_bytes = estimateTranscriptionBytes(probeDuration(job.file_path), model_param, job.params)
+
+        reason = admissionController.tryReserve(job.admissionKey, job.memory_bytes,
+                                                f"转录 {os.path.basename(job.file_path)}")
+        if reason is not None and reason != job.admission_reason:
+            self.jobStatusChanged.emit(job.file_path, reason)
+        job.admission_reason = reason
+        return reason is None
 
-    def save_to_srt(self, segments, output_file):
-        """保存为SRT字幕格式"""
-        with open(output_file, 'w', encoding='utf-8') as f:
-            for i, segment in enumerate(segments, start=1):
-                # 计算开始和结束时间
-                start_time = self.format_timestamp(segment.start)
-                end_time = self.format_timestamp(segment.end)
-
-                # 写入SRT格式
-                f.write(f"{i}\n")
-                f.write(f"{start_time} --> {end_time}\n")
-                f.write(f"{segment.text.strip()}\n\n")
-
-    def save_to_txt(self, segments, output_file):
-        """保存为纯文本格式"""
-        with open(output_file, 'w', encoding='utf-8') as f:
-            for segment in segments:
-                f.write(f"{segment.text.strip()}\n")
-
-    def format_timestamp(self, seconds):
-        """将秒数转换为SRT时间戳格式 (HH:MM:SS,mmm)"""
-        td = timedelta(seconds=seconds)
-        hours, remainder = divmod(td.seconds, 3600)
-        minutes, seconds = divmod(remainder, 60)
-        milliseconds = int(td.microseconds / 1000)
-        return f"{hours:02d}:{minutes:02d}:{seconds:02d},{milliseconds:03d}"
+    def resolveModel(self, job):
+        """返回任务使用的 (模型, 加载参数, 模型池条目)，指定的模型已被淘汰时返回 None
+
+        从模型池取出的模型在任务结束前不会被淘汰。
+        """
+        key = job.model_key
+        if key is None and self.model_param:
+            key = modelKey(self.model_param)
+        entry = modelPool.acquire(key) if key is not None else None
+        if entry is not None:
+            return entry.model, entry.model_param, entry
+        if job.model_key is not None:
+            return None
+        return self.model, self.model_param, None
+
+    def startJob(self, job):
+        resolved = self.resolveModel(job)
+        if resolved is None:
+            admissionController.release(job.admissionKey)
+            self.releaseAudio(job.file_path)
+            self.jobFinished.emit(job.file_path, False, f"模型已不在常驻模型池中: {modelLabel(job.model_key)}")
+            return
+        model, model_param, job.model_entry = resolved
+        self.jobModelChanged.emit(job.file_path, job.model_entry.label if job.model_entry else "当前模型")
+
+        # 没有模型标识时无法区分不同模型的结果，不使用缓存
+        identity = modelIdentity(model_param) if model_param else None
+        cache = self.cache if identity is not None else None
+        job.audio = self.audio_store.get(job.file_path)
+        job.decode_seconds = self.audio_store.decodeSeconds(job.file_path)
+        worker = TranscriptionWorker(job, model, cache, identity, model_param, self.averageSpeed("sequential"))
+        job.worker = worker
+        self.running[job.file_path] = job
+
+        worker.update_progress_signal.connect(self.jobStatusChanged)
+        worker.progress_signal.connect(self.jobProgressChanged)
+        worker.transcription_finished_signal.connect(self.jobFinished)
+        worker.cache_signal.connect(self.jobCacheChecked)
+        worker.speed_signal.connect(self.recordSpeed)
+        worker.metrics_signal.connect(self.jobMetrics)
+        worker.transcription_cancelled_signal.connect(lambda file_path: self.jobStatusChanged.emit(file_path, "已取消"))
+        # 线程真正退出后才释放并发名额
+        worker.finished.connect(lambda job=job: self.onWorkerStopped(job))
+
+        worker.start()
+
+    def dispatchTriage(self):
+        """语音检测同一时间只运行一个，不占用模型"""
+        if self.triage_job is not None or not self.triage_pending:
+            return
+
+        file_path, job = self.triage_pending.popitem(last=False)
+        self.triage_job = job
+        self.jobStatusChanged.emit(file_path, "语音检测中...")
+
+        # 检测线程单独保存，任务进入转录队列后 job.worker 会指向转录线程
+        self.triage_worker = SpeechTriageWorker(job)
+        self.triage_worker.triage_finished_signal.connect(self.onTriageFinished)
+        self.triage_worker.finished.connect(self.onTriageWorkerStopped)
+        self.triage_worker.start()
+
+    def onTriageFinished(self, file_path, speech_map, audio, decode_seconds, error):
+        job = self.triage_job
+        if job is None or job.cancelled:
+            return
+
+        if speech_map is None:
+            self.jobFinished.emit(file_path, False, f"语音检测失败: {error}")
+        elif not speech_map.hasSpeech():
+            self.jobStatusChanged.emit(file_path, "无语音，已跳过")
+        elif self.model is None and not self.model_pending:
+            # 检测期间模型加载失败，不再进入转录队列等待
+            self.jobStatusChanged.emit(file_path, MODEL_LOAD_FAILED_STATUS)
+        else:
+            job.speech_map = speech_map
+            # 排在前面的文件保留检测时解码的音频，转录时不必再解码
+            if len(self.pending) < PREFETCH_AHEAD:
+                self.audio_store.put(file_path, audio, decode_seconds)
+            self.pending[file_path] = job
+            self.jobStatusChanged.emit(file_path, f"排队中({speech_map.summary()})")
+            self.dispatch()
+
+    def onTriageWorkerStopped(self):
+        self.triage_worker.deleteLater()
+        self.triage_worker = None
+        self.triage_job = None
+        self.dispatchTriage()
+        self.checkIdle()
+
+    def onWorkerStopped(self, job):
+        if self.running.get(job.file_path) is job:
+            del self.running[job.file_path]
+        job.worker.deleteLater()
+        job.worker = None
+        job.audio = None
+        admissionController.release(job.admissionKey)
+        if job.model_entry is not None:
+            modelPool.release(job.model_entry)
+            job.model_entry = None
+        self.releaseAudio(job.file_path)
+        self.dispatch()
+        self.checkIdle()
+
+    def checkIdle(self):
+        if not (self.pending or self.running or self.triage_pending or self.triage_job is not None):
+            self.queueIdle.emit()
+
+    def dispatchPrefetch(self):
+        """预解码等待队列最前面的 PREFETCH_AHEAD 个文件，同一时间只解码一个"""
+        if self.prefetch_worker is not None or self.prefetch_blocked:
+            return
+        # 流式解码模式不使用整段音频
+        if self.model_param and self.model_param.get("inference_mode") == "streaming":
+            return
+
+        for job in islice(self.pending.values(), PREFETCH_AHEAD):
+            if job.prefetch_failed or self.audio_store.contains(job.file_path):
+                continue
+            self.prefetch_worker = PrefetchWorker(job.file_path, self.audio_store)
+            self.prefetch_worker.prefetch_finished_signal.connect(self.onPrefetchFinished)
+            self.prefetch_worker.finished.connect(self.onPrefetchWorkerStopped)
+            self.prefetch_worker.start()
+            return
+
+    def onPrefetchFinished(self, file_path, success, error):
+        job = self.pending.get(file_path)
+        if not success:
+            if error:
+                # 解码失败交给转录线程处理并报告错误，不再重试预解码
+                if job is not None:
+                    job.prefetch_failed = True
+            elif job is not None and self.audio_store.usedBytes == 0:
+                # 单个文件就超出预算，跳过它继续预解码后面的文件
+                job.prefetch_failed = True
+            else:
+                self.prefetch_blocked = True
+            return
+
+        # 解码期间任务已开始转录或被移除，结果不再需要
+        if job is None:
+            self.audio_store.release(file_path)
+
+    def onPrefetchWorkerStopped(self):
+        self.prefetch_worker.deleteLater()
+        self.prefetch_worker = None
+        self.dispatchPrefetch()
+
+    def releaseAudio(self, file_path):
+        """释放已解码的音频，腾出的预算用于继续预解码"""
+        if self.audio_store.release(file_path):
+            self.prefetch_blocked = False
+            self.dispatchPrefetch()
 
 
 class transcriptionInterface(QWidget, Ui_transcription):
@@ -103,7 +789,16 @@ class transcriptionInterface(QWidget, Ui_transcription):
 
         # 初始化变量
         self.model = None
-        self.workers = {}  # 存储每个文件对应的工作线程
+        self.model_pending = False  # 模型正在加载，加载期间添加的任务排队等待
+        self.parameters_provider = None
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.batch_metrics = OrderedDict()  # 本批任务的性能指标，批次结束后导出
+        self.batch_exported = True
+        self.resegment_worker = None
+        self.queue = TranscriptionQueue(self)
+        self.hotFolderWatcher = HotFolderWatcher(self.isTranscribed, self)
+        self.watch_waiting = []  # 没有模型时监视文件夹中出现的文件，加载模型后再转录
 
         # 初始化输出路径
         self.output_path = os.path.join(os.getcwd(), "output", "transcription")
@@ -111,25 +806,125 @@ class transcriptionInterface(QWidget, Ui_transcription):
 
         # 连接信号
         self.connectSignals()
+        modelPool.addListener(self.updateModelChoices)
+        self.updateModelChoices()
 
     def connectSignals(self):
         """连接所有信号"""
         self.fileListView.fileListChanged.connect(self.updateFileList)
         self.outputGroupWidget.toolButton.clicked.connect(self.selectOutputPath)
         self.startButton.clicked.connect(self.startTranscription)
+        self.queue.jobStatusChanged.connect(self.updateFileStatus)
+        self.queue.jobProgressChanged.connect(self.updateFileProgress)
+        self.queue.jobCacheChecked.connect(self.onCacheChecked)
+        self.queue.jobModelChanged.connect(self.updateFileModel)
+        self.queue.jobMetrics.connect(self.onJobMetrics)
+        self.queue.queueIdle.connect(self.onQueueIdle)
+        self.actionDelegate.actionTriggered.connect(self.onActionTriggered)
+        self.showMetricsCheckBox.stateChanged.connect(self.setMetricsVisible)
+        self.exportMetricsButton.clicked.connect(lambda: self.exportBatchMetrics(automatic=False))
+        self.queue.jobFinished.connect(self.onTranscriptionFinished)
+        self.resegmentButton.clicked.connect(self.startResegment)
+        self.hotFolderWidget.watchToggled.connect(self.setWatchFolder)
+        self.hotFolderWatcher.fileReady.connect(self.onWatchedFileReady)
 
-    def setModel(self, model):
-        """设置转录模型"""
+    def setModel(self, model, model_param=None):
+        """设置转录模型，model_param 为加载模型时的参数（并发数、推理模式等）"""
         self.model = model
+        self.queue.setModel(model, model_param)
+        self.updateModelStatus()
+        if self.model and self.watch_waiting:
+            files, self.watch_waiting = self.watch_waiting, []
+            for file_path in files:
+                self.startSingleTranscription(file_path)
+
+    def setModelPending(self, pending):
+        """模型开始/结束加载；加载结束时仍没有模型说明加载失败，等待中的任务不会再开始"""
+        self.model_pending = pending
+        self.queue.setModelPending(pending)
+        self.updateModelStatus()
+        if not pending and not self.model:
+            count = self.queue.failWaiting(MODEL_LOAD_FAILED_STATUS)
+            if count:
+                InfoBar.error(
+                    title="模型加载失败",
+                    content=f"{count} 个等待模型的文件已移出队列，请重新加载模型后再转录",
+                    parent=self,
+                    position=InfoBarPosition.TOP,
+                    duration=5000
+                )
+
+    def updateModelStatus(self):
         if self.model:
             self.modelStatusLabel.setText("模型已加载!")
             self.modelStatusLabel.setStyleSheet(
                 "background-color: rgba(0, 255, 0, 0.3); padding: 10px; border-radius: 5px;")
+        elif self.model_pending:
+            self.modelStatusLabel.setText("模型加载中，添加的文件将在加载完成后开始转录")
+            self.modelStatusLabel.setStyleSheet(
+                "background-color: rgba(255, 200, 0, 0.3); padding: 10px; border-radius: 5px;")
         else:
             self.modelStatusLabel.setText("模型未加载!")
             self.modelStatusLabel.setStyleSheet(
                 "background-color: rgba(255, 0, 0, 0.3); padding: 10px; border-radius: 5px;")
 
+    def updateModelChoices(self):
+        """模型下拉框：当前模型 + 常驻模型池中的模型，尽量保持原来的选择"""
+        selected = self.selectedModelKey()
+        self.modelComboBox.blockSignals(True)
+        self.modelComboBox.clear()
+        self.modelComboBox.addItem("当前模型", userData=None)
+        for key, entry in reversed(modelPool.entries.items()):
+            self.modelComboBox.addItem(entry.label, userData=key)
+        index = 0
+        for i in range(self.modelComboBox.count()):
+            if self.modelComboBox.itemData(i) == selected:
+                index = i
+        self.modelComboBox.setCurrentIndex(index)
+        self.modelComboBox.blockSignals(False)
+
+    def selectedModelKey(self):
+        """选中的模型池键，选择当前模型时返回 None"""
+        if self.modelComboBox.currentIndex() < 0:
+            return None
+        return self.modelComboBox.itemData(self.modelComboBox.currentIndex())
+
+    def setParametersProvider(self, provider):
+        """设置获取参数设置界面参数的函数，参数界面未创建时该函数返回 None"""
+        self.parameters_provider = provider
+
+    def getTranscribeParams(self):
+        """获取本次转录使用的参数，参数填写有误时提示并返回 None"""
+        try:
+            params = self.parameters_provider() if self.parameters_provider is not None else None
+            if params is None:
+                return dict(DEFAULT_TRANSCRIBE_PARAMS)
+            return toTranscribeParams(params)
+        except ValueError as e:
+            InfoBar.error(
+                title="错误",
+                content=f"参数设置有误，请检查'参数设置'界面: {str(e)}",
+                parent=self,
+                position=InfoBarPosition.TOP,
+                duration=3000
+            )
+            return None
+
+    def onCacheChecked(self, file_path, hit):
+        """统计本批任务的缓存命中情况"""
+        if hit:
+            self.cache_hits += 1
+        else:
+            self.cache_misses += 1
+        self.updateCacheStats()
+
+    def updateCacheStats(self):
+        self.cacheStatsLabel.setText(f"缓存命中 {self.cache_hits} / 未命中 {self.cache_misses}")
+
+    def getOutputFormats(self):
+        """获取勾选的输出格式"""
+        return [fmt for fmt, checkBox in self.formatCheckBoxes.items() if checkBox.isChecked()]
+
     def selectOutputPath(self):
         """选择输出目录"""
         dir_path = QFileDialog.getExistingDirectory(
@@ -142,53 +937,26 @@ class transcriptionInterface(QWidget, Ui_transcription):
             self.outputGroupWidget.lineEdit.setText(dir_path)
 
     def updateFileList(self, files):
-        """更新文件列表"""
-        # 清空表格
-        self.fileTableWidget.setRowCount(0)
-
-        # 添加文件到表格
-        for i, file_path in enumerate(files):
-            file_name = os.path.basename(file_path)
-
-            # 创建新行
-            self.fileTableWidget.insertRow(i)
-
-            # 设置文件名
-            self.fileTableWidget.setItem(i, 0, QTableWidgetItem(file_name))
-
-            # 设置状态
-            self.fileTableWidget.setItem(i, 1, QTableWidgetItem("等待中"))
+        """更新文件列表，只增删变化的行"""
+        # 从列表中删除的文件不再转录
+        listed = set(files)
+        for file_path in list(self.queue.pending) + list(self.queue.triage_pending):
+            if file_path not in listed:
+                self.queue.remove(file_path)
 
-            # 创建操作按钮
-            buttonWidget = QWidget()
-            buttonLayout = QHBoxLayout(buttonWidget)
-            buttonLayout.setContentsMargins(0, 0, 0, 0)
-            buttonLayout.setSpacing(4)
+        self.fileTableModel.setFiles(files)
 
-            # 创建转录按钮
-            transcribeButton = ToolButton()
-            transcribeButton.setIcon(FIF.PLAY)
-            transcribeButton.setToolTip("开始转录")
-            transcribeButton.clicked.connect(lambda checked=False, fp=file_path: self.startSingleTranscription(fp))
-
-            # 创建取消按钮
-            cancelButton = ToolButton()
-            cancelButton.setIcon(FIF.CANCEL)
-            cancelButton.setToolTip("取消转录")
-            cancelButton.clicked.connect(lambda checked=False, fp=file_path: self.cancelTranscription(fp))
-
-            # 添加按钮到布局
-            buttonLayout.addWidget(transcribeButton)
-            buttonLayout.addWidget(cancelButton)
-            buttonLayout.addStretch()
-
-            # 设置操作列
-            self.fileTableWidget.setCellWidget(i, 2, buttonWidget)
+    def onActionTriggered(self, file_path, action):
+        """操作列按钮"""
+        if action == "transcribe":
+            self.startSingleTranscription(file_path)
+        elif action == "cancel":
+            self.cancelTranscription(file_path)
 
     def startTranscription(self):
         """开始所有文件的转录"""
-        # 检查模型是否已加载
-        if not self.model:
+        # 检查模型是否已加载，正在加载时任务排队等待
+        if not self.model and not self.model_pending:
             InfoBar.error(
                 title="错误",
                 content="模型未加载，请先在'加载模型'界面加载模型",
@@ -222,13 +990,16 @@ class transcriptionInterface(QWidget, Ui_transcription):
             )
             return
 
-        # 获取当前已加载模型的参数
-        params = {
-            "language": None,  # 自动检测语言
-            "task": "transcribe",  # 转录任务
-            "beam_size": 5,  # 默认波束大小
-            "word_timestamps": True,  # 生成单词级时间戳
-        }
+        # 获取参数设置界面中的转录参数
+        params = self.getTranscribeParams()
+        if params is None:
+            return
+
+        # 新的一批任务，重新统计缓存命中数和性能指标
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.updateCacheStats()
+        self.batch_metrics.clear()
 
         # 遍历文件列表，开始转录
         for file_path in files:
@@ -236,8 +1007,8 @@ class transcriptionInterface(QWidget, Ui_transcription):
 
     def startSingleTranscription(self, file_path, params=None):
         """开始单个文件的转录"""
-        # 检查模型是否已加载
-        if not self.model:
+        # 检查模型是否已加载，正在加载时任务排队等待
+        if not self.model and not self.model_pending:
             InfoBar.error(
                 title="错误",
                 content="模型未加载，请先在'加载模型'界面加载模型",
@@ -270,17 +1041,14 @@ class transcriptionInterface(QWidget, Ui_transcription):
             )
             return
 
-        # 如果没有提供参数，使用默认参数
+        # 如果没有提供参数，使用参数设置界面中的参数
         if params is None:
-            params = {
-                "language": None,  # 自动检测语言
-                "task": "transcribe",  # 转录任务
-                "beam_size": 5,  # 默认波束大小
-                "word_timestamps": True,  # 生成单词级时间戳
-            }
-
-        # 检查该文件是否已经在处理中
-        if file_path in self.workers and self.workers[file_path].is_running:
+            params = self.getTranscribeParams()
+            if params is None:
+                return
+
+        # 检查该文件是否已经在队列或处理中
+        if self.queue.isActive(file_path):
             InfoBar.warning(
                 title="警告",
                 content=f"文件正在处理中: {os.path.basename(file_path)}",
@@ -290,27 +1058,26 @@ class transcriptionInterface(QWidget, Ui_transcription):
             )
             return
 
-        # 更新文件状态
-        self.updateFileStatus(file_path, "准备中...")
-
-        # 创建工作线程
-        worker = TranscriptionWorker(file_path, self.model, output_path, params)
-        self.workers[file_path] = worker
-
-        # 连接信号
-        worker.update_progress_signal.connect(self.updateFileStatus)
-        worker.transcription_finished_signal.connect(self.onTranscriptionFinished)
+        # 输出格式
+        formats = self.getOutputFormats()
+        if not formats:
+            InfoBar.error(
+                title="错误",
+                content="请至少选择一种输出格式",
+                parent=self,
+                position=InfoBarPosition.TOP,
+                duration=3000
+            )
+            return
 
-        # 开始转录
-        worker.start()
+        # 加入转录队列，由队列按模型并发数调度
+        keep_partial = self.keepPartialSwitch.isChecked()
+        self.queue.enqueue(TranscriptionJob(file_path, output_path, params, formats, keep_partial,
+                                            self.selectedModelKey()))
 
     def cancelTranscription(self, file_path):
         """取消转录"""
-        if file_path in self.workers and self.workers[file_path].is_running:
-            self.workers[file_path].stop()
-            self.workers[file_path].wait()
-            self.updateFileStatus(file_path, "已取消")
-
+        if self.queue.cancel(file_path):
             InfoBar.info(
                 title="已取消",
                 content=f"已取消文件转录: {os.path.basename(file_path)}",
@@ -329,14 +1096,155 @@ class transcriptionInterface(QWidget, Ui_transcription):
 
     def updateFileStatus(self, file_path, status):
         """更新文件状态"""
-        file_name = os.path.basename(file_path)
+        self.fileTableModel.setStatus(file_path, status)
 
-        # 查找对应的行
-        for i in range(self.fileTableWidget.rowCount()):
-            if self.fileTableWidget.item(i, 0).text() == file_name:
-                # 更新状态列
-                self.fileTableWidget.setItem(i, 1, QTableWidgetItem(status))
-                break
+    def updateFileProgress(self, file_path, progress, text):
+        """更新文件转录进度"""
+        self.fileTableModel.setStatus(file_path, text, progress)
+
+    def updateFileModel(self, file_path, label):
+        """显示任务使用的模型"""
+        self.fileTableModel.setModelLabel(file_path, label)
+
+    def onJobMetrics(self, file_path, values):
+        """记录任务的性能指标"""
+        self.fileTableModel.setMetrics(file_path, values)
+        self.batch_metrics[file_path] = values
+        self.batch_exported = False
+
+    def setMetricsVisible(self):
+        visible = self.showMetricsCheckBox.isChecked()
+        for column in range(METRIC_COLUMN, ACTION_COLUMN):
+            self.fileTableView.setColumnHidden(column, not visible)
+
+    def onQueueIdle(self):
+        """一批任务全部结束后自动导出性能指标"""
+        if self.batch_metrics and not self.batch_exported:
+            self.exportBatchMetrics(automatic=True)
+
+    def exportBatchMetrics(self, automatic=False):
+        """把本批任务的性能指标导出到输出目录"""
+        if not self.batch_metrics:
+            if not automatic:
+                InfoBar.warning(
+                    title="提示",
+                    content="本批任务还没有性能指标",
+                    parent=self,
+                    position=InfoBarPosition.TOP,
+                    duration=3000
+                )
+            return
+
+        output_path = self.outputGroupWidget.lineEdit.text() or self.output_path
+        try:
+            csv_path, json_path = exportMetrics(output_path, self.batch_metrics.values())
+        except OSError as e:
+            InfoBar.error(
+                title="错误",
+                content=f"导出性能指标失败: {str(e)}",
+                parent=self,
+                position=InfoBarPosition.TOP,
+                duration=3000
+            )
+            return
+
+        self.batch_exported = True
+        InfoBar.info(
+            title="性能指标已导出",
+            content=f"{csv_path}\n{json_path}",
+            parent=self,
+            position=InfoBarPosition.TOP,
+            duration=5000
+        )
+
+    def setWatchFolder(self, enabled, folder):
+        """开启/关闭监视文件夹，新文件写入完成后自动加入转录队列"""
+        if not enabled:
+            self.hotFolderWatcher.stop()
+            self.hotFolderWidget.setWatching(False)
+            return
+
+        if not self.hotFolderWatcher.start(folder):
+            self.hotFolderWidget.setWatching(False)
+            InfoBar.error(
+                title="错误",
+                content=f"无法监视文件夹: {folder or '未选择'}",
+                parent=self,
+                position=InfoBarPosition.TOP,
+                duration=3000
+            )
+            return
+        self.hotFolderWidget.setWatching(True)
+
+    def isTranscribed(self, file_path):
+        """文件已转录完成：表格中状态为完成，或所选格式的输出都已存在且比媒体文件新"""
+        record = self.fileTableModel.record(file_path)
+        if record is not None and record.status == "完成":
+            return True
+
+        output_path = self.outputGroupWidget.lineEdit.text() or self.output_path
+        formats = self.getOutputFormats()
+        base_name = os.path.splitext(os.path.basename(file_path))[0]
+        try:
+            media_mtime = os.path.getmtime(file_path)
+            return bool(formats) and all(
+                os.path.getmtime(os.path.join(output_path, f"{base_name}.{fmt}")) >= media_mtime for fmt in formats)
+        except OSError:
+            return False
+
+    def onWatchedFileReady(self, file_path):
+        """监视文件夹中的新文件：加入文件列表并进入转录队列，没有模型时等模型加载后再转录"""
+        if self.queue.isActive(file_path):
+            return
+        self.fileListView.addFilesToList([file_path])
+        if not self.model and not self.model_pending:
+            if file_path not in self.watch_waiting:
+                self.watch_waiting.append(file_path)
+            self.updateFileStatus(file_path, "等待模型加载")
+            return
+        self.startSingleTranscription(file_path)
+
+    def getLayoutOptions(self):
+        return {
+            "max_line_width": self.lineWidthSpinBox.value(),
+            "max_lines": self.maxLinesSpinBox.value(),
+            "min_duration": self.minDurationSpinBox.value(),
+            "max_duration": self.maxDurationSpinBox.value(),
+            "split_on_punctuation": self.punctuationCheckBox.isChecked(),
+        }
+
+    def startResegment(self):
+        """按当前排版规则重新生成输出目录中的字幕，只生成勾选的 SRT/VTT（都未勾选时两种都生成）"""
+        folder = self.outputGroupWidget.lineEdit.text() or self.output_path
+        if self.resegment_worker is not None or not os.path.isdir(folder):
+            return
+
+        formats = [fmt for fmt in self.getOutputFormats() if fmt in RESEGMENT_FORMATS] or list(RESEGMENT_FORMATS)
+        self.resegmentButton.setEnabled(False)
+        self.resegment_worker = ResegmentWorker(folder, self.getLayoutOptions(), formats)
+        self.resegment_worker.progress_signal.connect(
+            lambda done, total: self.resegmentButton.setText(f"重新生成中 {done}/{total}"))
+        self.resegment_worker.finished_signal.connect(self.onResegmentFinished)
+        self.resegment_worker.finished.connect(self.resegment_worker.deleteLater)
+        self.resegment_worker.start()
+
+    def onResegmentFinished(self, done, cues, elapsed, errors):
+        self.resegment_worker = None
+        self.resegmentButton.setEnabled(True)
+        self.resegmentButton.setText("重新生成字幕")
+
+        content = f"{done} 个文件，共 {cues} 条字幕，耗时 {elapsed:.1f} 秒"
+        if errors:
+            content += "\n" + "\n".join(f"{name}: {error}" for name, error in errors[:5])
+        if done == 0 and not errors:
+            content = "输出目录中没有时间轴数据（.timings）文件"
+        (InfoBar.warning if errors or done == 0 else InfoBar.success)(
+            title="重新断句完成",
+            content=content,
+            parent=self,
+            position=InfoBarPosition.TOP,
+            duration=5000
+        )
 
     def onTranscriptionFinished(self, file_path, success, message):
         """转录完成处理"""
@@ -0,0 +1,240 @@
+from PySide6.QtCore import Qt, Signal, QAbstractTableModel, QModelIndex, QRect, QEvent
+from PySide6.QtGui import QColor, QCursor
+from PySide6.QtWidgets import (QApplication, QStyle, QStyledItemDelegate, QStyleOptionProgressBar, QToolTip)
+from qfluentwidgets import FluentIcon as FIF, isDarkTheme
+
+import os
+
+from app.common.jobMetrics import METRIC_FIELDS, formatMetric
+
+# 列
+NAME_COLUMN = 0
+STATUS_COLUMN = 1
+MODEL_COLUMN = 2
+METRIC_COLUMN = 3
+ACTION_COLUMN = METRIC_COLUMN + len(METRIC_FIELDS)
+
+HEADERS = ["文件名", "状态", "模型"] + [title for _, title in METRIC_FIELDS] + ["操作"]
+
+
+class FileRecord:
+    """表格中一个文件的状态"""
+
+    __slots__ = ("file_path", "name", "status", "progress", "model", "metrics")
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.name = os.path.basename(file_path)
+        self.status = "等待中"
+        self.progress = None  # 0~1，None 时状态列显示纯文本
+        self.model = ""
+        self.metrics = None
+
+
+class TranscriptionTableModel(QAbstractTableModel):
+    """转录文件列表的数据模型
+
+    以完整路径为键，路径到行号的字典使状态更新为 O(1)，不同目录下的同名文件互不影响；
+    文件列表变化时只插入/删除变化的行，不重建整个表格。
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.records = []
+        self.rows = {}  # 文件路径 -> 行号
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.records)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        record = self.records[index.row()]
+        column = index.column()
+        if role == Qt.DisplayRole:
+            if column == NAME_COLUMN:
+                return record.name
+            if column == STATUS_COLUMN:
+                return record.status
+            if column == MODEL_COLUMN:
+                return record.model
+            if METRIC_COLUMN <= column < ACTION_COLUMN:
+                if record.metrics is None:
+                    return ""
+                return formatMetric(record.metrics.get(METRIC_FIELDS[column - METRIC_COLUMN][0]))
+        elif role == Qt.UserRole and column == STATUS_COLUMN:
+            return record.progress
+        elif role == Qt.ToolTipRole and column == NAME_COLUMN:
+            return record.file_path
+        return None
+
+    def setFiles(self, files):
+        """与新的文件列表同步：删除不在列表中的行，在末尾追加新文件，保留其余行的状态"""
+        keep = set(files)
+
+        # 从下往上按连续区间删除
+        row = len(self.records) - 1
+        removed = False
+        while row >= 0:
+            if self.records[row].file_path in keep:
+                row -= 1
+                continue
+            end = row
+            while row >= 0 and self.records[row].file_path not in keep:
+                row -= 1
+            self.beginRemoveRows(QModelIndex(), row + 1, end)
+            del self.records[row + 1:end + 1]
+            self.endRemoveRows()
+            removed = True
+        if removed:
+            self.rows = {record.file_path: i for i, record in enumerate(self.records)}
+
+        new_files = [file_path for file_path in dict.fromkeys(files) if file_path not in self.rows]
+        if new_files:
+            first = len(self.records)
+            self.beginInsertRows(QModelIndex(), first, first + len(new_files) - 1)
+            for i, file_path in enumerate(new_files, first):
+                self.records.append(FileRecord(file_path))
+                self.rows[file_path] = i
+            self.endInsertRows()
+
+    def rowOf(self, file_path):
+        """文件所在行，不在表格中时返回 -1"""
+        return self.rows.get(file_path, -1)
+
+    def filePath(self, row):
+        return self.records[row].file_path
+
+    def record(self, file_path):
+        row = self.rows.get(file_path)
+        return None if row is None else self.records[row]
+
+    def setStatus(self, file_path, text, progress=None):
+        """原地修改状态，只通知状态单元格重绘"""
+        row = self.rows.get(file_path)
+        if row is None:
+            return
+        record = self.records[row]
+        record.status = text
+        record.progress = progress
+        index = self.index(row, STATUS_COLUMN)
+        self.dataChanged.emit(index, index, [Qt.DisplayRole, Qt.UserRole])
+
+    def setModelLabel(self, file_path, label):
+        row = self.rows.get(file_path)
+        if row is None:
+            return
+        self.records[row].model = label
+        index = self.index(row, MODEL_COLUMN)
+        self.dataChanged.emit(index, index, [Qt.DisplayRole])
+
+    def setMetrics(self, file_path, values):
+        row = self.rows.get(file_path)
+        if row is None:
+            return
+        self.records[row].metrics = values
+        self.dataChanged.emit(self.index(row, METRIC_COLUMN), self.index(row, ACTION_COLUMN - 1), [Qt.DisplayRole])
+
+
+class StatusDelegate(QStyledItemDelegate):
+    """状态列：有进度数据（Qt.UserRole）时绘制进度条，否则按普通文本显示"""
+
+    def paint(self, painter, option, index):
+        progress = index.data(Qt.UserRole)
+        if progress is None:
+            super().paint(painter, option, index)
+            return
+
+        progressOption = QStyleOptionProgressBar()
+        progressOption.rect = option.rect.adjusted(2, 4, -2, -4)
+        progressOption.minimum = 0
+        progressOption.maximum = 1000
+        progressOption.progress = int(progress * 1000)
+        progressOption.text = index.data(Qt.DisplayRole) or ""
+        progressOption.textVisible = True
+        progressOption.textAlignment = Qt.AlignCenter
+        progressOption.state = option.state
+        progressOption.palette = option.palette
+        QApplication.style().drawControl(QStyle.CE_ProgressBar, progressOption, painter)
+
+
+class ActionDelegate(QStyledItemDelegate):
+    """操作列：直接绘制转录/取消按钮，不为每一行创建控件"""
+
+    actionTriggered = Signal(str, str)  # 文件路径, 操作（"transcribe" / "cancel"）
+
+    BUTTON_SIZE = 28
+    SPACING = 4
+    ACTIONS = [
+        ("transcribe", FIF.PLAY, "开始转录"),
+        ("cancel", FIF.CANCEL, "取消转录"),
+    ]
+
+    def __init__(self, view):
+        super().__init__(view)
+        self.view = view
+        view.setMouseTracking(True)
+
+    def buttonRects(self, rect):
+        top = rect.top() + (rect.height() - self.BUTTON_SIZE) // 2
+        left = rect.left() + self.SPACING
+        rects = []
+        for action, _, _ in self.ACTIONS:
+            rects.append((action, QRect(left, top, self.BUTTON_SIZE, self.BUTTON_SIZE)))
+            left += self.BUTTON_SIZE + self.SPACING
+        return rects
+
+    def actionAt(self, rect, pos):
+        for action, buttonRect in self.buttonRects(rect):
+            if buttonRect.contains(pos):
+                return action
+        return None
+
+    def paint(self, painter, option, index):
+        super().paint(painter, option, index)
+        painter.save()
+        painter.setRenderHint(painter.RenderHint.Antialiasing)
+        icons = {action: icon for action, icon, _ in self.ACTIONS}
+        cursor = self.view.viewport().mapFromGlobal(QCursor.pos())
+        mouseOver = bool(option.state & QStyle.State_MouseOver)
+        for action, rect in self.buttonRects(option.rect):
+            if mouseOver and rect.contains(cursor):
+                color = QColor(255, 255, 255, 20) if isDarkTheme() else QColor(0, 0, 0, 15)
+                painter.setPen(Qt.NoPen)
+                painter.setBrush(color)
+                painter.drawRoundedRect(rect, 5, 5)
+            icons[action].icon().paint(painter, rect.adjusted(7, 7, -7, -7))
+        painter.restore()
+
+    def sizeHint(self, option, index):
+        size = super().sizeHint(option, index)
+        size.setWidth(len(self.ACTIONS) * (self.BUTTON_SIZE + self.SPACING) + self.SPACING)
+        return size
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.MouseMove:
+            # 在同一单元格内的两个按钮之间移动时重绘悬停效果
+            self.view.viewport().update(option.rect)
+        elif event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton:
+            action = self.actionAt(option.rect, event.position().toPoint())
+            if action:
+                self.actionTriggered.emit(model.filePath(index.row()), action)
+                return True
+        return super().editorEvent(event, model, option, index)
+
+    def helpEvent(self, event, view, option, index):
+        action = self.actionAt(option.rect, event.pos())
+        for name, _, tip in self.ACTIONS:
+            if name == action:
+                QToolTip.showText(event.globalPos(), tip, view)
+                return True
+        return super().helpEvent(event, view, option, index)
@@ -1,19 +1,47 @@
 import sys
+import argparse
+import multiprocessing
 
+from app.common.startupReport import startupReport
 
-from PySide6.QtWidgets import QApplication
-from app.ui.main_window import MainWindow
 
+def main():
+    # 解析命令行参数，其余参数交给 Qt 处理
+    parser = argparse.ArgumentParser(description="未闻花落 - 音视频处理工具")
+    parser.add_argument("--startup-report", nargs="?", const="startup_report.json", metavar="PATH",
+                        help="记录启动各阶段耗时并保存为 JSON 文件（默认 startup_report.json）")
+    args, qt_args = parser.parse_known_args()
 
-# 创建应用程序实例
-app = QApplication(sys.argv)
+    if args.startup_report:
+        startupReport.enable(args.startup_report)
 
-# 创建主窗口实例
-window = MainWindow()
+    with startupReport.phase("import PySide6"):
+        from PySide6.QtWidgets import QApplication
+    with startupReport.phase("import app.ui.main_window"):
+        from app.ui.main_window import MainWindow
 
-# 显示窗口
-window.show()
+    # 创建应用程序实例
+    with startupReport.phase("QApplication"):
+        app = QApplication(sys.argv[:1] + qt_args)
 
-# 启动应用程序事件循环并返回退出代码
-sys.exit(app.exec())
+    # 创建主窗口实例
+    with startupReport.phase("MainWindow"):
+        window = MainWindow()
 
+    if startupReport.enabled:
+        # 首次绘制时输出报告，退出时重新保存一次，包含启动后才按需创建的界面
+        window.watchFirstPaint()
+        app.aboutToQuit.connect(lambda: startupReport.write(printTable=False))
+
+    # 显示窗口
+    with startupReport.phase("show"):
+        window.show()
+
+    # 启动应用程序事件循环并返回退出代码
+    return app.exec()
+
+
+# 多进程转录使用 spawn 方式启动子进程，子进程会重新导入本模块，界面只能在主进程中创建
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
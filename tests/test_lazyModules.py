@@ -0,0 +1,66 @@
+import json
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 在新进程中运行：记录所有重量级模块的导入尝试（未安装时 import 会失败，也要能发现），再导入给定模块
+STARTUP_SCRIPT = textwrap.dedent("""
+    import importlib
+    import json
+    import pkgutil
+    import sys
+
+    from app.common.lazyModules import HEAVY_MODULES, loadedHeavyModules
+
+    attempted = []
+
+    class HeavyImportRecorder:
+        def find_spec(self, name, path=None, target=None):
+            if name.split(".")[0] in HEAVY_MODULES and name not in attempted:
+                attempted.append(name)
+            return None
+
+    sys.meta_path.insert(0, HeavyImportRecorder())
+
+    import app.common
+    for module in pkgutil.iter_modules(app.common.__path__):
+        importlib.import_module("app.common." + module.name)
+
+    if sys.argv[1] == "window":
+        from PySide6.QtWidgets import QApplication
+        from app.ui.main_window import MainWindow
+
+        application = QApplication(sys.argv[:1])
+        window = MainWindow()
+        application.processEvents()
+
+    print(json.dumps({"attempted": attempted, "loaded": loadedHeavyModules()}))
+""")
+
+
+def runStartup(stage):
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [ROOT, env.get("PYTHONPATH")]))
+    result = subprocess.run([sys.executable, "-c", STARTUP_SCRIPT, stage], cwd=ROOT, env=env,
+                            capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_common_modules_do_not_import_heavy_modules():
+    pytest.importorskip("numpy")
+    report = runStartup("common")
+    assert report == {"attempted": [], "loaded": []}
+
+
+def test_main_window_does_not_import_heavy_modules():
+    pytest.importorskip("numpy")
+    pytest.importorskip("PySide6")
+    pytest.importorskip("qfluentwidgets")
+    report = runStartup("window")
+    assert report == {"attempted": [], "loaded": []}
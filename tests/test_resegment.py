@@ -0,0 +1,72 @@
+import random
+from types import SimpleNamespace
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from app.common.resegment import CueLayout, charWidths, decodeCodepoints
+
+WORDS = [" hello", " world.", " a", " transcription,", " subtitle", "中文", "你好，", "字幕。", "时间", " ok?",
+         " extraordinarily-long-compound-word"]
+
+
+def makeTimings(count, seed):
+    rng = random.Random(seed)
+    texts, starts, ends = [], [], []
+    position = 0
+    for _ in range(count):
+        position += rng.choice([0, 50, 120, 400, 2000])
+        duration = rng.randint(100, 600)
+        texts.append(rng.choice(WORDS))
+        starts.append(position)
+        ends.append(position + duration)
+        position += duration
+
+    encoded = [text.encode("utf-8") for text in texts]
+    offsets = np.concatenate([[0], np.cumsum([len(item) for item in encoded])])
+    return SimpleNamespace(wordCount=count, word_start=np.array(starts), word_end=np.array(ends),
+                           word_text=np.frombuffer(b"".join(encoded), dtype=np.uint8),
+                           word_text_offsets=offsets, info=None)
+
+
+def displayWidth(text):
+    _, codepoints = decodeCodepoints(np.frombuffer(text.encode("utf-8"), dtype=np.uint8))
+    return int(charWidths(codepoints).sum())
+
+
+@pytest.mark.parametrize("split_on_punctuation", [True, False])
+@pytest.mark.parametrize("max_line_width,max_lines", [(20, 2), (42, 2), (16, 3), (30, 1)])
+def test_lines_never_exceed_width(split_on_punctuation, max_line_width, max_lines):
+    layout = CueLayout(makeTimings(3000, max_line_width * max_lines), {
+        "max_line_width": max_line_width, "max_lines": max_lines, "split_on_punctuation": split_on_punctuation})
+    cues = layout.cues()
+    ranges = layout.cueRanges()
+    assert len(cues) == len(ranges)
+    assert ranges[0][0] == 0 and ranges[-1][1] == layout.count
+
+    for (first, end), cue in zip(ranges, cues):
+        breaks = layout.lineBreaks(first, end) + [end]
+        assert len(breaks) - 1 <= max_lines
+        lines = cue.text.split("\n")
+        assert len(lines) == len(breaks) - 1
+        for line_first, line_end, text in zip(breaks, breaks[1:], lines):
+            # 只有单个超宽单词可以超过行宽
+            if line_end - line_first > 1:
+                assert layout.width(line_first, line_end) <= max_line_width
+                assert displayWidth(text) <= max_line_width
+
+
+def test_long_cue_uses_fewest_lines():
+    layout = CueLayout(makeTimings(3000, 7), {"max_line_width": 42, "max_lines": 1000})
+    breaks = layout.lineBreaks(0, layout.count) + [layout.count]
+
+    greedy, first = 0, 0
+    while first < layout.count:
+        first = layout.lineEnd(first, layout.count)
+        greedy += 1
+    assert len(breaks) - 1 == greedy
+    for line_first, line_end in zip(breaks, breaks[1:]):
+        assert line_end > line_first
+        if line_end - line_first > 1:
+            assert layout.width(line_first, line_end) <= 42
@@ -0,0 +1,49 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from app.common.timingStore import Timings, timingsPath
+from app.common.transcriptWriter import TranscriptWriter
+
+SEGMENTS = [
+    SimpleNamespace(start=0.0, end=1.5, text=" Hello world.", words=[
+        SimpleNamespace(start=0.0, end=0.6, word=" Hello", probability=0.9),
+        SimpleNamespace(start=0.7, end=1.5, word=" world.", probability=0.8),
+    ]),
+    SimpleNamespace(start=2.0, end=3.0, text="你好。", words=None),
+]
+
+
+def test_timings_appear_only_when_complete(tmp_path):
+    path = timingsPath(str(tmp_path), "clip")
+    with TranscriptWriter(str(tmp_path), "clip", ["srt", "timings"]) as writer:
+        for segment in SEGMENTS:
+            writer.write(segment)
+            assert not os.path.exists(path)
+        writer.info = SimpleNamespace(language="en", language_probability=0.9, duration=3.0)
+
+    assert not os.path.exists(path + ".tmp")
+    timings = Timings(path)
+    assert timings.segmentCount == 2
+    assert timings.wordTexts() == [" Hello", " world."]
+    assert timings.info.duration == 3.0
+
+
+def test_interrupted_writer_leaves_no_timings(tmp_path):
+    writer = TranscriptWriter(str(tmp_path), "clip", ["timings"])
+    writer.write(SEGMENTS[0])
+    # 进程中途退出：不调用 close
+    writer.closeFiles()
+
+    assert not os.path.exists(timingsPath(str(tmp_path), "clip"))
+
+
+def test_empty_timings_file_reports_incomplete(tmp_path):
+    path = timingsPath(str(tmp_path), "clip")
+    open(path, "wb").close()
+
+    with pytest.raises(ValueError, match="为空"):
+        Timings(path)
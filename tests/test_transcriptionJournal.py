@@ -0,0 +1,51 @@
+from types import SimpleNamespace
+
+from app.common.speechMap import SpeechMap
+from app.common.transcriptionJournal import resumeParams
+
+COMMITTED = [SimpleNamespace(start=0.0, end=4.0, text=" first."), SimpleNamespace(start=4.0, end=10.0, text=" second.")]
+
+
+def test_resume_keeps_vad_with_speech_map():
+    speech_map = SpeechMap(60.0, [(2.0, 8.0), (20.0, 30.0), (40.0, 50.0)])
+    params = resumeParams({"vad_filter": True, "vad_parameters": {"threshold": 0.5}}, COMMITTED, speech_map)
+
+    assert "vad_filter" not in params
+    assert "vad_parameters" not in params
+    assert params["clip_timestamps"] == [20.0, 30.0, 40.0, 50.0]
+
+
+def test_resume_intersects_manual_clips_with_speech_map():
+    speech_map = SpeechMap(60.0, [(2.0, 8.0), (20.0, 30.0), (40.0, 50.0)])
+    params = resumeParams({"vad_filter": True, "clip_timestamps": "0,25,45"}, COMMITTED, speech_map)
+
+    assert params["clip_timestamps"] == [20.0, 25.0, 45.0, 50.0]
+
+
+def test_resume_without_speech_map_leaves_vad_flag():
+    params = resumeParams({"vad_filter": True}, COMMITTED)
+
+    assert params["vad_filter"]
+    assert params["clip_timestamps"] == [10.0]
+
+
+def test_resume_prompt_keeps_user_prompt():
+    params = resumeParams({"initial_prompt": " Glossary: Kubernetes. "}, COMMITTED)
+    assert params["initial_prompt"] == "Glossary: Kubernetes. first. second."
+
+    params = resumeParams({}, COMMITTED)
+    assert params["initial_prompt"] == "first. second."
+
+    params = resumeParams({"initial_prompt": "keep", "condition_on_previous_text": False}, COMMITTED)
+    assert params["initial_prompt"] == "keep"
+
+
+def test_resume_prompt_uses_last_segments_only():
+    committed = [SimpleNamespace(start=float(i), end=float(i + 1), text=text)
+                 for i, text in enumerate(["第一句。", "第二句。", "第三句。", "第四句。"])]
+
+    params = resumeParams({"initial_prompt": "术语：字幕"}, committed)
+    assert params["initial_prompt"] == "术语：字幕 第二句。第三句。第四句。"
+
+    params = resumeParams({}, committed, prompt_segments=1)
+    assert params["initial_prompt"] == "第四句。"
@@ -0,0 +1,86 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("PySide6")
+pytest.importorskip("qfluentwidgets")
+
+from app.view.transcription import TranscriptionJob, TranscriptionWorker
+
+INFO = SimpleNamespace(duration=20.0, language="en", language_probability=0.9)
+
+
+class FakeCache:
+    def __init__(self, on_put=None):
+        self.stored = []
+        self.on_put = on_put
+
+    def get(self, key):
+        return None
+
+    def put(self, key, segments, info):
+        if self.on_put is not None:
+            self.on_put()
+        self.stored.append(segments)
+
+
+class FakeModel:
+    """第一段之后调用 after_first，然后按 stop_early 提前结束或继续产生剩余段落"""
+
+    def __init__(self, after_first, stop_early):
+        self.after_first = after_first
+        self.stop_early = stop_early
+
+    def transcribe(self, audio, **params):
+        def segments():
+            yield SimpleNamespace(start=0.0, end=5.0, text=" first.", words=None)
+            self.after_first()
+            if self.stop_early:
+                return
+            yield SimpleNamespace(start=5.0, end=20.0, text=" second.", words=None)
+        return segments(), INFO
+
+
+def runWorker(tmp_path, model_factory, cache):
+    media = tmp_path / "clip.wav"
+    media.write_bytes(b"not really audio")
+    output = tmp_path / "out"
+    job = TranscriptionJob(str(media), str(output), {}, formats=("srt",), keep_partial=True)
+    job.audio = np.zeros(16000, dtype=np.float32)
+
+    events = {"finished": [], "cancelled": []}
+    worker = TranscriptionWorker(job, None, cache, ("model",), {})
+    worker.model = model_factory(worker)
+    worker.indexTranscript = lambda writer, segments: None
+    worker.transcription_finished_signal.connect(lambda *args: events["finished"].append(args))
+    worker.transcription_cancelled_signal.connect(lambda *args: events["cancelled"].append(args))
+    worker.run()
+    return events, output
+
+
+def test_generator_stopping_after_cancel_is_not_success(tmp_path):
+    cache = FakeCache()
+    events, output = runWorker(tmp_path, lambda worker: FakeModel(worker.stop, stop_early=True), cache)
+
+    assert events["cancelled"] and not events["finished"]
+    assert cache.stored == []
+    # 保留部分结果时续传日志也保留
+    assert os.path.exists(output / ".clip.journal.jsonl")
+
+
+def test_cancel_after_last_segment_keeps_result(tmp_path):
+    workers = []
+
+    def factory(worker):
+        workers.append(worker)
+        return FakeModel(lambda: None, stop_early=False)
+
+    cache = FakeCache(on_put=lambda: workers[0].stop())
+    events, output = runWorker(tmp_path, factory, cache)
+
+    assert not events["cancelled"]
+    assert events["finished"] and events["finished"][0][1]
+    assert len(cache.stored[0]) == 2
+    assert not os.path.exists(output / ".clip.journal.jsonl")
@@ -0,0 +1,101 @@
+import inspect
+
+import pytest
+
+from app.common.whisperParams import (MAX_NEW_TOKENS_LIMIT, MAX_PROMPT_TOKENS, WHISPER_MAX_LENGTH,
+                                      toTranscribeParams)
+
+# FasterWhisperInterface.getParameters() 在界面默认值下的结果（见 Ui_fasterwhisper）
+DEFAULT_UI_PARAMS = {
+    "language": None,
+    "language_detection_threshold": 0.5,
+    "language_detection_segments": 1,
+    "task": "transcribe",
+    "multilingual": False,
+    "without_timestamps": False,
+    "word_timestamps": False,
+    "aggregate_contents": False,
+    "max_new_tokens": 448,
+    "chunk_length": 30.0,
+    "clip_mode": 0,
+    "clip_timestamps": None,
+    "vad_filter": False,
+    "vad_parameters": {"threshold": 0.5, "min_speech_duration_ms": 250, "min_silence_duration_ms": 2000,
+                       "speech_pad_ms": 400},
+    "hallucination_silence_threshold": 0.0,
+    "patience": 1.0,
+    "length_penalty": 1.0,
+    "compression_ratio_threshold": 2.4,
+    "log_prob_threshold": -1.0,
+    "no_speech_threshold": 0.6,
+    "condition_on_previous_text": False,
+    "repetition_penalty": 1.0,
+    "no_repeat_ngram_size": 0,
+    "suppress_blank": True,
+    "beam_size": 5,
+    "best_of": 1,
+    "temperature": 0.0,
+    "prompt_reset_on_temperature": 0.5,
+    "initial_prompt": None,
+    "prefix": None,
+    "hotwords": None,
+    "suppress_tokens": [-1],
+    "max_initial_timestamp": 1.0,
+    "prepend_punctuations": "\"'¿([{-",
+    "append_punctuations": "\"'.。,，!！?？:：)]}、",
+}
+
+
+def checkTranscribeParams(params):
+    """faster-whisper 对这些参数的要求"""
+    assert isinstance(params["chunk_length"], int)
+    if params.get("max_new_tokens") is not None:
+        assert params["max_new_tokens"] + MAX_PROMPT_TOKENS <= WHISPER_MAX_LENGTH
+    assert "clip_mode" not in params and "aggregate_contents" not in params
+
+
+def test_default_ui_params():
+    params = toTranscribeParams(DEFAULT_UI_PARAMS)
+    checkTranscribeParams(params)
+    assert params["chunk_length"] == 30
+    assert "max_new_tokens" not in params
+    assert "vad_filter" not in params
+
+
+def test_real_interface_defaults():
+    """直接读取参数设置界面的默认值"""
+    pytest.importorskip("qfluentwidgets")
+    from PySide6.QtWidgets import QApplication
+    from app.view.fasterwhisperInterface import FasterWhisperInterface
+
+    app = QApplication.instance() or QApplication([])
+    params = toTranscribeParams(FasterWhisperInterface().getParameters())
+    checkTranscribeParams(params)
+    assert app is not None
+
+
+def test_params_accepted_by_transcribe():
+    faster_whisper = pytest.importorskip("faster_whisper")
+    names = set(inspect.signature(faster_whisper.WhisperModel.transcribe).parameters)
+    assert set(toTranscribeParams(DEFAULT_UI_PARAMS)) <= names
+
+
+def test_max_new_tokens_clamped():
+    params = toTranscribeParams(dict(DEFAULT_UI_PARAMS, max_new_tokens=300))
+    assert params["max_new_tokens"] == MAX_NEW_TOKENS_LIMIT
+    params = toTranscribeParams(dict(DEFAULT_UI_PARAMS, max_new_tokens=100))
+    assert params["max_new_tokens"] == 100
+    with pytest.raises(ValueError):
+        toTranscribeParams(dict(DEFAULT_UI_PARAMS, max_new_tokens=0))
+
+
+def test_chunk_length_validated():
+    assert toTranscribeParams(dict(DEFAULT_UI_PARAMS, chunk_length=20.4))["chunk_length"] == 20
+    with pytest.raises(ValueError):
+        toTranscribeParams(dict(DEFAULT_UI_PARAMS, chunk_length=45.0))
+
+
+def test_unknown_keys_dropped():
+    params = toTranscribeParams(dict(DEFAULT_UI_PARAMS, clip_mode=1, clip_timestamps="0-10;20-", extra=1))
+    assert params["clip_timestamps"] == [0.0, 10.0, 20.0]
+    assert "extra" not in params